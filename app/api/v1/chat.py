@@ -25,12 +25,32 @@ logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
+# Shared chat service, created on first use
+_chat_service: Optional[ChatService] = None
+
+
+async def get_chat_service() -> ChatService:
+    """Dependency that returns the shared chat service.
+    
+    The service is created on the event loop the first time it is needed,
+    because its constructor starts a background cleanup task.
+    
+    Returns:
+        ChatService: The process-wide chat service
+    """
+    global _chat_service
+    if _chat_service is None:
+        _chat_service = ChatService()
+    return _chat_service
+
+
 @router.post("/", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session),
+    chat_service: ChatService = Depends(get_chat_service)
 ):
     """Send a chat message and get a response."""
     start_time = time.time()
@@ -86,7 +106,6 @@ async def chat(
         await db.refresh(user_message)
         
         # Get AI response
-        chat_service = ChatService(db, current_user)
         response = await chat_service.generate_response(
             conversation_id=conversation_id,
             user_message=request.message,
@@ -142,6 +161,8 @@ async def chat(
             created_at=ai_message.created_at
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         CHAT_ERRORS.inc()
         logger.error(
@@ -158,7 +179,8 @@ async def chat(
 async def chat_stream(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session),
+    chat_service: ChatService = Depends(get_chat_service)
 ):
     """Send a chat message and get a streaming response."""
     start_time = time.time()
@@ -212,8 +234,6 @@ async def chat_stream(
         await db.refresh(user_message)
         
         # Generate streaming response
-        chat_service = ChatService(db, current_user)
-        
         async def generate_stream():
             message_id = uuid.uuid4()
             content_buffer = ""
@@ -293,6 +313,8 @@ async def chat_stream(
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         CHAT_ERRORS.inc()
         logger.error("Chat stream error", error=str(e), exc_info=True)
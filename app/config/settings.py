@@ -67,8 +67,20 @@ class QdrantSettings(BaseSettings):
     host: str = Field(default="localhost", env="QDRANT_HOST")
     port: int = Field(default=6333, env="QDRANT_PORT")
     grpc_port: int = Field(default=6334, env="QDRANT_GRPC_PORT")
+    prefer_grpc: bool = Field(default=True, env="QDRANT_PREFER_GRPC")
     api_key: Optional[str] = Field(default=None, env="QDRANT_API_KEY")
     timeout: int = Field(default=30, env="QDRANT_TIMEOUT")
+    upsert_batch_size: int = Field(default=256, env="QDRANT_UPSERT_BATCH_SIZE")
+    upsert_max_concurrency: int = Field(default=8, env="QDRANT_UPSERT_MAX_CONCURRENCY")
+    upsert_max_attempts: int = Field(default=6, env="QDRANT_UPSERT_MAX_ATTEMPTS")
+    upsert_retry_wait: float = Field(default=0.1, env="QDRANT_UPSERT_RETRY_WAIT")
+    delete_batch_size: int = Field(default=10000, env="QDRANT_DELETE_BATCH_SIZE")
+    hnsw_m: int = Field(default=16, env="QDRANT_HNSW_M")
+    indexing_threshold: int = Field(default=10000, env="QDRANT_INDEXING_THRESHOLD")
+    quantization: Optional[str] = Field(default=None, env="QDRANT_QUANTIZATION")
+    search_batch_max_size: int = Field(default=32, env="QDRANT_SEARCH_BATCH_MAX_SIZE")
+    search_batch_wait_ms: float = Field(default=1.0, env="QDRANT_SEARCH_BATCH_WAIT_MS")
+    collection_info_ttl: int = Field(default=30, env="QDRANT_COLLECTION_INFO_TTL")
     
     @property
     def http_url(self) -> str:
@@ -87,12 +99,17 @@ class QdrantSettings(BaseSettings):
 class KafkaSettings(BaseSettings):
     """Kafka configuration settings."""
     
+    enabled: bool = Field(default=True, env="KAFKA_ENABLED")
     brokers: List[str] = Field(default=["localhost:9092"], env="KAFKA_BROKERS")
     topic_prefix: str = Field(default="ai-copilot", env="KAFKA_TOPIC_PREFIX")
     client_id: str = Field(default="ai-copilot-service", env="KAFKA_CLIENT_ID")
     group_id: str = Field(default="ai-copilot-group", env="KAFKA_GROUP_ID")
     auto_offset_reset: str = Field(default="earliest", env="KAFKA_AUTO_OFFSET_RESET")
     enable_auto_commit: bool = Field(default=True, env="KAFKA_ENABLE_AUTO_COMMIT")
+    batch_max_messages: int = Field(default=500, env="KAFKA_BATCH_MAX_MESSAGES")
+    batch_max_bytes: int = Field(default=1048576, env="KAFKA_BATCH_MAX_BYTES")
+    batch_timeout_ms: int = Field(default=100, env="KAFKA_BATCH_TIMEOUT_MS")
+    send_max_retries: int = Field(default=3, env="KAFKA_SEND_MAX_RETRIES")
     
     @validator('brokers', pre=True)
     def parse_brokers(cls, v):
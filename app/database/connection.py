@@ -146,8 +146,12 @@ class DatabaseManager:
     async def _init_qdrant(self):
         """Initialize Qdrant connection."""
         try:
+            # Points and searches go over gRPC (protobuf) when preferred;
+            # the HTTP URL is still used for the connection check and fallback
             self.qdrant_client = AsyncQdrantClient(
                 url=settings.qdrant.http_url,
+                grpc_port=settings.qdrant.grpc_port,
+                prefer_grpc=settings.qdrant.prefer_grpc,
                 api_key=settings.qdrant.api_key,
                 timeout=settings.qdrant.timeout,
             )
@@ -6,7 +6,9 @@ improving performance for frequently accessed documents and search results.
 
 import json
 import hashlib
-from typing import Dict, List, Optional, Any, Union, TypeVar, Generic, Type
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple, Union, TypeVar, Generic, Type
 from datetime import datetime, timedelta
 
 import structlog
@@ -21,6 +23,25 @@ settings = get_settings()
 T = TypeVar('T')
 
 
+def canonical_search_key(query: str, filters: Optional[Any] = None, **params: Any) -> str:
+    """Create a stable hash for a search request.
+    
+    The query is normalized and the filters and search parameters are
+    serialized with sorted keys, so equivalent requests share one key.
+    
+    Args:
+        query: Search query
+        filters: Search filters
+        **params: Other parameters that change the results (limit, threshold, ...)
+        
+    Returns:
+        Hex digest identifying the request
+    """
+    key_data = {"query": query.lower().strip(), "filters": filters or None, **params}
+    hash_input = json.dumps(key_data, sort_keys=True, default=str)
+    return hashlib.md5(hash_input.encode()).hexdigest()
+
+
 class CacheManager(Generic[T]):
     """Cache manager for RAG engine using Redis."""
     
@@ -195,18 +216,50 @@ class SearchCache:
         self.redis = db_manager.get_redis_client()
         self.prefix = "rag:search"
         self.default_ttl = 1800  # 30 minutes default TTL for search results
+        self.generation_key = f"{self.prefix}:generation"
+        
+        # In-process cache in front of Redis for repeated queries
+        self.local = InProcSearchCache()
+    
+    async def get_generation(self) -> Optional[int]:
+        """Get the shared search cache generation.
+        
+        Every document write bumps the generation in Redis. Callers include
+        it in the cache key, so a write on any worker retires the cached
+        searches of every worker, both in Redis and in-process.
+        
+        Returns:
+            Current generation, or None if Redis is unavailable
+        """
+        try:
+            data = await self.redis.get(self.generation_key)
+            return int(data or 0)
+            
+        except Exception as e:
+            logger.error(
+                "Error getting search cache generation",
+                key=self.generation_key,
+                error=str(e)
+            )
+            return None
     
-    async def get_search_results(self, query: str, filters: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+    async def get_search_results(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                                 **params: Any) -> Optional[List[Dict[str, Any]]]:
         """Get cached search results.
         
         Args:
             query: Search query
             filters: Search filters
+            **params: Other search parameters included in the cache key
             
         Returns:
             Cached search results or None if not found
         """
-        cache_key = self._make_search_key(query, filters)
+        local_results = await self.local.get_search_results(query, filters, **params)
+        if local_results is not None:
+            return local_results
+        
+        cache_key = self._make_search_key(query, filters, **params)
         
         try:
             # Get from Redis
@@ -216,7 +269,9 @@ class SearchCache:
                 return None
             
             # Deserialize
-            return json.loads(data)
+            results = json.loads(data)
+            await self.local.set_search_results(query, results, filters, **params)
+            return results
             
         except Exception as e:
             logger.error(
@@ -227,7 +282,8 @@ class SearchCache:
             return None
     
     async def set_search_results(self, query: str, results: List[Dict[str, Any]], 
-                               filters: Optional[Dict[str, Any]] = None, ttl: Optional[int] = None) -> bool:
+                               filters: Optional[Dict[str, Any]] = None, ttl: Optional[int] = None,
+                               **params: Any) -> bool:
         """Cache search results.
         
         Args:
@@ -235,13 +291,16 @@ class SearchCache:
             results: Search results
             filters: Search filters
             ttl: Time to live in seconds (None for default)
+            **params: Other search parameters included in the cache key
             
         Returns:
             Success status
         """
-        cache_key = self._make_search_key(query, filters)
+        cache_key = self._make_search_key(query, filters, **params)
         ttl = ttl if ttl is not None else self.default_ttl
         
+        await self.local.set_search_results(query, results, filters, **params)
+        
         try:
             # Serialize and store in Redis
             data = json.dumps(results)
@@ -264,7 +323,11 @@ class SearchCache:
             return False
     
     async def invalidate_document_cache(self, document_id: str) -> bool:
-        """Invalidate cache for a specific document.
+        """Invalidate cached searches after a document was written.
+        
+        A new or changed document can belong in the results of any query,
+        so the generation is bumped rather than dropping only the searches
+        that returned the document.
         
         Args:
             document_id: Document ID
@@ -272,55 +335,131 @@ class SearchCache:
         Returns:
             Success status
         """
-        pattern = f"{self.prefix}:doc:{document_id}:*"
+        await self.local.invalidate_document_cache(document_id)
         
         try:
-            # Get all keys matching pattern
-            keys = await self.redis.keys(pattern)
-            
-            if keys:
-                # Delete all matching keys
-                await self.redis.delete(*keys)
-                
-                logger.info(
-                    "Invalidated document cache",
-                    document_id=document_id,
-                    keys_count=len(keys)
-                )
+            generation = await self.redis.incr(self.generation_key)
             
+            logger.info(
+                "Invalidated search cache",
+                document_id=document_id,
+                generation=generation
+            )
             return True
             
         except Exception as e:
             logger.error(
-                "Error invalidating document cache",
+                "Error invalidating search cache",
                 document_id=document_id,
                 error=str(e)
             )
             return False
     
-    def _make_search_key(self, query: str, filters: Optional[Dict[str, Any]] = None) -> str:
+    def _make_search_key(self, query: str, filters: Optional[Dict[str, Any]] = None, **params: Any) -> str:
         """Create a cache key for search results.
         
         Args:
             query: Search query
             filters: Search filters
+            **params: Other search parameters
             
         Returns:
             Cache key
         """
-        # Normalize query
-        normalized_query = query.lower().strip()
+        return f"{self.prefix}:query:{canonical_search_key(query, filters, **params)}"
+
+
+class InProcSearchCache:
+    """In-process LRU cache for search results with a per-entry TTL.
+    
+    Serves repeated identical queries without a Redis round-trip. Entries
+    are bounded by ``maxsize`` and expire after ``ttl`` seconds.
+    """
+    
+    def __init__(self, maxsize: int = 512, ttl: int = 60):
+        """Initialize the in-process search cache.
         
-        # Create hash of query and filters
-        key_parts = [normalized_query]
+        Args:
+            maxsize: Maximum number of cached queries
+            ttl: Time to live in seconds
+        """
+        self.maxsize = maxsize
+        self.default_ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+    
+    async def get_generation(self) -> Optional[int]:
+        """Get the cache generation, bumped on every document write.
         
-        if filters:
-            # Sort filters by key for consistent hashing
-            sorted_filters = json.dumps(filters, sort_keys=True)
-            key_parts.append(sorted_filters)
+        Returns:
+            Current generation
+        """
+        return self.generation
+    
+    async def get_search_results(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                                 **params: Any) -> Optional[List[Dict[str, Any]]]:
+        """Get cached search results.
+        
+        Args:
+            query: Search query
+            filters: Search filters
+            **params: Other search parameters included in the cache key
+            
+        Returns:
+            Cached search results or None if not found or expired
+        """
+        cache_key = canonical_search_key(query, filters, **params)
+        entry = self._entries.get(cache_key)
         
-        # Create hash
-        hash_input = "|".join(key_parts)
-        hash_value = hashlib.md5(hash_input.encode()).hexdigest()
+        if entry is None:
+            return None
+        
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            del self._entries[cache_key]
+            return None
+        
+        self._entries.move_to_end(cache_key)
+        return results
+    
+    async def set_search_results(self, query: str, results: List[Dict[str, Any]], 
+                               filters: Optional[Dict[str, Any]] = None, ttl: Optional[int] = None,
+                               **params: Any) -> bool:
+        """Cache search results, evicting the least recently used entry when full.
         
-        return f"{self.prefix}:query:{hash_value}"
\ No newline at end of file
+        Args:
+            query: Search query
+            results: Search results
+            filters: Search filters
+            ttl: Time to live in seconds (None for default)
+            **params: Other search parameters included in the cache key
+            
+        Returns:
+            Success status
+        """
+        cache_key = canonical_search_key(query, filters, **params)
+        ttl = ttl if ttl is not None else self.default_ttl
+        
+        self._entries[cache_key] = (time.monotonic() + ttl, results)
+        self._entries.move_to_end(cache_key)
+        
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        
+        return True
+    
+    async def invalidate_document_cache(self, document_id: str) -> bool:
+        """Drop every cached search after a document was written.
+        
+        A new or changed document can belong in the results of any query,
+        not only those that returned it before.
+        
+        Args:
+            document_id: Document ID
+            
+        Returns:
+            Success status
+        """
+        self._entries.clear()
+        self.generation += 1
+        return True
@@ -204,10 +204,12 @@ class DocumentProcessor:
                 ))
                 chunk_index += 1
             
-            # Move to next chunk with overlap
-            start = end - chunk_overlap
-            if start < end - chunk_overlap:
-                start = end  # Avoid getting stuck in a loop
+            if end >= len(content):
+                break
+            
+            # Move to next chunk with overlap, always making progress
+            next_start = end - chunk_overlap
+            start = next_start if next_start > start else end
         
         return chunks
     
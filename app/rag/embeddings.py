@@ -30,7 +30,8 @@ class EmbeddingProvider:
         self.model_name = model_name or settings.rag.embedding_model
         self._model = None
         self._vector_size = None
-        self._distance_metric = "cosine"
+        # Embeddings are L2-normalized at encode time, so dot product equals cosine
+        self._distance_metric = "dot_normalized"
         
         # Initialize model
         self._initialize_model()
@@ -68,14 +69,14 @@ class EmbeddingProvider:
         """Get the distance metric used by the embedding model."""
         return self._distance_metric
     
-    async def get_embedding(self, text: str) -> List[float]:
+    async def get_embedding(self, text: str) -> np.ndarray:
         """Generate an embedding for a single text.
         
         Args:
             text: Text to embed
             
         Returns:
-            Vector embedding
+            Vector embedding as a float32 array of shape (dim,)
         """
         try:
             # Run in thread pool to avoid blocking
@@ -84,7 +85,7 @@ class EmbeddingProvider:
                 None, self._generate_embedding, text
             )
             
-            return embedding.tolist()
+            return np.asarray(embedding, dtype=np.float32)
             
         except Exception as e:
             logger.error(
@@ -93,14 +94,14 @@ class EmbeddingProvider:
             )
             raise
     
-    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+    async def get_embeddings(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for multiple texts.
         
         Args:
             texts: List of texts to embed
             
         Returns:
-            List of vector embeddings
+            Vector embeddings as one C-contiguous float32 array of shape (n, dim)
         """
         try:
             # Run in thread pool to avoid blocking
@@ -109,7 +110,7 @@ class EmbeddingProvider:
                 None, self._generate_embeddings, texts
             )
             
-            return [embedding.tolist() for embedding in embeddings]
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
             
         except Exception as e:
             logger.error(
@@ -134,14 +135,14 @@ class EmbeddingProvider:
         # Generate embedding
         return self._model.encode(text, normalize_embeddings=True)
     
-    def _generate_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+    def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings synchronously.
         
         Args:
             texts: List of texts to embed
             
         Returns:
-            List of vector embeddings
+            Vector embeddings, one row per text
         """
         # Ensure model is initialized
         if self._model is None:
@@ -160,18 +161,37 @@ class EmbeddingProvider:
         Returns:
             Similarity score (0-1)
         """
-        # Convert to numpy arrays
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        # Convert to float32 numpy arrays (no copy if already float32)
+        vec1 = np.asarray(embedding1, dtype=np.float32)
+        vec2 = np.asarray(embedding2, dtype=np.float32)
         
         # Calculate cosine similarity
         similarity = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
         
         return float(similarity)
+    
+    def calculate_similarity_matrix(self, query: np.ndarray, corpus: np.ndarray) -> np.ndarray:
+        """Calculate similarity between a query and every row of a corpus matrix.
+        
+        Embeddings produced by this provider are normalized, so the dot
+        product equals cosine similarity and a single matrix-vector product
+        scores the whole corpus.
+        
+        Args:
+            query: Normalized query embedding of shape (dim,)
+            corpus: Normalized embeddings of shape (n, dim)
+            
+        Returns:
+            Similarity scores of shape (n,)
+        """
+        query = np.asarray(query, dtype=np.float32)
+        corpus = np.asarray(corpus, dtype=np.float32)
+        
+        return corpus @ query
 
 
 # Factory function to get embedding provider with caching
-@lru_cache(maxsize=2)  # Cache up to 2 different model instances
+@lru_cache(maxsize=4)  # Cache up to 4 different model instances; older ones can be collected
 def get_embedding_provider(model_name: Optional[str] = None) -> EmbeddingProvider:
     """Get an embedding provider instance with caching.
     
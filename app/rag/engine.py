@@ -10,6 +10,7 @@ import time
 from datetime import datetime
 import uuid
 
+import numpy as np
 import structlog
 from pydantic import BaseModel, Field
 
@@ -18,16 +19,27 @@ from app.database.connection import DatabaseManager
 from app.rag.models import (
     Document, 
     DocumentChunk, 
+    DocumentType,
     SearchQuery, 
     SearchResult,
     SearchFilter
 )
 from app.rag.embeddings import EmbeddingProvider
-from app.rag.vector_store import VectorStore
+from app.rag.vector_store import VectorStore, uuid7_ids
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
 
+# Collection suffix for each document type; documents are written to and
+# deleted from exactly these collections
+COLLECTION_SUFFIXES: Dict[str, str] = {
+    DocumentType.DOCUMENT.value: "documents",
+    DocumentType.POLICY.value: "policies",
+    DocumentType.MANUAL.value: "manuals",
+    DocumentType.FAQ.value: "faqs",
+    DocumentType.KNOWLEDGE_BASE.value: "knowledge_bases"
+}
+
 
 class RAGEngine:
     """RAG Engine for document processing and retrieval."""
@@ -54,18 +66,12 @@ class RAGEngine:
             await self.vector_store.initialize()
             
             # Create default collections if they don't exist
-            default_collections = [
-                f"{self.collection_prefix}_documents",
-                f"{self.collection_prefix}_policies",
-                f"{self.collection_prefix}_manuals",
-                f"{self.collection_prefix}_faqs"
-            ]
-            
-            for collection_name in default_collections:
+            for collection_name in self._default_collections():
                 await self.vector_store.create_collection_if_not_exists(
                     collection_name=collection_name,
                     vector_size=self.embedding_provider.vector_size,
-                    distance=self.embedding_provider.distance_metric
+                    distance=self.embedding_provider.distance_metric,
+                    quantization=settings.qdrant.quantization
                 )
             
             logger.info("RAG engine initialized successfully")
@@ -77,12 +83,17 @@ class RAGEngine:
     async def process_document(
         self, 
         document: Document,
+        chunks: Optional[List[DocumentChunk]] = None,
         collection_name: Optional[str] = None
     ) -> Dict[str, Any]:
         """Process a document for RAG.
         
+        All chunk texts are embedded with a single provider call and
+        written with one batched upsert.
+        
         Args:
             document: Document to process
+            chunks: Optional pre-computed chunks; the document is chunked when omitted
             collection_name: Optional collection name override
             
         Returns:
@@ -93,32 +104,26 @@ class RAGEngine:
         try:
             # Determine collection name
             if not collection_name:
-                collection_name = f"{self.collection_prefix}_documents"
-                if document.document_type:
-                    collection_name = f"{self.collection_prefix}_{document.document_type}s"
+                collection_name = self._collection_name(document)
             
             # Generate document ID if not provided
             if not document.id:
                 document.id = str(uuid.uuid4())
             
-            # Split document into chunks
-            chunks = self._chunk_document(document)
+            # Split document into chunks unless the caller already has them
+            if chunks is None:
+                chunks = self._chunk_document(document)
             
-            # Generate embeddings for chunks
-            chunk_embeddings = await self.embedding_provider.get_embeddings(
-                [chunk.content for chunk in chunks]
-            )
+            # Generate embeddings for all chunks in one batch
+            chunk_embeddings = await self._embed_chunks(chunks)
             
             # Store chunks in vector database
-            chunk_ids = []
-            for i, chunk in enumerate(chunks):
-                chunk_id = await self.vector_store.add_vector(
-                    collection_name=collection_name,
-                    vector=chunk_embeddings[i],
-                    payload=chunk.dict(),
-                    id=str(uuid.uuid4())
-                )
-                chunk_ids.append(chunk_id)
+            chunk_ids = await self.vector_store.add_vectors(
+                collection_name=collection_name,
+                vectors=chunk_embeddings,
+                payloads=[chunk.dict() for chunk in chunks],
+                ids=uuid7_ids(len(chunks))
+            )
             
             processing_time = time.time() - start_time
             
@@ -149,6 +154,154 @@ class RAGEngine:
             )
             raise
     
+    async def process_documents(
+        self,
+        documents: List[Tuple[Document, List[DocumentChunk]]]
+    ) -> List[Dict[str, Any]]:
+        """Process several pre-chunked documents for RAG.
+        
+        Chunks from every document are embedded with a single provider call
+        and written with one upsert per collection.
+        
+        Args:
+            documents: (document, chunks) pairs to process
+            
+        Returns:
+            Processing results for each document, in input order
+        """
+        start_time = time.time()
+        
+        try:
+            for document, _ in documents:
+                if not document.id:
+                    document.id = str(uuid.uuid4())
+            
+            # Generate embeddings for all chunks in one batch
+            chunk_embeddings = await self._embed_chunks(
+                [chunk for _, chunks in documents for chunk in chunks]
+            )
+            
+            # Group vectors by target collection
+            batches: Dict[str, Dict[str, list]] = {}
+            vector_ids: List[List[str]] = []
+            offset = 0
+            for document, chunks in documents:
+                collection_name = self._collection_name(document)
+                batch = batches.setdefault(collection_name, {"ids": [], "vectors": [], "payloads": []})
+                ids = uuid7_ids(len(chunks))
+                batch["ids"].extend(ids)
+                batch["vectors"].append(chunk_embeddings[offset:offset + len(chunks)])
+                batch["payloads"].extend(chunk.dict() for chunk in chunks)
+                vector_ids.append(ids)
+                offset += len(chunks)
+            
+            # Store chunks in vector database
+            for collection_name, batch in batches.items():
+                await self.vector_store.add_vectors(
+                    collection_name=collection_name,
+                    vectors=np.concatenate(batch["vectors"]),
+                    payloads=batch["payloads"],
+                    ids=batch["ids"]
+                )
+            
+            processing_time = time.time() - start_time
+            
+            logger.info(
+                "Documents processed successfully",
+                documents=len(documents),
+                chunks=offset,
+                collections=len(batches),
+                time_ms=round(processing_time * 1000, 2)
+            )
+            
+            return [
+                {
+                    "document_id": document.id,
+                    "chunks_created": len(chunks),
+                    "embedding_model": self.embedding_provider.model_name,
+                    "vector_ids": ids,
+                    "collection_name": self._collection_name(document)
+                }
+                for (document, chunks), ids in zip(documents, vector_ids)
+            ]
+            
+        except Exception as e:
+            logger.error(
+                "Failed to process documents",
+                documents=len(documents),
+                error=str(e)
+            )
+            raise
+    
+    async def _embed_chunks(self, chunks: List[DocumentChunk]) -> np.ndarray:
+        """Embed chunks with one provider call, once per distinct content hash.
+        
+        Chunks repeating the same text (shared boilerplate, or the same
+        section in several documents) reuse one embedding row.
+        
+        Args:
+            chunks: Chunks to embed
+            
+        Returns:
+            Embedding matrix with one row per chunk, in input order
+        """
+        rows: Dict[str, int] = {}
+        texts: List[str] = []
+        chunk_rows: List[int] = []
+        for chunk in chunks:
+            row = rows.setdefault(chunk.content_hash, len(texts))
+            if row == len(texts):
+                texts.append(chunk.content)
+            chunk_rows.append(row)
+        
+        embeddings = await self.embedding_provider.get_embeddings(texts)
+        if len(texts) == len(chunks):
+            return embeddings
+        return np.asarray(embeddings)[chunk_rows]
+    
+    async def delete_document(self, document_id: str) -> bool:
+        """Delete a document's chunks from every default collection.
+        
+        Chunks are selected by their document_id payload, so the chunk IDs
+        don't need to be known.
+        
+        Args:
+            document_id: ID of the document to delete
+            
+        Returns:
+            Success status
+        """
+        try:
+            await asyncio.gather(*[
+                self.vector_store.delete_by_document(collection_name, document_id)
+                for collection_name in self._default_collections()
+            ])
+            
+            logger.info("Document vectors deleted", document_id=document_id)
+            return True
+            
+        except Exception as e:
+            logger.error(
+                "Failed to delete document vectors",
+                document_id=document_id,
+                error=str(e)
+            )
+            raise
+    
+    def _default_collections(self) -> List[str]:
+        """Return the collections created at initialization, one per document type."""
+        return [f"{self.collection_prefix}_{suffix}" for suffix in COLLECTION_SUFFIXES.values()]
+    
+    def _collection_name(self, document: Document) -> str:
+        """Return the default collection for a document's type.
+        
+        Unknown types fall back to the documents collection, so every
+        document lands in a collection that ``delete_document`` covers.
+        """
+        document_type = getattr(document.document_type, "value", document.document_type)
+        suffix = COLLECTION_SUFFIXES.get(document_type, COLLECTION_SUFFIXES[DocumentType.DOCUMENT.value])
+        return f"{self.collection_prefix}_{suffix}"
+    
     async def search(
         self,
         query: SearchQuery
@@ -280,9 +433,11 @@ class RAGEngine:
                 ))
                 chunk_index += 1
             
-            # Move to next chunk with overlap
-            start = end - chunk_overlap
-            if start < end - chunk_overlap:
-                start = end  # Avoid getting stuck in a loop
+            if end >= len(content):
+                break
+            
+            # Move to next chunk with overlap, always making progress
+            next_start = end - chunk_overlap
+            start = next_start if next_start > start else end
         
         return chunks
\ No newline at end of file
@@ -5,8 +5,9 @@ and retrieval operations in the RAG engine.
 """
 
 import json
-from typing import Dict, List, Optional, Any, Union, Callable
+from typing import Deque, Dict, List, Optional, Any, Tuple, Union, Callable
 import asyncio
+from collections import defaultdict, deque
 from datetime import datetime
 
 import structlog
@@ -39,11 +40,25 @@ class KafkaManager:
     
     def __init__(self):
         """Initialize the Kafka manager."""
-        self.bootstrap_servers = settings.kafka.bootstrap_servers
+        self.bootstrap_servers = settings.kafka.brokers
         self.producer = None
         self.consumers = {}
         self.handlers = {}
         self.running = False
+        
+        # Batching: messages are queued per topic and sent as one record batch
+        # once a size threshold is hit or the flush interval elapses
+        self.batch_max_messages = settings.kafka.batch_max_messages
+        self.batch_max_bytes = settings.kafka.batch_max_bytes
+        self.batch_timeout_ms = settings.kafka.batch_timeout_ms
+        self.send_max_retries = settings.kafka.send_max_retries
+        # Queued (value, failed attempts) pairs per topic
+        self._pending: Dict[str, Deque[Tuple[bytes, int]]] = defaultdict(deque)
+        self._pending_bytes: Dict[str, int] = defaultdict(int)
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        # Next partition per topic, so successive batches spread across partitions
+        self._next_partition: Dict[str, int] = defaultdict(int)
     
     async def initialize(self):
         """Initialize Kafka producer and consumers."""
@@ -55,6 +70,9 @@ class KafkaManager:
             )
             await self.producer.start()
             
+            # Start periodic flushing of batched messages
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            
             logger.info("Kafka producer initialized", bootstrap_servers=self.bootstrap_servers)
             return True
             
@@ -70,6 +88,19 @@ class KafkaManager:
         """Shutdown Kafka producer and consumers."""
         self.running = False
         
+        # Stop periodic flushing and send whatever is still queued
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("Error flushing Kafka batches", error=str(e))
+        
         # Stop all consumers
         for topic, consumer in self.consumers.items():
             try:
@@ -86,6 +117,33 @@ class KafkaManager:
             except Exception as e:
                 logger.error("Error stopping Kafka producer", error=str(e))
     
+    def _ingestion_message(self, document: Document) -> KafkaMessage:
+        """Build a document ingestion message."""
+        return KafkaMessage(
+            message_id=document.id or str(datetime.utcnow().timestamp()),
+            message_type="document_ingestion",
+            timestamp=datetime.utcnow(),
+            payload=document.dict()
+        )
+    
+    def _update_message(self, document: Document) -> KafkaMessage:
+        """Build a document update message."""
+        return KafkaMessage(
+            message_id=document.id,
+            message_type="document_update",
+            timestamp=datetime.utcnow(),
+            payload=document.dict()
+        )
+    
+    def _delete_message(self, document_id: str) -> KafkaMessage:
+        """Build a document delete message."""
+        return KafkaMessage(
+            message_id=document_id,
+            message_type="document_delete",
+            timestamp=datetime.utcnow(),
+            payload={"document_id": document_id}
+        )
+    
     async def send_document_ingestion_message(self, document: Document) -> bool:
         """Send document ingestion message to Kafka.
         
@@ -95,14 +153,9 @@ class KafkaManager:
         Returns:
             Success status
         """
-        message = KafkaMessage(
-            message_id=document.id or str(datetime.utcnow().timestamp()),
-            message_type="document_ingestion",
-            timestamp=datetime.utcnow(),
-            payload=document.dict()
-        )
+        message = self._ingestion_message(document)
         
-        return await self._send_message(self.DOCUMENT_INGESTION_TOPIC, message.dict())
+        return await self._send_message(self.DOCUMENT_INGESTION_TOPIC, message.model_dump(mode="json"))
     
     async def send_document_search_message(self, query: SearchQuery) -> bool:
         """Send document search message to Kafka.
@@ -120,7 +173,7 @@ class KafkaManager:
             payload=query.dict()
         )
         
-        return await self._send_message(self.DOCUMENT_SEARCH_TOPIC, message.dict())
+        return await self._send_message(self.DOCUMENT_SEARCH_TOPIC, message.model_dump(mode="json"))
     
     async def send_document_update_message(self, document: Document) -> bool:
         """Send document update message to Kafka.
@@ -131,14 +184,9 @@ class KafkaManager:
         Returns:
             Success status
         """
-        message = KafkaMessage(
-            message_id=document.id,
-            message_type="document_update",
-            timestamp=datetime.utcnow(),
-            payload=document.dict()
-        )
+        message = self._update_message(document)
         
-        return await self._send_message(self.DOCUMENT_UPDATE_TOPIC, message.dict())
+        return await self._send_message(self.DOCUMENT_UPDATE_TOPIC, message.model_dump(mode="json"))
     
     async def send_document_delete_message(self, document_id: str) -> bool:
         """Send document delete message to Kafka.
@@ -149,14 +197,226 @@ class KafkaManager:
         Returns:
             Success status
         """
-        message = KafkaMessage(
-            message_id=document_id,
-            message_type="document_delete",
-            timestamp=datetime.utcnow(),
-            payload={"document_id": document_id}
-        )
+        message = self._delete_message(document_id)
+        
+        return await self._send_message(self.DOCUMENT_DELETE_TOPIC, message.model_dump(mode="json"))
+    
+    async def enqueue_ingestion(self, document: Document) -> bool:
+        """Queue a document ingestion message for batched sending.
+        
+        Args:
+            document: Ingested document
+            
+        Returns:
+            Success status
+        """
+        return await self.enqueue(self.DOCUMENT_INGESTION_TOPIC, self._ingestion_message(document))
+    
+    async def enqueue_update(self, document: Document) -> bool:
+        """Queue a document update message for batched sending.
+        
+        Args:
+            document: Updated document
+            
+        Returns:
+            Success status
+        """
+        return await self.enqueue(self.DOCUMENT_UPDATE_TOPIC, self._update_message(document))
+    
+    async def enqueue_delete(self, document_id: str) -> bool:
+        """Queue a document delete message for batched sending.
+        
+        Args:
+            document_id: ID of deleted document
+            
+        Returns:
+            Success status
+        """
+        return await self.enqueue(self.DOCUMENT_DELETE_TOPIC, self._delete_message(document_id))
+    
+    async def enqueue(self, topic: str, message: KafkaMessage) -> bool:
+        """Queue a message for a topic, flushing the topic if a batch limit is reached.
+        
+        Args:
+            topic: Kafka topic
+            message: Message to queue
+            
+        Returns:
+            Success status
+        """
+        if not self.producer:
+            logger.error("Kafka producer not initialized")
+            return False
+        
+        value = message.json().encode('utf-8')
+        self._pending[topic].append((value, 0))
+        self._pending_bytes[topic] += len(value)
+        
+        if (len(self._pending[topic]) >= self.batch_max_messages
+                or self._pending_bytes[topic] >= self.batch_max_bytes):
+            return await self.flush(topic)
+        
+        return True
+    
+    async def flush(self, topic: Optional[str] = None) -> bool:
+        """Send all queued messages.
+        
+        Messages that are not delivered are put back at the front of their
+        topic's queue and sent again by the next flush, up to
+        ``send_max_retries`` retries. Messages too large for a record batch
+        can never be sent and are dropped at once. Dropped messages are
+        logged and make the flush report failure.
+        
+        Args:
+            topic: Optional topic to flush; all topics when omitted
+            
+        Returns:
+            Success status
+        """
+        success = True
+        
+        async with self._flush_lock:
+            topics = [topic] if topic else list(self._pending)
+            for batch_topic in topics:
+                pending = self._pending.get(batch_topic)
+                if not pending:
+                    continue
+                
+                messages = list(pending)
+                pending.clear()
+                self._pending_bytes[batch_topic] = 0
+                
+                handled, rejected = 0, 0
+                try:
+                    handled, rejected = await self._send_batches(
+                        batch_topic, [value for value, _ in messages]
+                    )
+                finally:
+                    if rejected:
+                        success = False
+                    if handled < len(messages):
+                        # Re-queue undelivered messages ahead of any queued meanwhile
+                        unsent = [(value, attempts + 1) for value, attempts in messages[handled:]]
+                        retry = [(value, attempts) for value, attempts in unsent if attempts <= self.send_max_retries]
+                        if len(retry) < len(unsent):
+                            logger.error(
+                                "Dropping Kafka messages after retries",
+                                topic=batch_topic,
+                                messages=len(unsent) - len(retry),
+                                retries=self.send_max_retries
+                            )
+                        pending.extendleft(reversed(retry))
+                        self._pending_bytes[batch_topic] += sum(len(value) for value, _ in retry)
+                        success = False
+        
+        return success
+    
+    async def send_batch(self, topic: str, messages: List[bytes]) -> bool:
+        """Send serialized messages to a topic as record batches.
+        
+        Messages are appended to a producer batch until it is full, so a
+        single request carries many messages.
+        
+        Args:
+            topic: Kafka topic
+            messages: Serialized message values
+            
+        Returns:
+            Success status
+        """
+        handled, rejected = await self._send_batches(topic, messages)
+        return handled == len(messages) and not rejected
+    
+    async def _send_batches(self, topic: str, messages: List[bytes]) -> Tuple[int, int]:
+        """Send serialized messages as record batches, stopping at the first failure.
+        
+        A message that does not fit in an empty record batch is rejected
+        and logged instead of being sent.
+        
+        Args:
+            topic: Kafka topic
+            messages: Serialized message values
+            
+        Returns:
+            Number of leading messages that were delivered or rejected, and
+            how many of those were rejected
+        """
+        if not self.producer:
+            logger.error("Kafka producer not initialized")
+            return 0, 0
+        
+        # Leading messages handled so far and, of those, how many were rejected
+        sent = 0
+        rejected = 0
+        try:
+            partitions = sorted(await self.producer.partitions_for(topic))
+            
+            batch = self.producer.create_batch()
+            batch_size = 0
+            for value in messages:
+                if batch.append(key=None, value=value, timestamp=None) is not None:
+                    batch_size += 1
+                    continue
+                
+                if batch_size:
+                    # Batch is full; send it and retry the message in a new one
+                    await self._send_record_batch(topic, batch, self._partition_for(topic, partitions))
+                    sent += batch_size
+                    batch = self.producer.create_batch()
+                    batch_size = 0
+                    if batch.append(key=None, value=value, timestamp=None) is not None:
+                        batch_size += 1
+                        continue
+                
+                # Too large even for an empty batch; it can never be sent
+                logger.error(
+                    "Kafka message exceeds the record batch size",
+                    topic=topic,
+                    size=len(value)
+                )
+                sent += 1
+                rejected += 1
+            
+            if batch_size:
+                await self._send_record_batch(topic, batch, self._partition_for(topic, partitions))
+                sent += batch_size
+            
+            logger.debug(
+                "Message batch sent to Kafka",
+                topic=topic,
+                messages=len(messages)
+            )
+            
+        except Exception as e:
+            logger.error(
+                "Failed to send message batch to Kafka",
+                topic=topic,
+                messages=len(messages),
+                sent=sent,
+                error=str(e)
+            )
         
-        return await self._send_message(self.DOCUMENT_DELETE_TOPIC, message.dict())
+        return sent, rejected
+    
+    def _partition_for(self, topic: str, partitions: List[int]) -> int:
+        """Pick the next partition for a topic in round-robin order."""
+        index = self._next_partition[topic]
+        self._next_partition[topic] = index + 1
+        return partitions[index % len(partitions)]
+    
+    async def _send_record_batch(self, topic: str, batch: Any, partition: int):
+        """Send one record batch and wait for delivery."""
+        delivery = await self.producer.send_batch(batch, topic, partition=partition)
+        await delivery
+    
+    async def _flush_loop(self):
+        """Flush queued messages every batch_timeout_ms."""
+        while True:
+            await asyncio.sleep(self.batch_timeout_ms / 1000)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Error flushing Kafka batches", error=str(e))
     
     async def _send_message(self, topic: str, message: Dict[str, Any]) -> bool:
         """Send message to Kafka topic.
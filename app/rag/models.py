@@ -7,10 +7,26 @@ chunking, embedding, and retrieval operations.
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 from enum import Enum
+import hashlib
 
 from pydantic import BaseModel, Field, validator
 
 
+def compute_content_hash(text: str) -> str:
+    """Compute a stable content hash for chunk text.
+    
+    Uses BLAKE2b with a 16-byte digest, which is faster than SHA-256
+    and needs no extra dependency.
+    
+    Args:
+        text: Chunk text
+        
+    Returns:
+        32-character hex digest
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
 class DocumentType(str, Enum):
     """Document type enumeration."""
     DOCUMENT = "document"
@@ -54,6 +70,11 @@ class DocumentChunk(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     document_type: Optional[str] = None
     chunk_index: int = 0
+    content_hash: Optional[str] = None
+    
+    @validator('content_hash', pre=True, always=True)
+    def set_content_hash(cls, v, values):
+        return v or compute_content_hash(values.get('content', ''))
 
 
 class SearchFilter(BaseModel):
@@ -6,10 +6,12 @@ and provides the core functionality for document ingestion, search, and retrieva
 
 from typing import Dict, List, Optional, Any, Union, Tuple
 import asyncio
+import json
 from datetime import datetime
 
 import structlog
 from pydantic import BaseModel
+from pymongo import UpdateOne
 
 from app.config.settings import get_settings
 from app.database.connection import DatabaseManager
@@ -25,6 +27,35 @@ logger = structlog.get_logger(__name__)
 settings = get_settings()
 
 
+def _normalize_filters(filters: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Deduplicate search filters and order them by field.
+    
+    Equivalent filter lists in any order normalize to the same list, so
+    they share a search cache entry. Items missing a field or value are
+    dropped, as the vector store ignores them anyway.
+    
+    Args:
+        filters: Filter dicts with field, value and optional operator
+        
+    Returns:
+        Normalized filter dicts
+    """
+    if not filters:
+        return []
+    
+    unique = {}
+    for item in filters:
+        field = item.get("field")
+        value = item.get("value")
+        if field is None or value is None:
+            continue
+        operator = item.get("operator") or "=="
+        key = (field, operator, json.dumps(value, sort_keys=True, default=str))
+        unique[key] = {"field": field, "value": value, "operator": operator}
+    
+    return [unique[key] for key in sorted(unique)]
+
+
 class RAGService:
     """Main service for RAG functionality."""
     
@@ -82,6 +113,17 @@ class RAGService:
             logger.error("Failed to initialize RAG service", error=str(e))
             return False
     
+    async def flush(self) -> bool:
+        """Send any queued Kafka messages immediately.
+        
+        Returns:
+            Success status
+        """
+        if not settings.kafka.enabled:
+            return True
+        
+        return await self.kafka_manager.flush()
+    
     async def register_kafka_handlers(self):
         """Register Kafka message handlers."""
         # Register document ingestion handler
@@ -129,15 +171,17 @@ class RAGService:
                 upsert=True
             )
             
-            # Store document chunks in vector database
-            vector_ids = await self.engine.process_document(processed_document, chunks)
+            # Embed all chunks in one batch and store them in the vector database
+            result = await self.engine.process_document(processed_document, chunks)
+            vector_ids = result["vector_ids"]
             
-            # Cache document
+            # Cache document; cached searches may now be missing it
             await self.document_cache.set(processed_document.id, processed_document)
+            await self.search_cache.invalidate_document_cache(processed_document.id)
             
-            # Send Kafka message if enabled
+            # Queue Kafka message if enabled
             if settings.kafka.enabled:
-                await self.kafka_manager.send_document_ingestion_message(processed_document)
+                await self.kafka_manager.enqueue_ingestion(processed_document)
             
             logger.info(
                 "Document ingested",
@@ -157,6 +201,64 @@ class RAGService:
             )
             return False, None, None
     
+    async def ingest_documents(self, documents: List[Document]) -> Tuple[bool, List[str], List[str]]:
+        """Ingest several documents with one bulk write per backing store.
+        
+        Args:
+            documents: Documents to ingest
+            
+        Returns:
+            Tuple of (success, document_ids, vector_ids)
+        """
+        if not documents:
+            return True, [], []
+        
+        try:
+            # Process documents
+            processed = [self.document_processor.process_document(document) for document in documents]
+            
+            # Store documents in MongoDB with a single bulk write
+            await self.documents_collection.bulk_write(
+                [
+                    UpdateOne({"id": document.id}, {"$set": document.dict()}, upsert=True)
+                    for document, _ in processed
+                ],
+                ordered=False
+            )
+            
+            # Embed all chunks from every document in one batch and store them in the vector database
+            results = await self.engine.process_documents(processed)
+            
+            for document, _ in processed:
+                # Cache document
+                await self.document_cache.set(document.id, document)
+                
+                # Queue Kafka message if enabled; queued messages are sent as one batch
+                if settings.kafka.enabled:
+                    await self.kafka_manager.enqueue_ingestion(document)
+            
+            # One invalidation covers the whole batch
+            await self.search_cache.invalidate_document_cache(processed[0][0].id)
+            
+            document_ids = [document.id for document, _ in processed]
+            vector_ids = [vector_id for result in results for vector_id in result["vector_ids"]]
+            
+            logger.info(
+                "Documents ingested",
+                documents=len(document_ids),
+                vectors=len(vector_ids)
+            )
+            
+            return True, document_ids, vector_ids
+            
+        except Exception as e:
+            logger.error(
+                "Bulk document ingestion failed",
+                documents=len(documents),
+                error=str(e)
+            )
+            return False, [], []
+    
     async def search(self, query: SearchQuery) -> List[SearchResult]:
         """Search for documents matching the query.
         
@@ -167,16 +269,30 @@ class RAGService:
             List of search results
         """
         try:
-            # Check cache first
-            cached_results = await self.search_cache.get_search_results(
-                query.query,
-                query.filters.dict() if query.filters else None
-            )
+            # Everything that changes the results is part of the cache key. The
+            # generation is read once, before searching, so results computed
+            # before a concurrent document write are never cached as current.
+            limit = query.max_results or settings.rag.max_results
+            similarity_threshold = query.similarity_threshold or settings.rag.similarity_threshold
+            filters = _normalize_filters(query.filters)
+            generation = await self.search_cache.get_generation()
+            cache_params = {
+                "filters": filters,
+                "collection_name": query.collection_name,
+                "max_results": limit,
+                "similarity_threshold": similarity_threshold,
+                "generation": generation
+            }
+            
+            # Check cache first; without a generation the cache can't be trusted
+            cached_results = None
+            if generation is not None:
+                cached_results = await self.search_cache.get_search_results(query.query, **cache_params)
             
             if cached_results:
                 logger.info(
                     "Search results retrieved from cache",
-                    query=query.query_text,
+                    query=query.query,
                     results_count=len(cached_results)
                 )
                 return [SearchResult(**result) for result in cached_results]
@@ -184,17 +300,18 @@ class RAGService:
             # Perform search
             results = await self.engine.search(
                 query.query,
-                filters=query.filters,
-                limit=query.max_results or settings.rag.max_results,
-                similarity_threshold=query.similarity_threshold or settings.rag.similarity_threshold
+                filters=filters,
+                limit=limit,
+                similarity_threshold=similarity_threshold
             )
             
             # Cache results
-            await self.search_cache.set_search_results(
-                query.query_text,
-                [result.dict() for result in results],
-                query.filters.dict() if query.filters else None
-            )
+            if generation is not None:
+                await self.search_cache.set_search_results(
+                    query.query,
+                    [result.dict() for result in results],
+                    **cache_params
+                )
             
             # Send Kafka message if enabled
             if settings.kafka.enabled:
@@ -287,16 +404,17 @@ class RAGService:
             # Delete existing vectors
             await self.engine.delete_document(processed_document.id)
             
-            # Store document chunks in vector database
-            vector_ids = await self.engine.process_document(processed_document, chunks)
+            # Embed all chunks in one batch and store them in the vector database
+            result = await self.engine.process_document(processed_document, chunks)
+            vector_ids = result["vector_ids"]
             
             # Update cache
             await self.document_cache.set(processed_document.id, processed_document)
             await self.search_cache.invalidate_document_cache(processed_document.id)
             
-            # Send Kafka message if enabled
+            # Queue Kafka message if enabled
             if settings.kafka.enabled:
-                await self.kafka_manager.send_document_update_message(processed_document)
+                await self.kafka_manager.enqueue_update(processed_document)
             
             logger.info(
                 "Document updated",
@@ -343,9 +461,9 @@ class RAGService:
             await self.document_cache.delete(document_id)
             await self.search_cache.invalidate_document_cache(document_id)
             
-            # Send Kafka message if enabled
+            # Queue Kafka message if enabled
             if settings.kafka.enabled:
-                await self.kafka_manager.send_document_delete_message(document_id)
+                await self.kafka_manager.enqueue_delete(document_id)
             
             logger.info(
                 "Document deleted",
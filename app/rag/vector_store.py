@@ -4,15 +4,23 @@ This module provides the vector database integration for the RAG engine,
 handling collection management, vector storage, and similarity search operations.
 """
 
-from typing import Dict, List, Optional, Any, Union
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Tuple, Union
 import asyncio
+import secrets
 import time
+from collections import defaultdict
+from functools import lru_cache
+import uuid
 from datetime import datetime
 
+import numpy as np
 import structlog
+from grpc import StatusCode
+from grpc.aio import AioRpcError
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
-from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
 
 from app.config.settings import get_settings
 from app.database.connection import DatabaseManager
@@ -20,6 +28,252 @@ from app.database.connection import DatabaseManager
 logger = structlog.get_logger(__name__)
 settings = get_settings()
 
+# Distance names accepted by create_collection_if_not_exists. Dot product on
+# L2-normalized vectors ranks like cosine without Qdrant normalizing each vector
+_DISTANCES = {
+    "cosine": qdrant_models.Distance.COSINE,
+    "euclid": qdrant_models.Distance.EUCLID,
+    "dot": qdrant_models.Distance.DOT,
+    "dot_normalized": qdrant_models.Distance.DOT,
+}
+
+# Quantization options accepted by create_collection_if_not_exists. int8
+# scalar quantization keeps a 4x smaller copy of the vectors in RAM for search
+_QUANTIZATIONS = {
+    "scalar_int8": qdrant_models.ScalarQuantization(
+        scalar=qdrant_models.ScalarQuantizationConfig(
+            type=qdrant_models.ScalarType.INT8,
+            always_ram=True
+        )
+    ),
+}
+
+
+def _is_backpressure(error: BaseException) -> bool:
+    """Whether Qdrant rejected a request because it is overloaded."""
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code in (429, 503)
+    if isinstance(error, AioRpcError):
+        return error.code() in (StatusCode.RESOURCE_EXHAUSTED, StatusCode.UNAVAILABLE)
+    return False
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Whether a failed request may succeed if sent again."""
+    return isinstance(error, ResponseHandlingException) or _is_backpressure(error)
+
+
+class _AdaptiveLimiter:
+    """Concurrency limit that adapts to server backpressure.
+    
+    The limit halves whenever Qdrant reports it is overloaded and grows
+    back by one per successful request, up to the configured maximum.
+    """
+    
+    def __init__(self, limit: int):
+        """Initialize the limiter.
+        
+        Args:
+            limit: Maximum concurrent requests
+        """
+        self.max_limit = limit
+        self.limit = limit
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+    
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+    
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+    
+    def backoff(self):
+        """Halve the limit after a backpressure response."""
+        self.limit = max(1, self.limit // 2)
+    
+    def recover(self):
+        """Raise the limit by one after a successful request."""
+        self.limit = min(self.max_limit, self.limit + 1)
+
+
+def uuid7_ids(n: int) -> List[str]:
+    """Generate ``n`` time-ordered UUIDv7 strings that sort in generation order.
+    
+    The 48-bit millisecond timestamp leads, and the 74 random bits after it
+    start at a random value and count up (RFC 9562 monotonic random), so
+    a batch gets increasing IDs even within one millisecond.
+    
+    Args:
+        n: Number of IDs
+        
+    Returns:
+        UUID strings in ascending order
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    # Leave headroom so counting up never overflows the 74 bits
+    start = secrets.randbits(73)
+    ids = []
+    
+    for sequence in range(start, start + n):
+        value = (
+            (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+            | 0x7 << 76
+            | (sequence >> 62) << 64
+            | 0b10 << 62
+            | (sequence & 0x3FFFFFFFFFFFFFFF)
+        )
+        ids.append(str(uuid.UUID(int=value)))
+    
+    return ids
+
+
+@lru_cache(maxsize=1024)
+def _compile_filter(items: Tuple[Tuple[str, str, Any], ...]) -> Optional[qdrant_models.Filter]:
+    """Build a Qdrant filter from (field, operator, value) items.
+    
+    Cached so repeated searches with the same filters reuse one validated
+    Filter model instead of rebuilding it on every call.
+    
+    Args:
+        items: Sorted filter items with hashable values
+        
+    Returns:
+        Qdrant filter, or None when no item has a supported operator
+    """
+    must = []
+    must_not = []
+    
+    for field, operator, value in items:
+        if operator in ("==", "!="):
+            match = qdrant_models.MatchValue(value=value)
+        elif operator in ("in", "not_in"):
+            match = qdrant_models.MatchAny(any=list(value))
+        else:
+            continue
+        
+        condition = qdrant_models.FieldCondition(key=field, match=match)
+        if operator in ("!=", "not_in"):
+            must_not.append(condition)
+        else:
+            must.append(condition)
+    
+    if not must and not must_not:
+        return None
+    
+    return qdrant_models.Filter(must=must or None, must_not=must_not or None)
+
+
+class _SearchCoalescer:
+    """Coalesces concurrent searches into batched search requests.
+    
+    A search is sent straight away when no other search for its collection
+    is in flight, so a lone search never waits. While one is in flight,
+    further searches are queued per collection and sent together once
+    ``max_batch_size`` are waiting or ``max_wait_ms`` has passed since the
+    first one arrived. Each caller awaits a future resolved with its own
+    slice of the batch response.
+    """
+    
+    def __init__(
+        self,
+        send_batch: Callable[[str, List[qdrant_models.SearchRequest]], Awaitable[List[List[Any]]]],
+        max_batch_size: int,
+        max_wait_ms: float
+    ):
+        """Initialize the coalescer.
+        
+        Args:
+            send_batch: Coroutine function sending one batch for a collection
+            max_batch_size: Searches per batch request
+            max_wait_ms: Longest time a search waits for others to join its batch
+        """
+        self.send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: Dict[str, List[Tuple[qdrant_models.SearchRequest, asyncio.Future]]] = defaultdict(list)
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._active: Dict[str, int] = defaultdict(int)
+        self._in_flight = set()
+    
+    async def search(self, collection_name: str, request: qdrant_models.SearchRequest) -> List[Any]:
+        """Queue a search and wait for its results.
+        
+        Args:
+            collection_name: Name of the collection
+            request: Search request
+            
+        Returns:
+            Scored points for this request
+        """
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending[collection_name]
+        pending.append((request, future))
+        
+        if len(pending) >= self.max_batch_size or not self._active[collection_name]:
+            self._flush(collection_name)
+        elif collection_name not in self._timers:
+            self._timers[collection_name] = asyncio.create_task(self._flush_later(collection_name))
+        
+        return await future
+    
+    async def _flush_later(self, collection_name: str):
+        """Flush a collection's queue once the batching window closes."""
+        await asyncio.sleep(self.max_wait_ms / 1000)
+        self._timers.pop(collection_name, None)
+        self._flush(collection_name)
+    
+    def _flush(self, collection_name: str):
+        """Send a collection's queued searches as one batch."""
+        timer = self._timers.pop(collection_name, None)
+        if timer:
+            timer.cancel()
+        
+        batch = self._pending.pop(collection_name, None)
+        if not batch:
+            return
+        
+        self._active[collection_name] += 1
+        task = asyncio.create_task(self._send(collection_name, batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+    
+    async def _send(self, collection_name: str, batch: List[Tuple[qdrant_models.SearchRequest, asyncio.Future]]):
+        """Send one batch and resolve each caller's future.
+        
+        If the batch request fails, each search is retried on its own so an
+        error only reaches the caller whose search caused it.
+        """
+        try:
+            try:
+                responses = await self.send_batch(collection_name, [request for request, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    responses = [e]
+                else:
+                    responses = await asyncio.gather(*[
+                        self._send_one(collection_name, request) for request, _ in batch
+                    ], return_exceptions=True)
+        finally:
+            self._active[collection_name] -= 1
+        
+        for (_, future), response in zip(batch, responses):
+            if future.done():
+                continue
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+    
+    async def _send_one(self, collection_name: str, request: qdrant_models.SearchRequest) -> List[Any]:
+        """Send a single search as a batch of one."""
+        responses = await self.send_batch(collection_name, [request])
+        return responses[0]
+
 
 class VectorStore:
     """Vector store implementation using Qdrant."""
@@ -32,6 +286,16 @@ class VectorStore:
         """
         self.db_manager = db_manager
         self.client = None
+        self._search_coalescer = _SearchCoalescer(
+            self._search_batch,
+            max_batch_size=settings.qdrant.search_batch_max_size,
+            max_wait_ms=settings.qdrant.search_batch_wait_ms
+        )
+        
+        # Collection metadata is nearly static, so it is cached briefly
+        self.collection_info_ttl = settings.qdrant.collection_info_ttl
+        self.collection_info_maxsize = 64
+        self._collection_info: Dict[str, Tuple[float, Dict[str, Any]]] = {}
     
     async def initialize(self):
         """Initialize the vector store connection."""
@@ -54,24 +318,27 @@ class VectorStore:
         self, 
         collection_name: str,
         vector_size: int = 384,  # Default for all-MiniLM-L6-v2
-        distance: str = "cosine"
+        distance: str = "cosine",
+        quantization: Optional[str] = None
     ) -> bool:
         """Create a collection if it doesn't exist.
         
         Args:
             collection_name: Name of the collection
             vector_size: Dimensionality of vectors
-            distance: Distance metric (cosine, euclid, dot)
+            distance: Distance metric (cosine, euclid, dot, dot_normalized);
+                dot_normalized requires vectors to be L2-normalized before upsert
+            quantization: Optional vector quantization (scalar_int8)
             
         Returns:
             True if collection was created, False if it already existed
         """
+        if quantization is not None and quantization not in _QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        
         try:
             # Check if collection exists
-            collections = await self.client.get_collections()
-            collection_names = [c.name for c in collections.collections]
-            
-            if collection_name in collection_names:
+            if await self.client.collection_exists(collection_name=collection_name):
                 logger.info("Collection already exists", collection=collection_name)
                 return False
             
@@ -80,8 +347,9 @@ class VectorStore:
                 collection_name=collection_name,
                 vectors_config=qdrant_models.VectorParams(
                     size=vector_size,
-                    distance=distance
-                )
+                    distance=_DISTANCES.get(distance, distance)
+                ),
+                quantization_config=_QUANTIZATIONS.get(quantization)
             )
             
             # Create payload indexes for common fields to improve filtering performance
@@ -117,7 +385,7 @@ class VectorStore:
     async def add_vector(
         self,
         collection_name: str,
-        vector: List[float],
+        vector: Union[np.ndarray, List[float]],
         payload: Dict[str, Any],
         id: Optional[str] = None
     ) -> str:
@@ -139,7 +407,7 @@ class VectorStore:
                 points=[
                     qdrant_models.PointStruct(
                         id=id,
-                        vector=vector,
+                        vector=np.asarray(vector, dtype=np.float32).tolist(),
                         payload=payload
                     )
                 ]
@@ -164,82 +432,229 @@ class VectorStore:
             )
             raise
     
+    async def add_vectors(
+        self,
+        collection_name: str,
+        vectors: Union[np.ndarray, List[List[float]]],
+        payloads: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
+        wait: bool = True,
+        max_concurrency: Optional[int] = None
+    ) -> List[str]:
+        """Add many vectors to the collection with batched upserts.
+        
+        Vectors are kept as one contiguous float32 array and sent as
+        columnar Batch upserts, so each batch converts one array slice
+        instead of building a PointStruct per vector. Up to
+        ``max_concurrency`` batches are in flight at a time; the limit
+        halves while Qdrant reports overload (429/503) and failed batches
+        are retried with jittered exponential backoff.
+        
+        Args:
+            collection_name: Name of the collection
+            vectors: Vector embeddings of shape (n, dim)
+            payloads: Metadata payload for each vector
+            ids: Optional vector IDs; time-ordered UUIDs are generated when omitted
+            batch_size: Points per upsert request (defaults to settings)
+            wait: Wait for each batch to be applied before returning
+            max_concurrency: Maximum concurrent upsert requests (defaults to settings)
+            
+        Returns:
+            IDs of the added vectors
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        batch_size = batch_size or settings.qdrant.upsert_batch_size
+        limiter = _AdaptiveLimiter(max_concurrency or settings.qdrant.upsert_max_concurrency)
+        if ids is None:
+            ids = uuid7_ids(len(vectors))
+        
+        async def upsert_batch(start: int):
+            end = start + batch_size
+            points = None
+            
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(settings.qdrant.upsert_max_attempts),
+                wait=wait_random_exponential(multiplier=settings.qdrant.upsert_retry_wait, max=10),
+                retry=retry_if_exception(_is_retryable),
+                reraise=True
+            ):
+                with attempt:
+                    async with limiter:
+                        # Built once the batch may be sent, so waiting batches hold no converted lists
+                        if points is None:
+                            points = qdrant_models.Batch(
+                                ids=ids[start:end],
+                                vectors=vectors[start:end].tolist(),
+                                payloads=payloads[start:end]
+                            )
+                        try:
+                            await self.client.upsert(
+                                collection_name=collection_name,
+                                points=points,
+                                wait=wait
+                            )
+                        except Exception as e:
+                            if _is_backpressure(e):
+                                limiter.backoff()
+                                logger.warning(
+                                    "Qdrant backpressure; reducing upsert concurrency",
+                                    collection=collection_name,
+                                    concurrency=limiter.limit,
+                                    error=str(e)
+                                )
+                            raise
+                        limiter.recover()
+        
+        try:
+            await asyncio.gather(*[upsert_batch(start) for start in range(0, len(ids), batch_size)])
+            
+            logger.debug(
+                "Vectors added", 
+                collection=collection_name, 
+                count=len(ids),
+                batches=-(-len(ids) // batch_size)
+            )
+            
+            return ids
+            
+        except Exception as e:
+            logger.error(
+                "Failed to add vectors", 
+                collection=collection_name, 
+                count=len(ids),
+                error=str(e)
+            )
+            raise
+    
+    async def bulk_load(
+        self,
+        collection_name: str,
+        vectors: Union[np.ndarray, List[List[float]]],
+        payloads: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Load many vectors with HNSW indexing deferred until the end.
+        
+        The collection's HNSW graph is disabled (``m=0``) while the batches
+        are upserted and re-enabled afterwards, so the index is built once
+        instead of incrementally. Use it for initial loads and re-indexing,
+        not for routine ingestion into a collection that is being searched.
+        
+        Args:
+            collection_name: Name of the collection
+            vectors: Vector embeddings of shape (n, dim)
+            payloads: Metadata payload for each vector
+            ids: Optional vector IDs; time-ordered UUIDs are generated when omitted
+            
+        Returns:
+            IDs of the added vectors
+        """
+        await self.client.update_collection(
+            collection_name=collection_name,
+            hnsw_config=qdrant_models.HnswConfigDiff(m=0)
+        )
+        
+        try:
+            return await self.add_vectors(collection_name, vectors, payloads, ids=ids)
+            
+        finally:
+            # Restore indexing even if the load failed part-way
+            await self.client.update_collection(
+                collection_name=collection_name,
+                hnsw_config=qdrant_models.HnswConfigDiff(m=settings.qdrant.hnsw_m),
+                optimizers_config=qdrant_models.OptimizersConfigDiff(
+                    indexing_threshold=settings.qdrant.indexing_threshold
+                )
+            )
+            
+            logger.info("HNSW indexing restored after bulk load", collection=collection_name)
+    
+    def _prepare_query_vector(
+        self,
+        query_vector: Union[np.ndarray, List[float]],
+        prenormalized: bool
+    ) -> Union[np.ndarray, List[float]]:
+        """L2-normalize a query vector unless it already is."""
+        if prenormalized:
+            return query_vector
+        
+        # Copy once so the in-place divide never touches the caller's array
+        query_vector = np.array(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm:
+            query_vector /= norm
+        return query_vector
+    
+    def _build_filter(self, filters: Optional[List[Dict[str, Any]]]) -> Optional[qdrant_models.Filter]:
+        """Convert search filters to a Qdrant filter.
+        
+        Args:
+            filters: Filters with field, value and optional operator
+            
+        Returns:
+            Qdrant filter, or None when there is nothing to filter on
+        """
+        if not filters:
+            return None
+        
+        items = [
+            (
+                filter_item["field"],
+                filter_item.get("operator", "=="),
+                tuple(filter_item["value"]) if isinstance(filter_item["value"], list) else filter_item["value"]
+            )
+            for filter_item in filters
+            if filter_item.get("field") and filter_item.get("value") is not None
+        ]
+        items = tuple(sorted(items, key=repr))
+        
+        try:
+            return _compile_filter(items)
+        except TypeError:
+            # Unhashable filter value; build the filter without caching
+            return _compile_filter.__wrapped__(items)
+    
     async def search(
         self,
         collection_name: str,
-        query_vector: List[float],
+        query_vector: Union[np.ndarray, List[float]],
         limit: int = 10,
         threshold: float = 0.7,
-        filters: Optional[List[Dict[str, Any]]] = None
+        filters: Optional[List[Dict[str, Any]]] = None,
+        prenormalized: bool = True
     ) -> List[Dict[str, Any]]:
         """Search for similar vectors.
         
+        Searches that overlap an in-flight search on the same collection
+        are coalesced into one batched request (see ``_SearchCoalescer``).
+        
         Args:
             collection_name: Name of the collection
             query_vector: Query vector embedding
             limit: Maximum number of results
             threshold: Similarity threshold (0-1)
             filters: Optional filters for search
+            prenormalized: Whether the query vector is already L2-normalized;
+                when False it is normalized here so dot scores match cosine
             
         Returns:
             List of search results with scores and payloads
         """
         try:
-            # Convert filters to Qdrant filter format if provided
-            filter_obj = None
-            if filters and len(filters) > 0:
-                filter_conditions = []
-                
-                for filter_item in filters:
-                    field = filter_item.get("field")
-                    value = filter_item.get("value")
-                    operator = filter_item.get("operator", "==")
-                    
-                    if field and value is not None:
-                        if operator == "==":
-                            filter_conditions.append(
-                                qdrant_models.FieldCondition(
-                                    key=field,
-                                    match=qdrant_models.MatchValue(value=value)
-                                )
-                            )
-                        elif operator == "!=":
-                            filter_conditions.append(
-                                qdrant_models.FieldCondition(
-                                    key=field,
-                                    match=qdrant_models.MatchValue(value=value),
-                                    match_value=False
-                                )
-                            )
-                        elif operator == "in":
-                            filter_conditions.append(
-                                qdrant_models.FieldCondition(
-                                    key=field,
-                                    match=qdrant_models.MatchAny(any=value)
-                                )
-                            )
-                        elif operator == "not_in":
-                            filter_conditions.append(
-                                qdrant_models.FieldCondition(
-                                    key=field,
-                                    match=qdrant_models.MatchAny(any=value),
-                                    match_value=False
-                                )
-                            )
-                
-                if filter_conditions:
-                    filter_obj = qdrant_models.Filter(
-                        must=filter_conditions
-                    )
+            query_vector = self._prepare_query_vector(query_vector, prenormalized)
+            filter_obj = self._build_filter(filters)
             
             # Perform search
-            search_results = await self.client.search(
-                collection_name=collection_name,
-                query_vector=query_vector,
-                limit=limit,
-                score_threshold=threshold,
-                query_filter=filter_obj,
-                with_payload=True
+            search_results = await self._search_coalescer.search(
+                collection_name,
+                qdrant_models.SearchRequest(
+                    vector=np.asarray(query_vector, dtype=np.float32).tolist(),
+                    filter=filter_obj,
+                    limit=limit,
+                    score_threshold=threshold,
+                    with_payload=True
+                )
             )
             
             # Format results
@@ -268,35 +683,128 @@ class VectorStore:
             )
             raise
     
+    async def _search_batch(
+        self,
+        collection_name: str,
+        requests: List[qdrant_models.SearchRequest]
+    ) -> List[List[Any]]:
+        """Send coalesced searches to Qdrant as one batch request."""
+        return await self.client.search_batch(
+            collection_name=collection_name,
+            requests=requests
+        )
+    
+    async def search_stream(
+        self,
+        collection_name: str,
+        query_vector: Union[np.ndarray, List[float]],
+        limit: int = 10,
+        threshold: float = 0.7,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        prenormalized: bool = True,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Search for similar vectors, yielding results page by page.
+        
+        By default the whole top-k is fetched in one request. Qdrant ranks
+        ``offset + page_size`` hits for every offset page, so paging repeats
+        the ranking work and adds a round-trip per page; a smaller
+        ``page_size`` only pays off when callers usually stop after the
+        first few hits.
+        
+        Args:
+            collection_name: Name of the collection
+            query_vector: Query vector embedding
+            limit: Maximum number of results
+            threshold: Similarity threshold (0-1)
+            filters: Optional filters for search
+            prenormalized: Whether the query vector is already L2-normalized
+            page_size: Results fetched per request (None for ``limit``)
+            
+        Yields:
+            Search results with scores and payloads, best first
+        """
+        query_vector = self._prepare_query_vector(query_vector, prenormalized)
+        filter_obj = self._build_filter(filters)
+        page_size = page_size or limit
+        offset = 0
+        
+        while offset < limit:
+            request_size = min(page_size, limit - offset)
+            try:
+                page = await self.client.search(
+                    collection_name=collection_name,
+                    query_vector=query_vector,
+                    limit=request_size,
+                    offset=offset,
+                    score_threshold=threshold,
+                    query_filter=filter_obj,
+                    with_payload=True
+                )
+            except Exception as e:
+                logger.error(
+                    "Vector search failed", 
+                    collection=collection_name, 
+                    offset=offset,
+                    error=str(e)
+                )
+                raise
+            
+            for result in page:
+                yield {
+                    "id": result.id,
+                    "score": result.score,
+                    "payload": result.payload
+                }
+            
+            # A short page means there are no more hits above the threshold
+            if len(page) < request_size:
+                break
+            offset += request_size
+    
     async def delete_vectors(
         self,
         collection_name: str,
-        ids: List[str]
+        ids: List[str],
+        batch_size: Optional[int] = None
     ) -> int:
         """Delete vectors from the collection.
         
+        IDs are sent in chunks of ``batch_size`` so large deletes stay under
+        the server's request size limit; chunks are deleted concurrently,
+        up to the upsert concurrency limit.
+        
         Args:
             collection_name: Name of the collection
             ids: List of vector IDs to delete
+            batch_size: IDs per delete request (defaults to settings)
             
         Returns:
             Number of deleted vectors
         """
+        batch_size = batch_size or settings.qdrant.delete_batch_size
+        semaphore = asyncio.Semaphore(settings.qdrant.upsert_max_concurrency)
+        
+        async def delete_batch(start: int):
+            async with semaphore:
+                await self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=qdrant_models.PointIdsList(
+                        points=ids[start:start + batch_size]
+                    )
+                )
+        
         try:
             # Delete vectors
-            result = await self.client.delete(
-                collection_name=collection_name,
-                points_selector=qdrant_models.PointIdsList(
-                    points=ids
-                )
-            )
+            await asyncio.gather(*[delete_batch(start) for start in range(0, len(ids), batch_size)])
             
             deleted_count = len(ids)
             
             logger.info(
                 "Vectors deleted", 
                 collection=collection_name, 
-                count=deleted_count
+                count=deleted_count,
+                batches=-(-deleted_count // batch_size)
             )
             
             return deleted_count
@@ -309,6 +817,71 @@ class VectorStore:
             )
             raise
     
+    async def delete_by_filter(
+        self,
+        collection_name: str,
+        filters: List[Dict[str, Any]]
+    ) -> bool:
+        """Delete every vector matching the filters.
+        
+        The server selects the points, so no IDs are sent however many
+        vectors match.
+        
+        Args:
+            collection_name: Name of the collection
+            filters: Filters with field, value and optional operator
+            
+        Returns:
+            True once the delete has been applied
+        """
+        filter_obj = self._build_filter(filters)
+        if filter_obj is None:
+            # An empty filter selects every point in the collection
+            raise ValueError("delete_by_filter requires at least one filter")
+        
+        try:
+            await self.client.delete(
+                collection_name=collection_name,
+                points_selector=qdrant_models.FilterSelector(
+                    filter=filter_obj
+                )
+            )
+            
+            logger.info(
+                "Vectors deleted by filter", 
+                collection=collection_name, 
+                filters=filters
+            )
+            
+            return True
+            
+        except Exception as e:
+            logger.error(
+                "Failed to delete vectors by filter", 
+                collection=collection_name, 
+                error=str(e)
+            )
+            raise
+    
+    async def delete_by_document(
+        self,
+        collection_name: str,
+        document_id: str
+    ) -> bool:
+        """Delete all vectors of a document.
+        
+        Args:
+            collection_name: Name of the collection
+            document_id: ID of the document whose chunks are deleted
+            
+        Returns:
+            True once the delete has been applied
+        """
+        return await self.delete_by_filter(
+            collection_name,
+            [{"field": "document_id", "value": document_id}]
+        )
+    
     async def delete_collection(
         self,
         collection_name: str
@@ -326,6 +899,7 @@ class VectorStore:
             await self.client.delete_collection(
                 collection_name=collection_name
             )
+            self._collection_info.pop(collection_name, None)
             
             logger.info("Collection deleted", collection=collection_name)
             return True
@@ -344,12 +918,19 @@ class VectorStore:
     ) -> Dict[str, Any]:
         """Get information about a collection.
         
+        Results are cached for ``collection_info_ttl`` seconds, so point
+        counts may lag behind recent upserts by up to that long.
+        
         Args:
             collection_name: Name of the collection
             
         Returns:
             Collection information
         """
+        cached = self._collection_info.get(collection_name)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
         try:
             # Get collection info
             collection_info = await self.client.get_collection(
@@ -358,15 +939,21 @@ class VectorStore:
             
             # Format info
             info = {
-                "name": collection_info.name,
+                "name": collection_name,
                 "vectors_count": collection_info.vectors_count,
                 "points_count": collection_info.points_count,
                 "status": collection_info.status,
                 "vector_size": collection_info.config.params.vectors.size,
                 "distance": collection_info.config.params.vectors.distance,
-                "created_at": collection_info.created_at.isoformat() if collection_info.created_at else None
+                "quantization": collection_info.config.quantization_config
             }
             
+            self._collection_info.pop(collection_name, None)
+            self._collection_info[collection_name] = (time.monotonic() + self.collection_info_ttl, info)
+            if len(self._collection_info) > self.collection_info_maxsize:
+                # Drop the oldest entry
+                self._collection_info.pop(next(iter(self._collection_info)))
+            
             return info
             
         except Exception as e:
@@ -3,10 +3,51 @@
 This module sets up the Python path for tests and provides fixtures.
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
 
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # Windows, or uvicorn installed without [standard]
+    uvloop = None
+
 # Add the project root directory to the Python path
 project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
\ No newline at end of file
+sys.path.insert(0, str(project_root))
+
+
+def pytest_addoption(parser):
+    """Register the opt-in flag for performance tests."""
+    parser.addoption(
+        "--run-perf",
+        action="store_true",
+        default=False,
+        help="run tests marked as performance"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip performance tests unless --run-perf is given."""
+    if config.getoption("--run-perf"):
+        return
+    
+    skip_perf = pytest.mark.skip(reason="perf test; use --run-perf")
+    for item in items:
+        if "performance" in item.keywords:
+            item.add_marker(skip_perf)
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """Run every async test on one event loop for the whole session.
+    
+    The loop is a uvloop loop when uvloop is installed (uvicorn[standard]
+    pulls it in on Linux and macOS) and the stdlib loop otherwise.
+    """
+    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    yield loop
+    loop.close()
@@ -0,0 +1,300 @@
+"""Shared fixtures for RAG engine tests.
+
+Provides lightweight stub components for integration tests. Stubs are plain
+classes whose methods carry the real components' names and return canned
+values; only the methods tests assert on are wrapped in ``_Tracked``, which
+records calls without a ``MagicMock`` tree.
+
+``SentenceTransformer`` is patched once per session so no test loads a real
+embedding model. Every test in this directory is marked ``rag``.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.rag.kafka_integration import KafkaManager
+from app.rag.models import DocumentChunk, SearchResult
+
+_RAG_TESTS = Path(__file__).parent
+
+
+def pytest_collection_modifyitems(items):
+    """Mark every test under tests/rag with ``rag`` so ``-m rag`` selects them."""
+    for item in items:
+        if _RAG_TESTS in item.path.parents:
+            item.add_marker(pytest.mark.rag)
+
+
+class _Tracked:
+    """Async callable recording the calls made to a stub method."""
+
+    def __init__(self, method):
+        self.method = method
+        self.calls = []
+
+    @property
+    def call_count(self):
+        return len(self.calls)
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return await self.method(*args, **kwargs)
+
+
+class _StubCollection:
+    """MongoDB documents collection stub holding one stored document."""
+
+    def __init__(self):
+        self.stored = {
+            "id": "doc123",
+            "title": "Test Document",
+            "content": "This is a test document.",
+            "document_type": "manual",
+            "access_level": "internal",
+            "metadata": {"department": "engineering", "tags": ["test"]}
+        }
+
+    async def find_one(self, filter):
+        return dict(self.stored) if filter.get("id") == self.stored["id"] else None
+
+    async def update_one(self, filter, update, upsert=False):
+        return SimpleNamespace(matched_count=1, modified_count=1)
+
+    async def delete_one(self, filter):
+        return SimpleNamespace(deleted_count=1)
+
+    async def bulk_write(self, requests, ordered=True):
+        return SimpleNamespace(upserted_count=len(requests))
+
+
+class _StubDBManager:
+    """Database manager stub serving the documents collection."""
+
+    def __init__(self):
+        self.collection = _StubCollection()
+
+    def get_mongo_client(self):
+        return {"rag": {"documents": self.collection}}
+
+    def get_postgres_client(self):
+        return None
+
+
+class _StubEmbeddingProvider:
+    """Embedding provider stub returning fixed 4-dimensional vectors."""
+
+    vector_size = 4
+    distance_metric = "dot_normalized"
+
+    async def get_embedding(self, text):
+        return np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32)
+
+    async def get_embeddings(self, texts):
+        return np.tile(np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32), (len(texts), 1))
+
+
+class _StubVectorStore:
+    """Vector store stub returning two fixed search hits."""
+
+    async def initialize(self):
+        return None
+
+    async def search(self, collection_name, query_vector, limit=10, threshold=0.7, filters=None, prenormalized=True):
+        return [
+            {"id": "chunk1", "score": 0.95, "payload": {"document_id": "doc1", "content": "Test content 1"}},
+            {"id": "chunk2", "score": 0.85, "payload": {"document_id": "doc2", "content": "Test content 2"}}
+        ]
+
+    async def add_vectors(self, collection_name, vectors, payloads, ids=None, batch_size=None, wait=True,
+                          max_concurrency=None):
+        return [f"vector{i + 1}" for i in range(len(payloads))]
+
+    async def delete_by_document(self, collection_name, document_id):
+        return True
+
+
+class _StubEngine:
+    """RAG engine stub storing and searching through the stub vector store."""
+
+    def __init__(self, vector_store, embedding_provider):
+        self.vector_store = vector_store
+        self.embedding_provider = embedding_provider
+        self.search = _Tracked(self._search)
+
+    async def initialize(self):
+        return None
+
+    async def process_document(self, document, chunks=None, collection_name=None):
+        vector_ids = await self.vector_store.add_vectors(
+            collection_name or "rag_documents",
+            await self.embedding_provider.get_embeddings([chunk.content for chunk in chunks]),
+            [{"document_id": document.id} for _ in chunks]
+        )
+        return {"document_id": document.id, "vector_ids": vector_ids}
+
+    async def process_documents(self, documents):
+        return [await self.process_document(document, chunks) for document, chunks in documents]
+
+    async def delete_document(self, document_id):
+        return True
+
+    async def _search(self, query, filters=None, limit=10, similarity_threshold=0.7):
+        hits = await self.vector_store.search(
+            "rag_documents", await self.embedding_provider.get_embedding(query), limit, similarity_threshold, filters
+        )
+        results = [{"document_id": hit["payload"]["document_id"], "content": hit["payload"]["content"],
+                    "similarity": hit["score"]} for hit in hits]
+        return [SearchResult(query=query, results=results, total_results=len(results))]
+
+
+class _StubDocumentProcessor:
+    """Document processor stub giving each document an ID and two chunks."""
+
+    def process_document(self, document):
+        document = document.model_copy(update={"id": document.id or "doc123"})
+        return document, [
+            DocumentChunk(document_id=document.id, chunk_index=i, content=f"Chunk {i + 1} content")
+            for i in range(2)
+        ]
+
+
+class _StubCacheManager:
+    """Document cache stub that always misses."""
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, ttl=None):
+        return True
+
+    async def delete(self, key):
+        return True
+
+    async def clear_prefix(self, sub_prefix):
+        return True
+
+
+class _StubSearchCache:
+    """Search cache stub serving ``cached`` on lookups; ``None`` is a miss."""
+
+    def __init__(self):
+        self.cached = None
+        self.get_search_results = _Tracked(self._get_search_results)
+        self.set_search_results = _Tracked(self._set_search_results)
+
+    async def get_generation(self):
+        return 0
+
+    async def _get_search_results(self, query, filters=None, **params):
+        return self.cached
+
+    async def _set_search_results(self, query, results, filters=None, ttl=None, **params):
+        return True
+
+    async def invalidate_document_cache(self, document_id):
+        return True
+
+
+class _StubKafkaManager:
+    """Kafka manager stub whose queued sends are tracked."""
+
+    DOCUMENT_INGESTION_TOPIC = KafkaManager.DOCUMENT_INGESTION_TOPIC
+    DOCUMENT_SEARCH_TOPIC = KafkaManager.DOCUMENT_SEARCH_TOPIC
+    DOCUMENT_UPDATE_TOPIC = KafkaManager.DOCUMENT_UPDATE_TOPIC
+    DOCUMENT_DELETE_TOPIC = KafkaManager.DOCUMENT_DELETE_TOPIC
+
+    def __init__(self):
+        for name in ("enqueue_ingestion", "enqueue_update", "enqueue_delete", "send_document_search_message", "flush"):
+            setattr(self, name, _Tracked(self._sent))
+
+    async def initialize(self):
+        return True
+
+    async def shutdown(self):
+        return None
+
+    async def register_consumer(self, topic, handler):
+        return None
+
+    async def _sent(self, *args, **kwargs):
+        return True
+
+
+@pytest.fixture
+def stub_db_manager():
+    """Create a stub database manager."""
+    return _StubDBManager()
+
+
+@pytest.fixture
+def stub_embedding_provider():
+    """Create a stub embedding provider."""
+    return _StubEmbeddingProvider()
+
+
+@pytest.fixture
+def stub_vector_store():
+    """Create a stub vector store."""
+    return _StubVectorStore()
+
+
+@pytest.fixture
+def stub_engine(stub_vector_store, stub_embedding_provider):
+    """Create a stub RAG engine over the stub vector store."""
+    return _StubEngine(stub_vector_store, stub_embedding_provider)
+
+
+@pytest.fixture
+def stub_document_processor():
+    """Create a stub document processor."""
+    return _StubDocumentProcessor()
+
+
+@pytest.fixture
+def stub_cache_manager():
+    """Create a stub cache manager."""
+    return _StubCacheManager()
+
+
+@pytest.fixture
+def stub_search_cache():
+    """Create a stub search cache."""
+    return _StubSearchCache()
+
+
+@pytest.fixture
+def stub_kafka_manager():
+    """Create a stub Kafka manager."""
+    return _StubKafkaManager()
+
+
+@pytest.fixture(scope="session")
+def _sentence_transformer():
+    """Create the session-wide mock SentenceTransformer."""
+    transformer = MagicMock()
+    # Like the real model: one row per text for a list, a single vector otherwise
+    transformer.encode.side_effect = lambda texts, **kwargs: (
+        np.tile(np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32), (len(texts), 1))
+        if isinstance(texts, list)
+        else np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32)
+    )
+    transformer.get_sentence_embedding_dimension.return_value = 4
+    return transformer
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _patch_sentence_transformer(_sentence_transformer):
+    """Patch SentenceTransformer with the mock for the whole session."""
+    with patch("app.rag.embeddings.SentenceTransformer", return_value=_sentence_transformer) as patched:
+        yield patched
+
+
+@pytest.fixture
+def mock_sentence_transformer(_sentence_transformer):
+    """Expose the mock SentenceTransformer with call history reset for this test."""
+    _sentence_transformer.reset_mock()
+    return _sentence_transformer
@@ -10,7 +10,7 @@ from datetime import datetime
 from unittest.mock import MagicMock, patch, AsyncMock
 from pydantic import BaseModel
 
-from app.rag.cache import CacheManager, SearchCache
+from app.rag.cache import CacheManager, SearchCache, InProcSearchCache
 from app.rag.models import SearchQuery, SearchFilter, SearchResult, DocumentType
 
 
@@ -30,6 +30,7 @@ def mock_redis_client():
     client.set = AsyncMock(return_value=True)
     client.delete = AsyncMock(return_value=1)
     client.keys = AsyncMock(return_value=[b"test:key1", b"test:key2"])
+    client.incr = AsyncMock(return_value=1)
     return client
 
 
@@ -194,6 +195,78 @@ async def test_invalidate_document_cache(search_cache):
     document_id = "doc123"
     await search_cache.invalidate_document_cache(document_id)
     
-    # Check if keys and delete were called
-    search_cache.redis.keys.assert_called()
-    search_cache.redis.delete.assert_called()
\ No newline at end of file
+    # Check if the shared generation was bumped
+    search_cache.redis.incr.assert_called_once_with(search_cache.generation_key)
+
+
+@pytest.mark.asyncio
+async def test_search_cache_generation_shared_across_workers(mock_db_manager, mock_redis_client):
+    """Test that a write on one worker retires the in-process cache of another."""
+    store = {}
+    mock_redis_client.get.side_effect = store.get
+    mock_redis_client.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value)
+    mock_redis_client.incr.side_effect = lambda key: store.__setitem__(key, int(store.get(key, 0)) + 1) or store[key]
+    worker_a = SearchCache(db_manager=mock_db_manager)
+    worker_b = SearchCache(db_manager=mock_db_manager)
+    results = [{"query": "q", "results": [{"document_id": "doc1"}]}]
+    
+    generation = await worker_a.get_generation()
+    await worker_a.set_search_results("q", results, generation=generation)
+    assert await worker_a.get_search_results("q", generation=generation) == results
+    
+    await worker_b.invalidate_document_cache("doc2")
+    
+    generation = await worker_a.get_generation()
+    assert generation == 1
+    assert await worker_a.get_search_results("q", generation=generation) is None
+
+
+@pytest.mark.asyncio
+async def test_search_cache_generation_unavailable(search_cache):
+    """Test that a Redis failure reports no generation instead of raising."""
+    search_cache.redis.get.side_effect = Exception("Redis down")
+    
+    assert await search_cache.get_generation() is None
+
+
+@pytest.mark.asyncio
+async def test_inproc_search_cache_hit_uses_canonical_key():
+    """Test that equivalent searches share one in-process cache entry."""
+    cache = InProcSearchCache()
+    results = [{"document_id": "doc1", "content": "Test content", "score": 0.9}]
+    
+    await cache.set_search_results("Test Query ", results, {"b": 2, "a": 1}, max_results=5)
+    
+    assert await cache.get_search_results("test query", {"a": 1, "b": 2}, max_results=5) == results
+    assert await cache.get_search_results("test query", {"a": 1, "b": 2}, max_results=10) is None
+
+
+@pytest.mark.asyncio
+async def test_inproc_search_cache_evicts_and_expires():
+    """Test LRU eviction and TTL expiry of the in-process cache."""
+    cache = InProcSearchCache(maxsize=2, ttl=60)
+    
+    await cache.set_search_results("q1", [])
+    await cache.set_search_results("q2", [])
+    await cache.get_search_results("q1")  # q1 is now most recently used
+    await cache.set_search_results("q3", [])
+    
+    assert await cache.get_search_results("q2") is None
+    assert await cache.get_search_results("q1") == []
+    
+    with patch("app.rag.cache.time.monotonic", return_value=float("inf")):
+        assert await cache.get_search_results("q1") is None
+
+
+@pytest.mark.asyncio
+async def test_inproc_search_cache_invalidate_document():
+    """Test that invalidating a document drops every search, not only those that returned it."""
+    cache = InProcSearchCache()
+    await cache.set_search_results("q1", [{"query": "q1", "results": [{"document_id": "doc1"}]}])
+    await cache.set_search_results("q2", [{"query": "q2", "results": [{"document_id": "doc2"}]}])
+    
+    await cache.invalidate_document_cache("doc3")
+    
+    assert await cache.get_search_results("q1") is None
+    assert await cache.get_search_results("q2") is None
+    assert await cache.get_generation() == 1
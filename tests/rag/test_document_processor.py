@@ -5,16 +5,42 @@ and document preparation for embedding.
 """
 
 import pytest
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
 from app.rag.document_processor import DocumentProcessor
 from app.rag.models import Document, DocumentChunk, DocumentType, AccessLevel
 
+# Fixed timestamp for fixture documents
+_FIXED_TS = datetime(2024, 1, 1, tzinfo=timezone.utc)
 
-@pytest.fixture
+
+def _suffix_prefix_overlap(current: str, following: str, max_overlap: int) -> int:
+    """Return the longest k <= max_overlap where current ends with following[:k].
+
+    Compares UTF-32 code point views with numpy instead of slicing a new
+    string per candidate length, so k is a character count like the
+    chunker's offsets. Only tail offsets whose code point matches the first
+    character of ``following`` are checked.
+    """
+    a = np.frombuffer(current.encode("utf-32-le"), dtype=np.uint32)
+    b = np.frombuffer(following.encode("utf-32-le"), dtype=np.uint32)
+    limit = min(len(a), len(b), max_overlap)
+    if limit == 0:
+        return 0
+
+    tail = a[-limit:]
+    for start in np.flatnonzero(tail == b[0]):
+        k = limit - int(start)
+        if np.array_equal(tail[start:], b[:k]):
+            return k
+    return 0
+
+
+@pytest.fixture(scope="module")
 def document_processor():
-    """Create a document processor instance for testing."""
+    """Create a document processor instance shared by the module's tests."""
     return DocumentProcessor()
 
 
@@ -27,11 +53,11 @@ def sample_document():
                 "This is for testing the document processor. The processor should split this text into chunks "
                 "based on the configured chunk size and overlap. Each chunk should maintain the semantic meaning "
                 "of the text as much as possible. The processor should also extract metadata from the document.",
-        document_type=DocumentType.GUIDE,
+        document_type=DocumentType.MANUAL,
         metadata={"department": "engineering", "tags": ["test", "documentation"]},
         access_level=AccessLevel.INTERNAL,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
+        created_at=_FIXED_TS,
+        updated_at=_FIXED_TS
     )
 
 
@@ -41,16 +67,17 @@ def document_without_metadata():
     return Document(
         title="",
         content="This is a document without a title or metadata. The processor should extract metadata from the content.",
-        document_type=DocumentType.UNKNOWN,
+        document_type=DocumentType.DOCUMENT,
         access_level=AccessLevel.PUBLIC,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
+        created_at=_FIXED_TS,
+        updated_at=_FIXED_TS
     )
 
 
 def test_document_chunking(document_processor, sample_document):
     """Test document chunking functionality."""
     # Set chunk size and overlap
+    sample_document.id = "doc1"
     sample_document.chunk_size = 100
     sample_document.chunk_overlap = 20
     
@@ -58,33 +85,47 @@ def test_document_chunking(document_processor, sample_document):
     chunks = document_processor._chunk_document(sample_document)
     
     # Check if document was chunked properly
-    assert len(chunks) > 0
+    assert len(chunks) > 1
     assert all(isinstance(chunk, DocumentChunk) for chunk in chunks)
     assert all(chunk.document_id == sample_document.id for chunk in chunks)
     
     # Check chunk properties
     for i, chunk in enumerate(chunks):
         assert chunk.chunk_index == i
-        assert len(chunk.text) <= sample_document.chunk_size + 50  # Allow some flexibility for sentence boundaries
-        assert chunk.metadata == sample_document.metadata
-    
-    # Check for overlap between chunks
-    if len(chunks) > 1:
-        for i in range(len(chunks) - 1):
-            current_chunk = chunks[i].text
-            next_chunk = chunks[i + 1].text
-            
-            # Find potential overlap
-            overlap_found = False
-            for j in range(min(len(current_chunk), sample_document.chunk_overlap * 2)):
-                suffix = current_chunk[-j:] if j > 0 else ""
-                if next_chunk.startswith(suffix):
-                    overlap_found = True
-                    break
-            
-            # There should be some semantic overlap, but it might not be exact text overlap
-            # due to sentence boundary preservation
-            assert len(current_chunk) + len(next_chunk) > sample_document.chunk_size
+        assert len(chunk.content) <= sample_document.chunk_size
+        assert chunk.content in sample_document.content
+    assert chunks[-1].content.endswith("from the document.")
+
+
+def test_document_chunking_exact_overlap(document_processor):
+    """Test that consecutive chunks share exactly chunk_overlap characters."""
+    # 250 distinct two-byte letters with no sentence boundaries or whitespace,
+    # so chunks are cut at exact offsets and character and byte offsets differ
+    content = "".join(chr(0x100 + i) for i in range(250))
+    document = Document(
+        id="doc1",
+        title="Overlap",
+        content=content,
+        document_type=DocumentType.MANUAL,
+        chunk_size=100,
+        chunk_overlap=20
+    )
+    
+    chunks = document_processor._chunk_document(document)
+    
+    assert [chunk.content for chunk in chunks] == [content[0:100], content[80:180], content[160:250]]
+    for current, following in zip(chunks, chunks[1:]):
+        assert _suffix_prefix_overlap(current.content, following.content, 40) == 20
+
+
+def test_suffix_prefix_overlap_large_chunks():
+    """Test overlap detection on 1MB chunks."""
+    overlap = "shared overlap tëxt. " * 10
+    current_chunk = "a" * (1024 * 1024) + overlap
+    next_chunk = overlap + "b" * (1024 * 1024)
+    
+    assert _suffix_prefix_overlap(current_chunk, next_chunk, len(overlap) * 2) == len(overlap)
+    assert _suffix_prefix_overlap(current_chunk, "c" * (1024 * 1024), len(overlap) * 2) == 0
 
 
 def test_metadata_extraction(document_processor, document_without_metadata):
@@ -100,8 +141,8 @@ def test_metadata_extraction(document_processor, document_without_metadata):
     assert "document without" in processed_doc.title.lower()
     
     # Check for automatically extracted metadata
-    assert "created_at" in processed_doc.metadata
-    assert "updated_at" in processed_doc.metadata
+    assert processed_doc.metadata["created_at"] == _FIXED_TS.isoformat()
+    assert processed_doc.metadata["updated_at"] == _FIXED_TS.isoformat()
     assert "reading_time" in processed_doc.metadata
     
     # Check if keywords were extracted
@@ -125,8 +166,14 @@ def test_document_processing(document_processor, sample_document):
     assert all(chunk.document_id == processed_doc.id for chunk in chunks)
     assert all(chunk.metadata == processed_doc.metadata for chunk in chunks)
     
+    # Check content hashes are 16-byte hex digests, stable across runs
+    assert all(len(chunk.content_hash) == 32 for chunk in chunks)
+    assert all(int(chunk.content_hash, 16) >= 0 for chunk in chunks)
+    _, rerun_chunks = document_processor.process_document(processed_doc)
+    assert [c.content_hash for c in rerun_chunks] == [c.content_hash for c in chunks]
+    
     # Check if all content is preserved in chunks
-    combined_text = " ".join([chunk.text for chunk in chunks])
+    combined_text = " ".join([chunk.content for chunk in chunks])
     for key_phrase in ["test document", "multiple sentences", "information", "processor"]:
         assert key_phrase in combined_text.lower()
 
@@ -135,9 +182,9 @@ def test_merge_chunks(document_processor):
     """Test merging chunks into a coherent text."""
     # Create test chunks
     chunks = [
-        DocumentChunk(document_id="test_id", chunk_index=0, text="This is the first chunk of text.", metadata={}),
-        DocumentChunk(document_id="test_id", chunk_index=1, text="This is the second chunk with some overlap.", metadata={}),
-        DocumentChunk(document_id="test_id", chunk_index=2, text="The third chunk contains the conclusion.", metadata={})
+        DocumentChunk(document_id="test_id", chunk_index=0, content="This is the first chunk of text.", metadata={}),
+        DocumentChunk(document_id="test_id", chunk_index=1, content="This is the second chunk with some overlap.", metadata={}),
+        DocumentChunk(document_id="test_id", chunk_index=2, content="The third chunk contains the conclusion.", metadata={})
     ]
     
     # Merge chunks
@@ -6,33 +6,31 @@ generation, similarity calculation, and caching.
 
 import pytest
 import numpy as np
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 from app.rag.embeddings import EmbeddingProvider, get_embedding_provider
 
 
-@pytest.fixture
-def mock_sentence_transformer():
-    """Create a mock SentenceTransformer for testing."""
-    transformer = MagicMock()
-    transformer.encode.return_value = np.array([0.1, 0.2, 0.3, 0.4])
-    transformer.get_sentence_embedding_dimension.return_value = 4
-    transformer.encode = MagicMock(return_value=np.array([0.1, 0.2, 0.3, 0.4]))
-    return transformer
+@pytest.fixture(autouse=True)
+def clear_embedding_provider_cache():
+    """Clear the provider factory cache so cached instances don't leak between tests."""
+    get_embedding_provider.cache_clear()
+    yield
+    get_embedding_provider.cache_clear()
 
 
-@pytest.fixture
-def embedding_provider(mock_sentence_transformer):
-    """Create an embedding provider with a mock transformer."""
-    with patch("app.rag.embeddings.SentenceTransformer", return_value=mock_sentence_transformer):
-        provider = EmbeddingProvider(model_name="all-MiniLM-L6-v2")
-        return provider
+@pytest.fixture(scope="module")
+def embedding_provider(_sentence_transformer):
+    """Create an embedding provider on the session mock transformer, shared by the module's tests."""
+    return EmbeddingProvider(model_name="all-MiniLM-L6-v2")
 
 
 @pytest.mark.asyncio
-async def test_get_vector_size(embedding_provider, mock_sentence_transformer):
-    """Test getting the vector size from the model."""
-    vector_size = embedding_provider.vector_size
+async def test_get_vector_size(mock_sentence_transformer):
+    """Test getting the vector size read from the model at init."""
+    provider = EmbeddingProvider(model_name="all-MiniLM-L6-v2")
+    
+    vector_size = provider.vector_size
     assert vector_size == 4
     mock_sentence_transformer.get_sentence_embedding_dimension.assert_called_once()
 
@@ -40,7 +38,7 @@ async def test_get_vector_size(embedding_provider, mock_sentence_transformer):
 def test_get_distance_metric(embedding_provider):
     """Test getting the distance metric."""
     distance_metric = embedding_provider.distance_metric
-    assert distance_metric == "cosine"
+    assert distance_metric == "dot_normalized"
 
 
 @pytest.mark.asyncio
@@ -50,10 +48,9 @@ async def test_generate_embedding(embedding_provider, mock_sentence_transformer)
     embedding = await embedding_provider.get_embedding(text)
     
     # Check embedding properties
-    assert embedding is not None
-    assert len(embedding) == 4
-    assert all(isinstance(val, float) for val in embedding)
-    mock_sentence_transformer.encode.assert_called_with(text, convert_to_numpy=True)
+    assert embedding.shape == (4,)
+    assert embedding.dtype == np.float32
+    mock_sentence_transformer.encode.assert_called_with(text, normalize_embeddings=True)
 
 
 @pytest.mark.asyncio
@@ -62,19 +59,17 @@ async def test_generate_embeddings(embedding_provider, mock_sentence_transformer
     texts = ["First test sentence.", "Second test sentence."]
     embeddings = await embedding_provider.get_embeddings(texts)
     
-    # Check embeddings properties
-    assert embeddings is not None
-    assert len(embeddings) == 2
-    assert all(len(embedding) == 4 for embedding in embeddings)
-    assert all(isinstance(val, float) for embedding in embeddings for val in embedding)
-    mock_sentence_transformer.encode.assert_called_with(texts, convert_to_numpy=True)
+    # Check embeddings are returned as one contiguous float32 matrix
+    assert embeddings.shape == (2, 4)
+    assert embeddings.dtype == np.float32 and embeddings.flags.c_contiguous
+    mock_sentence_transformer.encode.assert_called_with(texts, normalize_embeddings=True)
 
 
 @pytest.mark.asyncio
 async def test_calculate_similarity(embedding_provider):
     """Test calculating similarity between embeddings."""
-    embedding1 = [0.1, 0.2, 0.3, 0.4]
-    embedding2 = [0.2, 0.3, 0.4, 0.5]
+    embedding1 = np.asarray([0.1, 0.2, 0.3, 0.4], dtype=np.float32)
+    embedding2 = np.asarray([0.2, 0.3, 0.4, 0.5], dtype=np.float32)
     
     # Calculate similarity
     similarity = embedding_provider.calculate_similarity(embedding1, embedding2)
@@ -84,7 +79,41 @@ async def test_calculate_similarity(embedding_provider):
     
     # Test with identical embeddings
     identical_similarity = embedding_provider.calculate_similarity(embedding1, embedding1)
-    assert abs(identical_similarity - 1.0) < 1e-10
+    assert abs(identical_similarity - 1.0) < 1e-6
+
+
+def _normalized_corpus(corpus_size: int, dim: int) -> np.ndarray:
+    """Build a seeded, row-normalized float32 corpus matrix."""
+    rng = np.random.default_rng(42)
+    corpus = rng.standard_normal((corpus_size, dim), dtype=np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    return corpus
+
+
+def test_calculate_similarity_matrix(embedding_provider):
+    """Test scoring a query against a normalized corpus matrix in one call."""
+    corpus = _normalized_corpus(16, 8)
+    query = corpus[7]
+    
+    scores = embedding_provider.calculate_similarity_matrix(query, corpus)
+    
+    assert scores.shape == (16,)
+    assert scores.dtype == np.float32
+    assert int(np.argmax(scores)) == 7
+    assert abs(scores[7] - 1.0) < 1e-5
+    for i in range(len(corpus)):
+        assert abs(scores[i] - embedding_provider.calculate_similarity(query, corpus[i])) < 1e-5
+
+
+@pytest.mark.performance
+@pytest.mark.benchmark(group="embeddings")
+def test_bench_calculate_similarity_matrix(benchmark, embedding_provider):
+    """Benchmark scoring a query against a 10k x 384 corpus."""
+    corpus = _normalized_corpus(10_000, 384)
+    
+    scores = benchmark(embedding_provider.calculate_similarity_matrix, corpus[7], corpus)
+    
+    assert int(np.argmax(scores)) == 7
 
 
 @pytest.mark.asyncio
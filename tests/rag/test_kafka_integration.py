@@ -5,11 +5,13 @@ consumer registration, and message processing.
 """
 
 import pytest
+import asyncio
 import json
+from datetime import datetime
 from unittest.mock import MagicMock, AsyncMock, patch
 
 from app.rag.kafka_integration import KafkaManager, KafkaMessage
-from app.rag.models import Document, DocumentType, AccessLevel
+from app.rag.models import Document, DocumentType, AccessLevel, SearchQuery
 
 
 @pytest.fixture
@@ -32,17 +34,17 @@ def mock_kafka_consumer():
 
 
 @pytest.fixture
-def mock_aiokafka():
-    """Create a mock aiokafka module for testing."""
-    with patch("app.rag.kafka_integration.AIOKafkaProducer", return_value=mock_kafka_producer()), \
-         patch("app.rag.kafka_integration.AIOKafkaConsumer", return_value=mock_kafka_consumer()):
-        yield
+def mock_aiokafka(mock_kafka_producer, mock_kafka_consumer):
+    """Patch the aiokafka clients, yielding the patched producer class."""
+    with patch("app.rag.kafka_integration.AIOKafkaProducer", return_value=mock_kafka_producer) as producer_class, \
+         patch("app.rag.kafka_integration.AIOKafkaConsumer", return_value=mock_kafka_consumer):
+        yield producer_class
 
 
 @pytest.fixture
 def kafka_manager(mock_aiokafka):
     """Create a Kafka manager for testing."""
-    return KafkaManager(bootstrap_servers="localhost:9092")
+    return KafkaManager()
 
 
 @pytest.fixture
@@ -51,7 +53,7 @@ def sample_document():
     return Document(
         title="Test Document",
         content="This is a test document for Kafka integration testing.",
-        document_type=DocumentType.GUIDE,
+        document_type=DocumentType.MANUAL,
         access_level=AccessLevel.INTERNAL,
         metadata={"department": "engineering", "tags": ["test", "kafka"]}
     )
@@ -74,100 +76,208 @@ async def test_initialize_and_shutdown(kafka_manager):
 
 
 @pytest.mark.asyncio
-async def test_send_document_ingestion_message(kafka_manager, sample_document):
-    """Test sending a document ingestion message."""
-    # Send message
-    await kafka_manager.send_document_ingestion_message(sample_document)
+@pytest.mark.parametrize("method,build_args,topic,message_type,expected_payload", [
+    (
+        "send_document_ingestion_message",
+        lambda document: (document,),
+        KafkaManager.DOCUMENT_INGESTION_TOPIC,
+        "document_ingestion",
+        {"title": "Test Document", "document_type": "manual"},
+    ),
+    (
+        "send_document_search_message",
+        lambda document: (SearchQuery(query="test query", filters=[{"field": "document_type", "value": "manual"}]),),
+        KafkaManager.DOCUMENT_SEARCH_TOPIC,
+        "document_search",
+        {"query": "test query", "filters": [{"field": "document_type", "value": "manual"}]},
+    ),
+    (
+        "send_document_update_message",
+        lambda document: (document.model_copy(update={"id": "doc123"}),),
+        KafkaManager.DOCUMENT_UPDATE_TOPIC,
+        "document_update",
+        {"id": "doc123", "title": "Test Document"},
+    ),
+    (
+        "send_document_delete_message",
+        lambda document: ("doc123",),
+        KafkaManager.DOCUMENT_DELETE_TOPIC,
+        "document_delete",
+        {"document_id": "doc123"},
+    ),
+], ids=["ingestion", "search", "update", "delete"])
+async def test_send_document_message(kafka_manager, mock_aiokafka, sample_document, method, build_args, topic,
+                                     message_type, expected_payload):
+    """Test that each send method publishes a serializable message to its topic.
     
-    # Check if message was sent correctly
-    kafka_manager.producer.send_and_wait.assert_called_once()
-    args, _ = kafka_manager.producer.send_and_wait.call_args
+    ``expected_payload`` lists payload keys and their expected values.
+    """
+    await kafka_manager.initialize()
+    
+    assert await getattr(kafka_manager, method)(*build_args(sample_document)) is True
     
     # Check topic
-    assert args[0] == "document_ingestion"
+    kafka_manager.producer.send_and_wait.assert_called_once()
+    sent_topic, value = kafka_manager.producer.send_and_wait.call_args.args
+    assert sent_topic == topic
+    
+    # Check message content after the producer's own serializer
+    serializer = mock_aiokafka.call_args.kwargs["value_serializer"]
+    message = json.loads(serializer(value))
+    assert message["message_type"] == message_type
+    assert message["message_id"]
+    for key, expected in expected_payload.items():
+        assert message["payload"][key] == expected
     
-    # Check message content
-    message_value = args[1]
-    message_dict = json.loads(message_value)
-    assert "message_type" in message_dict
-    assert message_dict["message_type"] == "document_ingestion"
-    assert "document" in message_dict
-    assert message_dict["document"]["title"] == sample_document.title
+    await kafka_manager.shutdown()
+
+
+@pytest.fixture
+def batch_producer():
+    """Create a mock producer that accepts record batches."""
+    producer = MagicMock()
+    producer.batch = MagicMock()
+    producer.batch.record_count.return_value = 2
+    producer.create_batch.return_value = producer.batch
+    producer.partitions_for = AsyncMock(return_value={0, 1})
+    producer.send_batch = AsyncMock(side_effect=lambda *args, **kwargs: asyncio.sleep(0))
+    producer.stop = AsyncMock()
+    return producer
 
 
 @pytest.mark.asyncio
-async def test_send_document_search_message(kafka_manager):
-    """Test sending a document search message."""
-    # Test data
-    query = "test query"
-    filters = {"document_type": "guide"}
+async def test_enqueue_and_flush_sends_batch(kafka_manager, batch_producer, sample_document):
+    """Test that queued messages are sent as one batch on flush."""
+    kafka_manager.producer = batch_producer
     
-    # Send message
-    await kafka_manager.send_document_search_message(query, filters)
+    # Queue messages; nothing is sent yet
+    await kafka_manager.enqueue_ingestion(sample_document)
+    await kafka_manager.enqueue_ingestion(sample_document)
+    batch_producer.send_batch.assert_not_called()
     
-    # Check if message was sent correctly
-    kafka_manager.producer.send_and_wait.assert_called_once()
-    args, _ = kafka_manager.producer.send_and_wait.call_args
+    # Flush sends both messages in a single batch
+    assert await kafka_manager.flush() is True
+    batch_producer.send_batch.assert_called_once_with(
+        batch_producer.batch, KafkaManager.DOCUMENT_INGESTION_TOPIC, partition=0
+    )
+    batch_producer.send_and_wait.assert_not_called()
     
-    # Check topic
-    assert args[0] == "document_search"
+    messages = [json.loads(call.kwargs["value"]) for call in batch_producer.batch.append.call_args_list]
+    assert len(messages) == 2
+    assert all(message["message_type"] == "document_ingestion" for message in messages)
     
-    # Check message content
-    message_value = args[1]
-    message_dict = json.loads(message_value)
-    assert "message_type" in message_dict
-    assert message_dict["message_type"] == "document_search"
-    assert "query" in message_dict
-    assert message_dict["query"] == query
-    assert "filters" in message_dict
-    assert message_dict["filters"] == filters
+    # Nothing left to send
+    batch_producer.send_batch.reset_mock()
+    await kafka_manager.flush()
+    batch_producer.send_batch.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_send_document_update_message(kafka_manager, sample_document):
-    """Test sending a document update message."""
-    # Send message
-    document_id = "doc123"
-    await kafka_manager.send_document_update_message(document_id, sample_document)
+async def test_enqueue_flushes_at_batch_limit(kafka_manager, batch_producer):
+    """Test that reaching batch_max_messages flushes the topic immediately."""
+    kafka_manager.producer = batch_producer
+    kafka_manager.batch_max_messages = 2
     
-    # Check if message was sent correctly
-    kafka_manager.producer.send_and_wait.assert_called_once()
-    args, _ = kafka_manager.producer.send_and_wait.call_args
+    await kafka_manager.enqueue_delete("doc1")
+    batch_producer.send_batch.assert_not_called()
     
-    # Check topic
-    assert args[0] == "document_update"
+    await kafka_manager.enqueue_delete("doc2")
+    batch_producer.send_batch.assert_called_once()
+    assert batch_producer.send_batch.call_args.args[1] == KafkaManager.DOCUMENT_DELETE_TOPIC
+
+
+@pytest.mark.asyncio
+async def test_flushes_rotate_partitions(kafka_manager, batch_producer):
+    """Test that successive single-batch flushes go to different partitions."""
+    kafka_manager.producer = batch_producer
+    
+    for document_id in ("doc1", "doc2", "doc3"):
+        await kafka_manager.enqueue_delete(document_id)
+        await kafka_manager.flush()
     
-    # Check message content
-    message_value = args[1]
-    message_dict = json.loads(message_value)
-    assert "message_type" in message_dict
-    assert message_dict["message_type"] == "document_update"
-    assert "document_id" in message_dict
-    assert message_dict["document_id"] == document_id
-    assert "document" in message_dict
+    partitions = [call.kwargs["partition"] for call in batch_producer.send_batch.call_args_list]
+    assert partitions == [0, 1, 0]
 
 
 @pytest.mark.asyncio
-async def test_send_document_deletion_message(kafka_manager):
-    """Test sending a document deletion message."""
-    # Send message
-    document_id = "doc123"
-    await kafka_manager.send_document_deletion_message(document_id)
+async def test_failed_flush_requeues_messages(kafka_manager, batch_producer):
+    """Test that messages from a failed send stay queued for the next flush."""
+    kafka_manager.producer = batch_producer
+    batch_producer.send_batch.side_effect = Exception("broker unavailable")
     
-    # Check if message was sent correctly
-    kafka_manager.producer.send_and_wait.assert_called_once()
-    args, _ = kafka_manager.producer.send_and_wait.call_args
+    await kafka_manager.enqueue_delete("doc1")
+    await kafka_manager.enqueue_delete("doc2")
+    assert await kafka_manager.flush() is False
+    assert len(kafka_manager._pending[KafkaManager.DOCUMENT_DELETE_TOPIC]) == 2
     
-    # Check topic
-    assert args[0] == "document_deletion"
+    # The next flush delivers them
+    batch_producer.send_batch.side_effect = lambda *args, **kwargs: asyncio.sleep(0)
+    assert await kafka_manager.flush() is True
+    assert not kafka_manager._pending[KafkaManager.DOCUMENT_DELETE_TOPIC]
+    assert kafka_manager._pending_bytes[KafkaManager.DOCUMENT_DELETE_TOPIC] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_drops_messages_after_max_retries(kafka_manager, batch_producer):
+    """Test that messages are dropped once they have failed send_max_retries retries."""
+    kafka_manager.producer = batch_producer
+    kafka_manager.send_max_retries = 2
+    batch_producer.send_batch.side_effect = Exception("broker unavailable")
+    
+    await kafka_manager.enqueue_delete("doc1")
+    
+    # The first send and two retries fail and keep the message queued
+    for _ in range(2):
+        assert await kafka_manager.flush() is False
+        assert len(kafka_manager._pending[KafkaManager.DOCUMENT_DELETE_TOPIC]) == 1
+    
+    # The third failure exhausts the retries
+    assert await kafka_manager.flush() is False
+    assert not kafka_manager._pending[KafkaManager.DOCUMENT_DELETE_TOPIC]
+    assert kafka_manager._pending_bytes[KafkaManager.DOCUMENT_DELETE_TOPIC] == 0
+    assert batch_producer.send_batch.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_oversize_message_is_rejected(kafka_manager, batch_producer):
+    """Test that a message too large for an empty batch is dropped and reported, not counted as sent."""
+    kafka_manager.producer = batch_producer
+    # Like aiokafka's BatchBuilder, append returns None when the value does not fit
+    batch_producer.batch.append.side_effect = lambda key, value, timestamp: None if len(value) > 1000 else MagicMock()
+    
+    await kafka_manager.enqueue_delete("doc1")
+    await kafka_manager.enqueue_delete("x" * 2000)
+    await kafka_manager.enqueue_delete("doc2")
+    
+    assert await kafka_manager.flush() is False
+    
+    # doc1 goes out before the oversize message is retried alone, then doc2 follows
+    assert batch_producer.send_batch.call_count == 2
+    appended = [
+        json.loads(call.kwargs["value"])["payload"]["document_id"]
+        for call in batch_producer.batch.append.call_args_list
+        if len(call.kwargs["value"]) <= 1000
+    ]
+    assert appended == ["doc1", "doc2"]
+    
+    # The oversize message is not re-queued
+    assert not kafka_manager._pending[KafkaManager.DOCUMENT_DELETE_TOPIC]
+    assert await kafka_manager.send_batch(KafkaManager.DOCUMENT_DELETE_TOPIC, [b"x" * 2000]) is False
+
+
+@pytest.mark.asyncio
+async def test_shutdown_flushes_queued_messages(kafka_manager, batch_producer):
+    """Test that shutdown stops the flush loop and sends what is still queued."""
+    await kafka_manager.initialize()
+    flush_task = kafka_manager._flush_task
+    kafka_manager.producer = batch_producer
+    
+    await kafka_manager.enqueue_delete("doc1")
+    await kafka_manager.shutdown()
     
-    # Check message content
-    message_value = args[1]
-    message_dict = json.loads(message_value)
-    assert "message_type" in message_dict
-    assert message_dict["message_type"] == "document_deletion"
-    assert "document_id" in message_dict
-    assert message_dict["document_id"] == document_id
+    assert flush_task.cancelled()
+    batch_producer.send_batch.assert_called_once()
+    batch_producer.stop.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -175,14 +285,14 @@ async def test_register_consumer(kafka_manager):
     """Test registering a consumer for a topic."""
     # Test data
     topic = "test_topic"
-    group_id = "test_group"
     handler = AsyncMock()
     
     # Register consumer
-    await kafka_manager.register_consumer(topic, group_id, handler)
+    await kafka_manager.register_consumer(topic, handler)
     
     # Check if consumer was registered and started
     assert topic in kafka_manager.consumers
+    assert kafka_manager.handlers[topic] is handler
     kafka_manager.consumers[topic].start.assert_called_once()
 
 
@@ -191,20 +301,20 @@ async def test_kafka_message_model():
     """Test the KafkaMessage model."""
     # Create a message
     message = KafkaMessage(
+        message_id="msg123",
         message_type="test_type",
-        data={"key": "value"},
-        timestamp="2023-01-01T12:00:00"
+        timestamp="2023-01-01T12:00:00",
+        payload={"key": "value"}
     )
     
     # Check message properties
+    assert message.message_id == "msg123"
     assert message.message_type == "test_type"
-    assert message.data == {"key": "value"}
-    assert message.timestamp == "2023-01-01T12:00:00"
+    assert message.payload == {"key": "value"}
+    assert message.timestamp == datetime(2023, 1, 1, 12, 0)
     
     # Test serialization
     serialized = message.model_dump_json()
     deserialized = KafkaMessage.model_validate_json(serialized)
     
-    assert deserialized.message_type == message.message_type
-    assert deserialized.data == message.data
-    assert deserialized.timestamp == message.timestamp
\ No newline at end of file
+    assert deserialized == message
@@ -5,226 +5,221 @@ Tests the Pydantic models used in the RAG engine.
 
 import pytest
 from datetime import datetime
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from app.rag.models import (
-    Document, DocumentType, AccessLevel, DocumentChunk, 
-    SearchQuery, SearchFilter, SearchResult, KafkaMessage, MessageType
+    Document, DocumentType, AccessLevel, DocumentChunk,
+    SearchQuery, SearchFilter, SearchResult, compute_content_hash
 )
+from app.rag.kafka_integration import KafkaMessage
+
+# Adapters are built once and reused by every validation in the module
+DOC_ADAPTER = TypeAdapter(Document)
+CHUNK_ADAPTER = TypeAdapter(DocumentChunk)
+QUERY_ADAPTER = TypeAdapter(SearchQuery)
+FILTER_ADAPTER = TypeAdapter(SearchFilter)
+RESULT_ADAPTER = TypeAdapter(SearchResult)
+KAFKA_ADAPTER = TypeAdapter(KafkaMessage)
+
+_DOC_DEFAULTS = {
+    "title": "Test Document",
+    "content": "This is a test document.",
+    "document_type": DocumentType.MANUAL,
+    "access_level": AccessLevel.INTERNAL,
+    "metadata": {"department": "engineering", "tags": ["test"]},
+}
+
+
+def _doc(**kw):
+    """Validate a Document built from the defaults, with overrides."""
+    return DOC_ADAPTER.validate_python({**_DOC_DEFAULTS, **kw})
 
 
 def test_document_model():
     """Test Document model validation."""
-    # Valid document
-    document = Document(
-        title="Test Document",
-        content="This is a test document.",
-        document_type=DocumentType.GUIDE,
-        access_level=AccessLevel.INTERNAL,
-        metadata={"department": "engineering", "tags": ["test"]}
-    )
+    # Valid document (the validator fills the timestamp defaults)
+    document = _doc()
     
+    assert document.id is None
     assert document.title == "Test Document"
     assert document.content == "This is a test document."
-    assert document.document_type == DocumentType.GUIDE
+    assert document.document_type == DocumentType.MANUAL
     assert document.access_level == AccessLevel.INTERNAL
     assert document.metadata["department"] == "engineering"
     assert document.metadata["tags"] == ["test"]
-    assert document.created_at is not None
-    assert document.updated_at is not None
+    assert document.version == "1.0"
+    assert isinstance(document.created_at, datetime)
+    assert isinstance(document.updated_at, datetime)
     
-    # Test with document_id
-    document_with_id = Document(
-        document_id="doc123",
-        title="Test Document",
-        content="This is a test document.",
-        document_type=DocumentType.GUIDE,
-        access_level=AccessLevel.INTERNAL,
-        metadata={"department": "engineering", "tags": ["test"]}
-    )
+    # Test with id
+    document_with_id = _doc(id="doc123")
     
-    assert document_with_id.document_id == "doc123"
+    assert document_with_id.id == "doc123"
     
     # Test invalid document (missing required fields)
     with pytest.raises(ValidationError):
-        Document(title="Test Document")
+        DOC_ADAPTER.validate_python({"title": "Test Document"})
 
 
 def test_document_chunk_model():
     """Test DocumentChunk model validation."""
     # Valid document chunk
-    chunk = DocumentChunk(
-        document_id="doc123",
-        chunk_id="chunk1",
-        content="This is a chunk of text.",
-        metadata={"position": 1, "tokens": 7}
-    )
+    chunk = CHUNK_ADAPTER.validate_python({
+        "document_id": "doc123",
+        "content": "This is a chunk of text.",
+        "metadata": {"position": 1, "tokens": 7},
+        "chunk_index": 1
+    })
     
     assert chunk.document_id == "doc123"
-    assert chunk.chunk_id == "chunk1"
     assert chunk.content == "This is a chunk of text."
     assert chunk.metadata["position"] == 1
     assert chunk.metadata["tokens"] == 7
+    assert chunk.chunk_index == 1
+    assert chunk.document_type is None
+    
+    # The content hash is filled from the text unless one is given
+    assert chunk.content_hash == compute_content_hash("This is a chunk of text.")
+    assert CHUNK_ADAPTER.validate_python({
+        "document_id": "doc123",
+        "content": "This is a chunk of text.",
+        "content_hash": "precomputed"
+    }).content_hash == "precomputed"
     
     # Test invalid chunk (missing required fields)
     with pytest.raises(ValidationError):
-        DocumentChunk(document_id="doc123")
+        CHUNK_ADAPTER.validate_python({"document_id": "doc123"})
 
 
 def test_search_query_model():
     """Test SearchQuery model validation."""
     # Valid search query without filters
-    query = SearchQuery(
-        query_text="test query",
-        max_results=5
-    )
+    query = QUERY_ADAPTER.validate_python({"query": "test query", "max_results": 5})
     
-    assert query.query_text == "test query"
+    assert query.query == "test query"
     assert query.max_results == 5
-    assert query.filters is None
+    assert query.filters == []
+    assert query.collection_name is None
+    assert query.similarity_threshold is None
+    assert query.hybrid_search is False
     
     # Valid search query with filters
-    query_with_filters = SearchQuery(
-        query_text="test query",
-        filters=SearchFilter(
-            document_type=DocumentType.GUIDE,
-            access_level=AccessLevel.INTERNAL,
-            metadata={"department": "engineering"}
-        ),
-        max_results=10
-    )
-    
-    assert query_with_filters.query_text == "test query"
+    query_with_filters = QUERY_ADAPTER.validate_python({
+        "query": "test query",
+        "filters": [
+            {"field": "document_type", "value": DocumentType.MANUAL.value},
+            {"field": "access_level", "value": AccessLevel.INTERNAL.value}
+        ],
+        "max_results": 10,
+        "similarity_threshold": 0.7
+    })
+    
+    assert query_with_filters.query == "test query"
     assert query_with_filters.max_results == 10
-    assert query_with_filters.filters.document_type == DocumentType.GUIDE
-    assert query_with_filters.filters.access_level == AccessLevel.INTERNAL
-    assert query_with_filters.filters.metadata["department"] == "engineering"
+    assert query_with_filters.similarity_threshold == 0.7
+    assert query_with_filters.filters[0] == {"field": "document_type", "value": "manual"}
+    assert query_with_filters.filters[1]["value"] == "internal"
     
-    # Test invalid query (missing required fields)
+    # Test invalid queries (missing query text, filters not a list)
+    with pytest.raises(ValidationError):
+        QUERY_ADAPTER.validate_python({"max_results": 5})
     with pytest.raises(ValidationError):
-        SearchQuery(max_results=5)
+        QUERY_ADAPTER.validate_python({"query": "test query", "filters": {"field": "document_type"}})
 
 
 def test_search_filter_model():
     """Test SearchFilter model validation."""
     # Valid search filter with all fields
-    filter_all = SearchFilter(
-        document_type=DocumentType.GUIDE,
-        access_level=AccessLevel.INTERNAL,
-        metadata={"department": "engineering", "tags": ["test"]},
-        date_range={"start": datetime.utcnow(), "end": datetime.utcnow()}
-    )
+    filter_all = FILTER_ADAPTER.validate_python({
+        "field": "metadata.tags",
+        "value": ["test", "documentation"],
+        "operator": "in"
+    })
     
-    assert filter_all.document_type == DocumentType.GUIDE
-    assert filter_all.access_level == AccessLevel.INTERNAL
-    assert filter_all.metadata["department"] == "engineering"
-    assert filter_all.date_range["start"] is not None
+    assert filter_all.field == "metadata.tags"
+    assert filter_all.value == ["test", "documentation"]
+    assert filter_all.operator == "in"
     
-    # Valid search filter with some fields
-    filter_some = SearchFilter(
-        document_type=DocumentType.GUIDE
-    )
+    # Valid search filter with the default operator
+    filter_eq = FILTER_ADAPTER.validate_python({"field": "document_type", "value": DocumentType.MANUAL})
     
-    assert filter_some.document_type == DocumentType.GUIDE
-    assert filter_some.access_level is None
-    assert filter_some.metadata is None
-    assert filter_some.date_range is None
+    assert filter_eq.field == "document_type"
+    assert filter_eq.value == DocumentType.MANUAL
+    assert filter_eq.operator == "=="
     
-    # Valid empty search filter
-    filter_empty = SearchFilter()
-    
-    assert filter_empty.document_type is None
-    assert filter_empty.access_level is None
-    assert filter_empty.metadata is None
-    assert filter_empty.date_range is None
+    # Test invalid filter (missing required fields)
+    with pytest.raises(ValidationError):
+        FILTER_ADAPTER.validate_python({"field": "document_type"})
 
 
 def test_search_result_model():
     """Test SearchResult model validation."""
     # Valid search result with all fields
-    result = SearchResult(
-        document_id="doc123",
-        content="This is a test document.",
-        score=0.95,
-        metadata={"title": "Test Document", "document_type": "guide"}
-    )
-    
-    assert result.document_id == "doc123"
-    assert result.content == "This is a test document."
-    assert result.score == 0.95
-    assert result.metadata["title"] == "Test Document"
-    
-    # Test invalid result (missing required fields)
-    with pytest.raises(ValidationError):
-        SearchResult(document_id="doc123")
-
-
-def test_kafka_message_model():
-    """Test KafkaMessage model validation."""
-    # Valid message for document ingestion
-    ingestion_msg = KafkaMessage(
-        message_type=MessageType.DOCUMENT_INGESTION,
-        data={
-            "document": {
-                "title": "Test Document",
+    result = RESULT_ADAPTER.validate_python({
+        "query": "test query",
+        "results": [
+            {
+                "chunk_id": "chunk1",
+                "document_id": "doc123",
                 "content": "This is a test document.",
-                "document_type": "guide",
-                "access_level": "internal",
-                "metadata": {"department": "engineering"}
-            }
-        }
-    )
-    
-    assert ingestion_msg.message_type == MessageType.DOCUMENT_INGESTION
-    assert ingestion_msg.data["document"]["title"] == "Test Document"
-    
-    # Valid message for document search
-    search_msg = KafkaMessage(
-        message_type=MessageType.DOCUMENT_SEARCH,
-        data={
-            "query": {
-                "query_text": "test query",
-                "max_results": 5
+                "similarity": 0.95
             }
-        }
-    )
-    
-    assert search_msg.message_type == MessageType.DOCUMENT_SEARCH
-    assert search_msg.data["query"]["query_text"] == "test query"
-    
-    # Valid message for document update
-    update_msg = KafkaMessage(
-        message_type=MessageType.DOCUMENT_UPDATE,
-        data={
-            "document_id": "doc123",
-            "document": {
-                "title": "Updated Document",
-                "content": "This is an updated document.",
-                "document_type": "guide",
-                "access_level": "internal"
-            }
-        }
-    )
+        ],
+        "total_results": 1,
+        "search_time_ms": 12.5,
+        "metadata": {"collection": "erp_manuals"}
+    })
     
-    assert update_msg.message_type == MessageType.DOCUMENT_UPDATE
-    assert update_msg.data["document_id"] == "doc123"
+    assert result.query == "test query"
+    assert result.results[0]["document_id"] == "doc123"
+    assert result.results[0]["similarity"] == 0.95
+    assert result.total_results == 1
+    assert result.search_time_ms == 12.5
+    assert result.metadata["collection"] == "erp_manuals"
     
-    # Valid message for document deletion
-    delete_msg = KafkaMessage(
-        message_type=MessageType.DOCUMENT_DELETION,
-        data={"document_id": "doc123"}
-    )
+    # Valid empty search result
+    empty = RESULT_ADAPTER.validate_python({"query": "test query"})
     
-    assert delete_msg.message_type == MessageType.DOCUMENT_DELETION
-    assert delete_msg.data["document_id"] == "doc123"
+    assert empty.results == []
+    assert empty.total_results == 0
     
-    # Test invalid message (missing required fields)
+    # Test invalid result (missing required fields)
+    with pytest.raises(ValidationError):
+        RESULT_ADAPTER.validate_python({"results": []})
+
+
+@pytest.mark.parametrize("message_type,payload", [
+    ("document_ingestion", _DOC_DEFAULTS),
+    ("document_update", {**_DOC_DEFAULTS, "id": "doc123"}),
+    ("document_delete", {"document_id": "doc123"}),
+    ("document_search", {"query": "test query", "filters": [], "max_results": 5}),
+])
+def test_kafka_message_model(message_type, payload):
+    """Test KafkaMessage model validation for each message the manager sends."""
+    message = KAFKA_ADAPTER.validate_python({
+        "message_id": "msg123",
+        "message_type": message_type,
+        "timestamp": "2024-01-01T00:00:00",
+        "payload": payload
+    })
+    
+    assert message.message_id == "msg123"
+    assert message.message_type == message_type
+    assert message.timestamp == datetime(2024, 1, 1)
+    assert message.payload == payload
+
+
+def test_kafka_message_model_invalid():
+    """Test KafkaMessage rejects messages missing required fields."""
+    # Missing id, timestamp and payload
     with pytest.raises(ValidationError):
-        KafkaMessage(message_type=MessageType.DOCUMENT_INGESTION)
+        KAFKA_ADAPTER.validate_python({"message_type": "document_ingestion"})
     
-    # Test invalid message (missing data fields)
+    # Payload must be a mapping
     with pytest.raises(ValidationError):
-        KafkaMessage(
-            message_type=MessageType.DOCUMENT_INGESTION,
-            data={}
-        )
\ No newline at end of file
+        KAFKA_ADAPTER.validate_python({
+            "message_id": "msg123",
+            "message_type": "document_ingestion",
+            "timestamp": "2024-01-01T00:00:00",
+            "payload": "not a mapping"
+        })
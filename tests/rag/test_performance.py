@@ -1,13 +1,16 @@
 """Performance tests for the RAG engine.
 
 Tests the performance and scalability of the RAG engine under various loads.
+Timings are reported with ``record_property``; run with
+``--junitxml=out.xml`` to collect them. The module is marked ``performance``
+and only runs with ``--run-perf``.
 """
 
 import pytest
 import asyncio
-import time
-import uuid
-from unittest.mock import MagicMock, AsyncMock, patch
+import functools
+import itertools
+from unittest.mock import AsyncMock, patch
 
 from app.rag.engine import RAGEngine
 from app.rag.document_processor import DocumentProcessor
@@ -16,234 +19,307 @@ from app.rag.embeddings import EmbeddingProvider
 from app.rag.service import RAGService
 from app.rag.models import Document, DocumentType, AccessLevel, SearchQuery
 
+pytestmark = pytest.mark.performance
 
-@pytest.fixture
-def mock_rag_service():
-    """Create a mock RAG service with controlled performance characteristics."""
-    service = MagicMock(spec=RAGService)
+# Built once at import and shared by the document factories below
+_MANUAL = DocumentType.MANUAL
+_INTERNAL = AccessLevel.INTERNAL
+_CONCURRENT_CONTENT = "This is test document X for concurrent ingestion testing. " * 20
+_MIXED_CONTENT = "This is test document X for mixed workload testing. " * 20
+_FILLER = "A" * 50000  # Sliced for each ingestion size
+_QUERY_DEFAULTS = {"max_results": 5, "filters": None}
+
+# Scaling bounds: doubling the size must less than double the time, and 10
+# concurrent operations must take less than 10x a single one
+_MAX_SIZE_RATIO = 2
+_MAX_CONCURRENCY_RATIO = 10
+
+# Cheap unique ids for the simulated service
+_DOC_IDS = itertools.count()
+_VEC_IDS = itertools.count()
+
+
+def _query(text):
+    """Build a search query from the shared defaults without running validation."""
+    return SearchQuery.model_construct(query=text, **_QUERY_DEFAULTS)
+
+
+@functools.lru_cache(maxsize=16)
+def _results_template(n):
+    """Build the simulated search results for ``n`` hits once per size."""
+    return tuple(
+        {"document_id": f"doc-{i}", "content": f"Result {i}", "score": 0.9 - (i * 0.05), "metadata": {}}
+        for i in range(n)
+    )
+
+
+class _VirtualClock:
+    """Virtual time source for the running event loop.
     
-    # Configure the mock to simulate realistic processing times
-    async def simulated_ingest(document):
-        # Simulate processing time based on document size
-        await asyncio.sleep(0.01 * (len(document.content) // 100 + 1))  # 10ms per 100 chars
-        return True, f"doc-{uuid.uuid4()}", [f"vector-{uuid.uuid4()}", f"vector-{uuid.uuid4()}"]
+    The loop's ``time()`` reads the virtual clock and its selector, instead of
+    blocking until the next timer is due, advances the clock by the timeout.
+    ``asyncio.sleep`` therefore returns immediately while concurrent sleeps
+    still resolve at max(dt) rather than sum(dt).
+    """
     
-    async def simulated_search(query):
-        # Simulate search time based on complexity
-        await asyncio.sleep(0.05)  # Base 50ms search time
-        return [
-            {"document_id": f"doc-{i}", "content": f"Result {i}", "score": 0.9 - (i * 0.05), "metadata": {}}
-            for i in range(query.max_results)
-        ]
+    def __init__(self):
+        self.now = 0.0
     
-    service.ingest_document = AsyncMock(side_effect=simulated_ingest)
-    service.search = AsyncMock(side_effect=simulated_search)
+    def time(self):
+        return self.now
     
-    return service
+    def time_ns(self):
+        return round(self.now * 1e9)
+    
+    def wrap_select(self, select):
+        def virtual_select(timeout=None):
+            if timeout is not None:
+                self.now += timeout
+            return select(0)
+        return virtual_select
 
 
-@pytest.mark.asyncio
-async def test_document_ingestion_performance(mock_rag_service):
-    """Test document ingestion performance with documents of varying sizes."""
-    document_sizes = [1000, 5000, 10000, 50000]  # Characters
-    results = {}
+@pytest.fixture(scope="module")
+def event_loop():
+    """Run this module on the stdlib loop, whose selector the virtual clock patches."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+async def virtual_clock():
+    """Run the test's event loop on virtual time."""
+    clock = _VirtualClock()
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "time", clock.time), \
+         patch.object(loop._selector, "select", clock.wrap_select(loop._selector.select)):
+        yield clock
+
+
+async def simulated_ingest(document):
+    """Simulate ingestion time based on document size."""
+    await asyncio.sleep(0.01 * (len(document.content) // 100 + 1))  # 10ms per 100 chars
+    doc_id = f"doc-{next(_DOC_IDS)}"
+    vector_ids = [f"vector-{next(_VEC_IDS)}", f"vector-{next(_VEC_IDS)}"]
+    return True, doc_id, vector_ids
+
+
+async def simulated_search(query):
+    """Simulate search time with a fixed base latency."""
+    await asyncio.sleep(0.05)  # Base 50ms search time
+    return list(_results_template(query.max_results))
+
+
+class _StubRAG:
+    """RAG service stub exposing only the methods the performance tests call."""
     
-    for size in document_sizes:
-        document = Document(
+    def __init__(self):
+        self.ingest_document = AsyncMock(side_effect=simulated_ingest)
+        self.search = AsyncMock(side_effect=simulated_search)
+
+
+@pytest.fixture
+def mock_rag_service():
+    """Create a RAG service stub with controlled performance characteristics."""
+    return _StubRAG()
+
+
+@pytest.fixture(scope="module")
+def prebuilt_documents():
+    """Build one unvalidated document per size, shared by the module's tests."""
+    return {
+        size: Document.model_construct(
             title=f"Performance Test Document ({size} chars)",
-            content="A" * size,  # Create document with specified size
-            document_type=DocumentType.GUIDE,
-            access_level=AccessLevel.INTERNAL,
+            content=_FILLER[:size],  # Create document with specified size
+            document_type=_MANUAL,
+            access_level=_INTERNAL,
             metadata={"test": "performance"}
         )
-        
-        # Measure ingestion time
-        start_time = time.time()
-        success, doc_id, vector_ids = await mock_rag_service.ingest_document(document)
-        end_time = time.time()
-        
-        results[size] = {
-            "time": end_time - start_time,
-            "success": success,
-            "doc_id": doc_id,
-            "vector_count": len(vector_ids)
-        }
-    
-    # Log results
-    for size, result in results.items():
-        print(f"Document size: {size} chars, Ingestion time: {result['time']:.4f}s")
-        assert result["success"] is True
-    
-    # Verify performance scales reasonably with document size
-    # This is a simple check that larger documents take longer, but not excessively
-    assert results[5000]["time"] > results[1000]["time"]
-    assert results[10000]["time"] > results[5000]["time"]
+        for size in (1000, 5000, 10000, 50000)  # Characters
+    }
+
+
+@pytest.fixture(scope="module")
+def perf_record():
+    """Collect elapsed times per (test, parameter) for the scaling checks."""
+    return {}
+
+
+def _recorded(perf_record, test, keys):
+    """Return the recorded times for ``test`` or skip if any are missing.
+    
+    Parametrized cases may run on other workers under pytest-xdist, in which
+    case the scaling check has nothing to compare.
+    """
+    missing = [key for key in keys if (test, key) not in perf_record]
+    if missing:
+        pytest.skip(f"{test} not recorded for {missing} in this process")
+    return {key: perf_record[(test, key)] for key in keys}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1000, 5000, 10000, 50000])  # Characters
+async def test_document_ingestion_performance(mock_rag_service, prebuilt_documents, virtual_clock, perf_record, record_property, size):
+    """Test document ingestion performance for one document size."""
+    document = prebuilt_documents[size]
+    
+    # Measure ingestion time
+    start = virtual_clock.time_ns()
+    success, doc_id, vector_ids = await mock_rag_service.ingest_document(document)
+    elapsed_ns = virtual_clock.time_ns() - start
+    perf_record[("ingestion", size)] = elapsed_ns
+    
+    record_property(f"ingest_ns_{size}", elapsed_ns)
+    assert success is True
+    assert doc_id
+    assert len(vector_ids) == 2
+
+
+def test_ingestion_scales_sublinearly(perf_record):
+    """Test that ingestion time grows with document size, but not excessively."""
+    results = _recorded(perf_record, "ingestion", [1000, 5000, 10000])
+    
+    assert results[5000] > results[1000]
+    assert results[10000] > results[5000]
     # The ratio should be sublinear (less than proportional increase)
-    assert results[10000]["time"] / results[5000]["time"] < 10000 / 5000
+    assert results[10000] < results[5000] * _MAX_SIZE_RATIO
 
 
 @pytest.mark.asyncio
-async def test_search_performance(mock_rag_service):
-    """Test search performance with varying result sizes."""
-    result_sizes = [5, 10, 20, 50]
-    results = {}
-    
-    for size in result_sizes:
-        query = SearchQuery(
-            query_text="performance test query",
-            max_results=size
-        )
-        
-        # Measure search time
-        start_time = time.time()
-        search_results = await mock_rag_service.search(query)
-        end_time = time.time()
-        
-        results[size] = {
-            "time": end_time - start_time,
-            "result_count": len(search_results)
-        }
-    
-    # Log results
-    for size, result in results.items():
-        print(f"Result size: {size}, Search time: {result['time']:.4f}s")
-        assert result["result_count"] == size
-    
-    # Verify performance scales reasonably with result size
-    assert results[10]["time"] >= results[5]["time"]
+@pytest.mark.parametrize("size", [5, 10, 20, 50])
+async def test_search_performance(mock_rag_service, virtual_clock, perf_record, record_property, size):
+    """Test search performance for one result size."""
+    query = SearchQuery(
+        query="performance test query",
+        max_results=size
+    )
+    
+    # Measure search time
+    start = virtual_clock.time_ns()
+    search_results = await mock_rag_service.search(query)
+    elapsed_ns = virtual_clock.time_ns() - start
+    perf_record[("search", size)] = elapsed_ns
+    
+    record_property(f"search_ns_{size}", elapsed_ns)
+    assert len(search_results) == size
+
+
+def test_search_scales_sublinearly(perf_record):
+    """Test that search time grows sublinearly with result size."""
+    results = _recorded(perf_record, "search", [5, 10, 20])
+    
+    assert results[10] >= results[5]
     # The increase should be sublinear
-    assert results[20]["time"] / results[10]["time"] < 20 / 10
+    assert results[20] < results[10] * _MAX_SIZE_RATIO
 
 
 @pytest.mark.asyncio
-async def test_concurrent_ingestion_performance(mock_rag_service):
-    """Test performance of concurrent document ingestions."""
-    concurrency_levels = [1, 5, 10, 20]
-    results = {}
-    
-    for concurrency in concurrency_levels:
-        # Create documents
-        documents = [
-            Document(
-                title=f"Concurrent Test Document {i}",
-                content=f"This is test document {i} for concurrent ingestion testing. " * 20,
-                document_type=DocumentType.GUIDE,
-                access_level=AccessLevel.INTERNAL,
-                metadata={"test": "concurrent", "index": i}
-            )
-            for i in range(concurrency)
-        ]
-        
-        # Measure concurrent ingestion time
-        start_time = time.time()
-        tasks = [mock_rag_service.ingest_document(doc) for doc in documents]
-        ingestion_results = await asyncio.gather(*tasks)
-        end_time = time.time()
-        
-        results[concurrency] = {
-            "total_time": end_time - start_time,
-            "average_time": (end_time - start_time) / concurrency,
-            "success_rate": sum(1 for success, _, _ in ingestion_results if success) / concurrency
-        }
-    
-    # Log results
-    for concurrency, result in results.items():
-        print(f"Concurrency: {concurrency}, Total time: {result['total_time']:.4f}s, "
-              f"Average time: {result['average_time']:.4f}s, "
-              f"Success rate: {result['success_rate']:.2f}")
-        assert result["success_rate"] == 1.0  # All should succeed
-    
-    # Verify concurrent performance is better than sequential
+@pytest.mark.parametrize("concurrency", [1, 5, 10, 20])
+async def test_concurrent_ingestion_performance(mock_rag_service, virtual_clock, perf_record, record_property, concurrency):
+    """Test performance of concurrent document ingestions at one concurrency level."""
+    construct = Document.model_construct
+    ingest = mock_rag_service.ingest_document
+    
+    # Create documents
+    documents = [
+        construct(
+            title=f"Concurrent Test Document {i}",
+            content=_CONCURRENT_CONTENT,
+            document_type=_MANUAL,
+            access_level=_INTERNAL,
+            metadata={"test": "concurrent", "index": i}
+        )
+        for i in range(concurrency)
+    ]
+    
+    # Measure concurrent ingestion time
+    start = virtual_clock.time_ns()
+    async with asyncio.TaskGroup() as tg:
+        handles = [tg.create_task(ingest(doc)) for doc in documents]
+    ingestion_results = [handle.result() for handle in handles]
+    elapsed_ns = virtual_clock.time_ns() - start
+    perf_record[("concurrent_ingestion", concurrency)] = elapsed_ns
+    
+    record_property(f"concurrent_ingest_ns_{concurrency}", elapsed_ns)
+    assert len(ingestion_results) == concurrency
+    assert all(r[0] for r in ingestion_results)  # All should succeed
+
+
+def test_concurrent_ingestion_beats_sequential(perf_record):
+    """Test that concurrent ingestion is faster than sequential ingestion."""
+    results = _recorded(perf_record, "concurrent_ingestion", [1, 10])
+    
     # The total time for 10 concurrent should be less than 10x the time for 1
-    assert results[10]["total_time"] < results[1]["total_time"] * 10
+    assert results[10] < results[1] * _MAX_CONCURRENCY_RATIO
 
 
 @pytest.mark.asyncio
-async def test_concurrent_search_performance(mock_rag_service):
-    """Test performance of concurrent searches."""
-    concurrency_levels = [1, 5, 10, 20]
-    results = {}
-    
-    for concurrency in concurrency_levels:
-        # Create search queries
-        queries = [
-            SearchQuery(
-                query_text=f"concurrent search test query {i}",
-                max_results=5
-            )
-            for i in range(concurrency)
-        ]
-        
-        # Measure concurrent search time
-        start_time = time.time()
-        tasks = [mock_rag_service.search(query) for query in queries]
-        search_results = await asyncio.gather(*tasks)
-        end_time = time.time()
-        
-        results[concurrency] = {
-            "total_time": end_time - start_time,
-            "average_time": (end_time - start_time) / concurrency,
-            "result_count": sum(len(results) for results in search_results)
-        }
-    
-    # Log results
-    for concurrency, result in results.items():
-        print(f"Concurrency: {concurrency}, Total time: {result['total_time']:.4f}s, "
-              f"Average time: {result['average_time']:.4f}s, "
-              f"Results: {result['result_count']}")
-        assert result["result_count"] == concurrency * 5  # Each query returns 5 results
-    
-    # Verify concurrent performance is better than sequential
-    assert results[10]["total_time"] < results[1]["total_time"] * 10
+@pytest.mark.parametrize("concurrency", [1, 5, 10, 20])
+async def test_concurrent_search_performance(mock_rag_service, virtual_clock, perf_record, record_property, concurrency):
+    """Test performance of concurrent searches at one concurrency level."""
+    search = mock_rag_service.search
+    
+    # Create search queries
+    queries = [_query(f"concurrent search test query {i}") for i in range(concurrency)]
+    
+    # Measure concurrent search time
+    start = virtual_clock.time_ns()
+    async with asyncio.TaskGroup() as tg:
+        handles = [tg.create_task(search(query)) for query in queries]
+    search_results = [handle.result() for handle in handles]
+    elapsed_ns = virtual_clock.time_ns() - start
+    perf_record[("concurrent_search", concurrency)] = elapsed_ns
+    
+    result_count = sum(len(results) for results in search_results)
+    record_property(f"concurrent_search_ns_{concurrency}", elapsed_ns)
+    assert result_count == concurrency * 5  # Each query returns 5 results
+
+
+def test_concurrent_search_beats_sequential(perf_record):
+    """Test that concurrent search is faster than sequential search."""
+    results = _recorded(perf_record, "concurrent_search", [1, 10])
+    
+    assert results[10] < results[1] * _MAX_CONCURRENCY_RATIO
 
 
 @pytest.mark.asyncio
-async def test_mixed_workload_performance(mock_rag_service):
+async def test_mixed_workload_performance(mock_rag_service, virtual_clock, record_property):
     """Test performance with a mixed workload of ingestion and search operations."""
     # Create a mix of ingestion and search tasks
     ingestion_count = 5
     search_count = 10
+    construct = Document.model_construct
+    ingest = mock_rag_service.ingest_document
+    search = mock_rag_service.search
     
-    ingestion_tasks = [
-        mock_rag_service.ingest_document(
-            Document(
-                title=f"Mixed Workload Document {i}",
-                content=f"This is test document {i} for mixed workload testing. " * 20,
-                document_type=DocumentType.GUIDE,
-                access_level=AccessLevel.INTERNAL,
-                metadata={"test": "mixed", "index": i}
-            )
+    documents = [
+        construct(
+            title=f"Mixed Workload Document {i}",
+            content=_MIXED_CONTENT,
+            document_type=_MANUAL,
+            access_level=_INTERNAL,
+            metadata={"test": "mixed", "index": i}
         )
         for i in range(ingestion_count)
     ]
+    queries = [_query(f"mixed workload search query {i}") for i in range(search_count)]
     
-    search_tasks = [
-        mock_rag_service.search(
-            SearchQuery(
-                query_text=f"mixed workload search query {i}",
-                max_results=5
-            )
-        )
-        for i in range(search_count)
-    ]
-    
-    # Combine tasks and measure execution time
-    all_tasks = ingestion_tasks + search_tasks
-    start_time = time.time()
-    results = await asyncio.gather(*all_tasks)
-    end_time = time.time()
+    # Run both kinds of task together and measure execution time
+    start = virtual_clock.time_ns()
+    async with asyncio.TaskGroup() as tg:
+        handles = [tg.create_task(ingest(doc)) for doc in documents]
+        handles += [tg.create_task(search(query)) for query in queries]
+    results = [handle.result() for handle in handles]
+    elapsed_ns = virtual_clock.time_ns() - start
     
-    total_time = end_time - start_time
     ingestion_results = results[:ingestion_count]
     search_results = results[ingestion_count:]
     
     # Verify results
-    ingestion_success_rate = sum(1 for success, _, _ in ingestion_results if success) / ingestion_count
     search_result_count = sum(len(results) for results in search_results)
     
-    print(f"Mixed workload - Total time: {total_time:.4f}s, "
-          f"Ingestion success rate: {ingestion_success_rate:.2f}, "
-          f"Search results: {search_result_count}")
+    record_property("mixed_workload_ns", elapsed_ns)
     
-    assert ingestion_success_rate == 1.0  # All ingestions should succeed
+    assert all(r[0] for r in ingestion_results)  # All ingestions should succeed
     assert search_result_count == search_count * 5  # Each search returns 5 results
\ No newline at end of file
@@ -6,28 +6,76 @@ embedding, storage, and retrieval.
 
 import pytest
 import asyncio
+import numpy as np
 from datetime import datetime
-from unittest.mock import MagicMock, patch, AsyncMock
+from unittest.mock import MagicMock, AsyncMock
 
 from app.rag.engine import RAGEngine
-from app.rag.models import Document, DocumentChunk, SearchQuery, SearchFilter, DocumentType, AccessLevel
+from app.rag.models import Document, DocumentChunk, SearchQuery, DocumentType, AccessLevel
 from app.database.connection import DatabaseManager
 
+# Mock embeddings are never mutated, so one array per value is shared
+_EMB_1 = np.full(384, 0.1, dtype=np.float32)
+_EMB_2 = np.full(384, 0.2, dtype=np.float32)
+_EMB_PAIR = np.stack([_EMB_1, _EMB_2])
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def mock_db_manager():
     """Create a mock database manager."""
     db_manager = MagicMock(spec=DatabaseManager)
     return db_manager
 
 
-@pytest.fixture
-def sample_document():
-    """Create a sample document for testing."""
+@pytest.fixture(scope="module")
+def mocked_engine(mock_db_manager):
+    """Create a RAG engine with its embedding and vector store calls mocked, shared by the module's tests."""
+    engine = RAGEngine(mock_db_manager)
+    engine.vector_store.initialize = AsyncMock()
+    engine.vector_store.create_collection_if_not_exists = AsyncMock()
+    engine.embedding_provider.get_embeddings = AsyncMock(return_value=_EMB_PAIR)
+    engine.embedding_provider.get_embedding = AsyncMock(return_value=_EMB_1)
+    engine.vector_store.add_vector = AsyncMock(return_value="chunk-id")
+    engine.vector_store.add_vectors = AsyncMock(side_effect=lambda **kwargs: list(kwargs["ids"]))
+    engine.vector_store.delete_by_document = AsyncMock(return_value=True)
+    engine.vector_store.search = AsyncMock(return_value=[
+        {
+            "id": "id1", 
+            "payload": {"document_id": "doc1", "content": "Test content 1"}, 
+            "score": 0.95
+        },
+        {
+            "id": "id2", 
+            "payload": {"document_id": "doc1", "content": "Test content 2"}, 
+            "score": 0.85
+        }
+    ])
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def reset_engine_mocks(mocked_engine):
+    """Reset call history on the shared engine's mocks before each test."""
+    for mock in (
+        mocked_engine.vector_store.initialize,
+        mocked_engine.vector_store.create_collection_if_not_exists,
+        mocked_engine.embedding_provider.get_embeddings,
+        mocked_engine.embedding_provider.get_embedding,
+        mocked_engine.vector_store.add_vector,
+        mocked_engine.vector_store.add_vectors,
+        mocked_engine.vector_store.delete_by_document,
+        mocked_engine.vector_store.search,
+    ):
+        mock.reset_mock()
+
+
+@pytest.fixture(scope="module")
+def sample_document_template():
+    """Create the validated sample document once per module."""
     return Document(
         title="Test Document",
         content="This is a test document with multiple sentences. It contains information that can be retrieved. This is for testing the RAG engine.",
-        document_type=DocumentType.GUIDE,
+        document_type=DocumentType.MANUAL,
         metadata={"department": "engineering", "tags": ["test", "documentation"]},
         access_level=AccessLevel.INTERNAL,
         created_at=datetime.utcnow(),
@@ -35,107 +83,155 @@ def sample_document():
     )
 
 
+@pytest.fixture
+def sample_document(sample_document_template):
+    """Give each test its own copy, since process_document assigns an id in place."""
+    return sample_document_template.model_copy(deep=True)
+
+
 @pytest.mark.asyncio
-async def test_rag_engine_initialization(mock_db_manager):
+async def test_rag_engine_initialization(mocked_engine):
     """Test RAG engine initialization."""
-    engine = RAGEngine(mock_db_manager)
+    await mocked_engine.initialize()
     
-    # Mock the vector store methods
-    with patch.object(engine.vector_store, 'initialize', new_callable=AsyncMock) as mock_initialize, \
-         patch.object(engine.vector_store, 'create_collection_if_not_exists', new_callable=AsyncMock) as mock_create_collection:
-        
-        await engine.initialize()
-        
-        # Check if collections were initialized
-        mock_initialize.assert_called_once()
-        assert mock_create_collection.call_count >= 4  # Should create at least 4 collections
+    # Check if collections were initialized
+    mocked_engine.vector_store.initialize.assert_called_once()
+    assert mocked_engine.vector_store.create_collection_if_not_exists.call_count >= 4  # Should create at least 4 collections
 
 
 @pytest.mark.asyncio
-async def test_document_processing(mock_db_manager, sample_document):
+async def test_document_processing(mocked_engine, sample_document):
     """Test document processing and chunking."""
-    engine = RAGEngine(mock_db_manager)
+    # Process the document
+    result = await mocked_engine.process_document(sample_document)
     
-    # Mock the embedding provider and vector store
-    with patch.object(engine.embedding_provider, 'get_embeddings', new_callable=AsyncMock) as mock_get_embeddings, \
-         patch.object(engine.vector_store, 'add_vector', new_callable=AsyncMock) as mock_add_vector:
-        
-        mock_get_embeddings.return_value = [[0.1] * 384, [0.2] * 384]
-        mock_add_vector.return_value = "chunk-id"
-        
-        # Process the document
-        result = await engine.process_document(sample_document)
-        
-        # Check if document was processed properly
-        assert "document_id" in result
-        assert "chunks_created" in result
-        assert result["chunks_created"] > 0
-        assert "embedding_model" in result
-        assert "vector_ids" in result
+    # Check if document was processed properly
+    assert result["document_id"] == sample_document.id
+    assert "chunks_created" in result
+    assert result["chunks_created"] > 0
+    assert "embedding_model" in result
+    assert "vector_ids" in result
 
 
 @pytest.mark.asyncio
-async def test_document_storage(mock_db_manager, sample_document):
+async def test_document_storage(mocked_engine, sample_document):
     """Test document storage in vector database."""
-    engine = RAGEngine(mock_db_manager)
+    # Process the document (which includes storage)
+    result = await mocked_engine.process_document(sample_document)
+    
+    # Check if vectors were added to the store
+    assert result is not None
+    assert len(result["vector_ids"]) == result["chunks_created"]
+    mocked_engine.vector_store.add_vectors.assert_called_once()
+    mocked_engine.vector_store.add_vector.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_document_processing_embeds_chunks_in_one_call(mocked_engine, sample_document):
+    """Test that pre-computed chunks are embedded with a single batch call."""
+    chunks = [
+        DocumentChunk(document_id="doc1", content="First chunk.", chunk_index=0),
+        DocumentChunk(document_id="doc1", content="Second chunk.", chunk_index=1)
+    ]
+    
+    result = await mocked_engine.process_document(sample_document, chunks)
+    
+    assert result["chunks_created"] == 2
+    mocked_engine.embedding_provider.get_embeddings.assert_called_once_with(["First chunk.", "Second chunk."])
+    mocked_engine.embedding_provider.get_embedding.assert_not_called()
+    
+    # Both chunks go out in one upsert with their payloads in order
+    mocked_engine.vector_store.add_vectors.assert_called_once()
+    mocked_engine.vector_store.add_vector.assert_not_called()
+    call = mocked_engine.vector_store.add_vectors.call_args.kwargs
+    assert [payload["content"] for payload in call["payloads"]] == ["First chunk.", "Second chunk."]
+    assert result["vector_ids"] == call["ids"]
+
+
+@pytest.mark.asyncio
+async def test_document_processing_embeds_repeated_chunks_once(mocked_engine, sample_document):
+    """Test that chunks sharing a content hash are embedded once and reuse the row."""
+    chunks = [
+        DocumentChunk(document_id="doc1", content="Shared footer.", chunk_index=0),
+        DocumentChunk(document_id="doc1", content="Body text.", chunk_index=1),
+        DocumentChunk(document_id="doc1", content="Shared footer.", chunk_index=2)
+    ]
+    
+    await mocked_engine.process_document(sample_document, chunks)
+    
+    mocked_engine.embedding_provider.get_embeddings.assert_called_once_with(["Shared footer.", "Body text."])
+    vectors = mocked_engine.vector_store.add_vectors.call_args.kwargs["vectors"]
+    assert vectors.shape == (3, 384)
+    np.testing.assert_array_equal(vectors[2], vectors[0])
+    np.testing.assert_array_equal(vectors[1], _EMB_2)
+
+
+@pytest.mark.asyncio
+async def test_bulk_document_processing(mocked_engine, sample_document):
+    """Test that several documents are embedded and stored in one call each."""
+    documents = [
+        (sample_document.model_copy(update={"id": f"doc{i}"}), [DocumentChunk(document_id=f"doc{i}", content=f"Chunk {i}.")])
+        for i in range(2)
+    ]
+    
+    results = await mocked_engine.process_documents(documents)
+    
+    assert [result["document_id"] for result in results] == ["doc0", "doc1"]
+    assert all(len(result["vector_ids"]) == 1 for result in results)
+    mocked_engine.embedding_provider.get_embeddings.assert_called_once_with(["Chunk 0.", "Chunk 1."])
+    mocked_engine.vector_store.add_vectors.assert_called_once()
+    mocked_engine.vector_store.add_vector.assert_not_called()
     
-    # Mock the embedding provider and vector store
-    with patch.object(engine.embedding_provider, 'get_embeddings', new_callable=AsyncMock) as mock_get_embeddings, \
-         patch.object(engine.vector_store, 'add_vector', new_callable=AsyncMock) as mock_add_vector:
-        
-        mock_get_embeddings.return_value = [[0.1] * 384, [0.2] * 384]
-        mock_add_vector.return_value = "chunk-id"
-        
-        # Process the document (which includes storage)
-        result = await engine.process_document(sample_document)
-        
-        # Check if vectors were added to the store
-        assert result is not None
-        assert len(result["vector_ids"]) > 0
-        mock_add_vector.assert_called()
+    vectors = mocked_engine.vector_store.add_vectors.call_args.kwargs["vectors"]
+    assert vectors.shape == (2, 384)
+    assert vectors.dtype == np.float32 and vectors.flags.c_contiguous
 
 
 @pytest.mark.asyncio
-async def test_document_search(mock_db_manager):
+async def test_document_search(mocked_engine):
     """Test document search functionality."""
-    engine = RAGEngine(mock_db_manager)
+    # Create a search query
+    query = SearchQuery(
+        query="test information",
+        filters=[{"field": "document_type", "value": DocumentType.MANUAL.value}],
+        max_results=5
+    )
+    
+    # Perform search
+    results = await mocked_engine.search(query)
     
-    # Mock the embedding provider and vector store
-    with patch.object(engine.embedding_provider, 'get_embedding', new_callable=AsyncMock) as mock_get_embedding, \
-         patch.object(engine.vector_store, 'search', new_callable=AsyncMock) as mock_search:
-        
-        mock_get_embedding.return_value = [0.1] * 384
-        mock_search.return_value = [
-            {
-                "id": "id1", 
-                "payload": {"document_id": "doc1", "content": "Test content 1"}, 
-                "score": 0.95
-            },
-            {
-                "id": "id2", 
-                "payload": {"document_id": "doc1", "content": "Test content 2"}, 
-                "score": 0.85
-            }
-        ]
-        
-        # Create a search query
-        query = SearchQuery(
-            query_text="test information",
-            filters=SearchFilter(document_type=DocumentType.GUIDE),
-            max_results=5
-        )
-        
-        # Perform search
-        results = await engine.search(query)
-        
-        # Check search results
-        assert results is not None
-        assert len(results["results"]) > 0
-        mock_get_embedding.assert_called_once()
-        mock_search.assert_called_once()
-        
-        # Check result properties
-        for result in results["results"]:
-            assert "document_id" in result
-            assert "content" in result
-            assert "similarity" in result
\ No newline at end of file
+    # Check search results
+    assert results is not None
+    assert len(results.results) > 0
+    mocked_engine.embedding_provider.get_embedding.assert_called_once()
+    mocked_engine.vector_store.search.assert_called_once()
+    
+    # Check result properties
+    for result in results.results:
+        assert "document_id" in result
+        assert "content" in result
+        assert "similarity" in result
+
+
+async def test_document_deletion(mocked_engine):
+    """Test that deleting a document filters its chunks out of every default collection."""
+    success = await mocked_engine.delete_document("doc1")
+    
+    assert success is True
+    deleted_from = {call.args[0] for call in mocked_engine.vector_store.delete_by_document.call_args_list}
+    assert deleted_from == set(mocked_engine._default_collections())
+    assert {call.args[1] for call in mocked_engine.vector_store.delete_by_document.call_args_list} == {"doc1"}
+
+
+@pytest.mark.parametrize("document_type", list(DocumentType))
+def test_collection_name_is_deleted_from(mocked_engine, document_type):
+    """Test that every document type is written to a collection delete_document covers."""
+    document = Document(title="Test", content="Test content", document_type=document_type)
+    
+    assert mocked_engine._collection_name(document) in mocked_engine._default_collections()
+
+
+@pytest.mark.asyncio
+async def test_sample_document_is_fresh_per_test(sample_document):
+    """Test that an id assigned by an earlier test does not leak into this one."""
+    assert sample_document.id is None
@@ -5,121 +5,143 @@ retrieval, update, and deletion operations.
 """
 
 import pytest
+import numpy as np
 from datetime import datetime
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import MagicMock, AsyncMock, create_autospec
 
-from app.rag.service import RAGService
+from pymongo import UpdateOne
+
+from app.rag.service import RAGService, _normalize_filters, settings
 from app.rag.models import Document, DocumentChunk, SearchQuery, SearchFilter, DocumentType, AccessLevel, SearchResult
 from app.rag.engine import RAGEngine
 from app.rag.document_processor import DocumentProcessor
 from app.rag.vector_store import VectorStore
 from app.rag.embeddings import EmbeddingProvider
-from app.rag.cache import CacheManager, SearchCache
+from app.rag.cache import CacheManager, SearchCache, InProcSearchCache
 from app.rag.kafka_integration import KafkaManager
 
 
-@pytest.fixture
-def mock_db_manager():
-    """Create a mock database manager."""
+@pytest.fixture(scope="module")
+def mongodb_collection():
+    """Create the mock MongoDB documents collection."""
+    collection = AsyncMock()
+    collection.insert_one = AsyncMock(return_value=MagicMock(inserted_id="doc123"))
+    collection.find_one = AsyncMock(return_value={
+        "_id": "mongo-id", "id": "doc123", "title": "Test Document", "content": "Stored content"
+    })
+    collection.update_one = AsyncMock(return_value=MagicMock(matched_count=1, modified_count=1))
+    collection.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+    collection.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=["doc1", "doc2"]))
+    collection.bulk_write = AsyncMock()
+    return collection
+
+
+@pytest.fixture(scope="module")
+def mock_db_manager(mongodb_collection):
+    """Create a mock database manager serving the mock collection."""
     db_manager = MagicMock()
-    db_manager.get_mongodb_client.return_value = AsyncMock()
-    db_manager.get_mongodb_client.return_value.get_database.return_value = AsyncMock()
-    db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value = AsyncMock()
-    db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value.insert_one = AsyncMock(return_value=MagicMock(inserted_id="doc123"))
-    db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value.find_one = AsyncMock(return_value={"_id": "doc123", "title": "Test Document"})
-    db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
-    db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+    db_manager.get_mongo_client.return_value = {"rag": {"documents": mongodb_collection}}
     return db_manager
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_rag_engine():
     """Create a mock RAG engine."""
-    engine = MagicMock(spec=RAGEngine)
-    engine.initialize = AsyncMock()
-    engine.process_document = AsyncMock(return_value=(["chunk1", "chunk2"], ["vector1", "vector2"]))
-    engine.search = AsyncMock(return_value=[
-        SearchResult(document_id="doc1", content="Test content 1", score=0.95, metadata={"title": "Test Document 1"}),
-        SearchResult(document_id="doc2", content="Test content 2", score=0.85, metadata={"title": "Test Document 2"})
-    ])
+    engine = AsyncMock(spec=RAGEngine)
+    engine.process_document.return_value = {"document_id": "doc123", "vector_ids": ["vector1", "vector2"]}
+    engine.process_documents.side_effect = lambda documents: [
+        {"document_id": document.id, "vector_ids": [f"vector{i}"]} for i, (document, _) in enumerate(documents)
+    ]
+    engine.search.return_value = [
+        SearchResult(
+            query="test query",
+            results=[
+                {"document_id": "doc1", "content": "Test content 1", "score": 0.95, "metadata": {"title": "Test Document 1"}},
+                {"document_id": "doc2", "content": "Test content 2", "score": 0.85, "metadata": {"title": "Test Document 2"}}
+            ],
+            total_results=2
+        )
+    ]
     return engine
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_document_processor():
     """Create a mock document processor."""
-    processor = MagicMock(spec=DocumentProcessor)
-    processor.process_document = AsyncMock(return_value=(Document(title="Processed Document", content="Processed content"), [
-        DocumentChunk(document_id="doc123", chunk_index=0, text="Chunk 1", metadata={}),
-        DocumentChunk(document_id="doc123", chunk_index=1, text="Chunk 2", metadata={})
-    ]))
+    # process_document is synchronous on DocumentProcessor, so the spec gives a plain MagicMock child
+    processor = AsyncMock(spec=DocumentProcessor)
+    processor.process_document.return_value = (
+        Document(id="doc123", title="Processed Document", content="Processed content"),
+        [
+            DocumentChunk(document_id="doc123", chunk_index=0, content="Chunk 1", metadata={}),
+            DocumentChunk(document_id="doc123", chunk_index=1, content="Chunk 2", metadata={})
+        ]
+    )
     return processor
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_vector_store():
     """Create a mock vector store."""
-    store = MagicMock(spec=VectorStore)
-    store.initialize_collection = AsyncMock()
-    store.add_vectors = AsyncMock(return_value=["vector1", "vector2"])
-    store.delete_vectors = AsyncMock()
-    store.search = AsyncMock()
+    store = create_autospec(VectorStore, instance=True)
+    store.add_vectors.return_value = ["vector1", "vector2"]
     return store
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_embedding_provider():
     """Create a mock embedding provider."""
-    provider = MagicMock(spec=EmbeddingProvider)
-    provider.get_vector_size = MagicMock(return_value=384)
-    provider.get_distance_metric = MagicMock(return_value="cosine")
-    provider.generate_embedding = AsyncMock(return_value=[0.1] * 384)
-    provider.generate_embeddings = AsyncMock(return_value=[[0.1] * 384, [0.2] * 384])
+    provider = create_autospec(EmbeddingProvider, instance=True)
+    provider.vector_size = 384
+    provider.distance_metric = "dot_normalized"
+    provider.get_embedding.return_value = np.full(384, 0.1, dtype=np.float32)
+    provider.get_embeddings.return_value = np.full((2, 384), 0.1, dtype=np.float32)
     return provider
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_cache_manager():
     """Create a mock cache manager."""
-    cache = MagicMock(spec=CacheManager)
-    cache.get = AsyncMock(return_value=None)  # Default to cache miss
-    cache.set = AsyncMock()
-    cache.delete = AsyncMock()
-    cache.clear_prefix = AsyncMock()
+    cache = AsyncMock(spec=CacheManager)
+    cache.get.return_value = None  # Default to cache miss
     return cache
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_search_cache():
     """Create a mock search cache."""
-    cache = MagicMock(spec=SearchCache)
-    cache.get_search_results = AsyncMock(return_value=None)  # Default to cache miss
-    cache.set_search_results = AsyncMock()
-    cache.invalidate_document_cache = AsyncMock()
+    cache = AsyncMock(spec=SearchCache)
+    cache.get_generation.return_value = 0
+    cache.get_search_results.return_value = None  # Default to cache miss
     return cache
 
 
 @pytest.fixture
+def real_search_cache():
+    """Create an in-process search cache so repeated searches can hit."""
+    return InProcSearchCache(maxsize=512, ttl=60)
+
+
+@pytest.fixture(scope="module")
 def mock_kafka_manager():
     """Create a mock Kafka manager."""
-    manager = MagicMock(spec=KafkaManager)
-    manager.initialize = AsyncMock()
-    manager.shutdown = AsyncMock()
-    manager.send_document_ingestion_message = AsyncMock()
-    manager.send_document_search_message = AsyncMock()
-    manager.send_document_update_message = AsyncMock()
-    manager.send_document_deletion_message = AsyncMock()
-    manager.register_consumer = AsyncMock()
+    manager = AsyncMock(spec=KafkaManager)
+    for method in ("enqueue_ingestion", "enqueue_update", "enqueue_delete", "flush"):
+        getattr(manager, method).return_value = True
     return manager
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_document():
-    """Create a sample document for testing."""
+    """Create a sample document shared by the module's tests.
+    
+    Tests needing a different document should take
+    ``sample_document.model_copy(update={...})`` rather than mutating it.
+    """
     return Document(
         title="Test Document",
         content="This is a test document for RAG service testing.",
-        document_type=DocumentType.GUIDE,
+        document_type=DocumentType.MANUAL,
         access_level=AccessLevel.INTERNAL,
         metadata={"department": "engineering", "tags": ["test", "service"]},
         created_at=datetime.utcnow(),
@@ -127,34 +149,46 @@ def sample_document():
     )
 
 
-@pytest.fixture
-def rag_service(mock_db_manager, mock_rag_engine, mock_document_processor, mock_vector_store, 
+@pytest.fixture(scope="module")
+def rag_service(module_mocker, mock_db_manager, mock_rag_engine, mock_document_processor, mock_vector_store, 
                mock_embedding_provider, mock_cache_manager, mock_search_cache, mock_kafka_manager):
-    """Create a RAG service with mock components."""
-    with patch("app.rag.service.RAGEngine", return_value=mock_rag_engine), \
-         patch("app.rag.service.DocumentProcessor", return_value=mock_document_processor), \
-         patch("app.rag.service.VectorStore", return_value=mock_vector_store), \
-         patch("app.rag.service.get_embedding_provider", return_value=mock_embedding_provider), \
-         patch("app.rag.service.CacheManager", return_value=mock_cache_manager), \
-         patch("app.rag.service.SearchCache", return_value=mock_search_cache), \
-         patch("app.rag.service.KafkaManager", return_value=mock_kafka_manager):
-        service = RAGService(db_manager=mock_db_manager)
-        return service
-
-
-@pytest.mark.asyncio
+    """Create a RAG service with mock components, shared by the module's tests."""
+    module_mocker.patch.multiple(
+        "app.rag.service",
+        RAGEngine=lambda *args, **kwargs: mock_rag_engine,
+        DocumentProcessor=lambda *args, **kwargs: mock_document_processor,
+        VectorStore=lambda *args, **kwargs: mock_vector_store,
+        get_embedding_provider=lambda *args, **kwargs: mock_embedding_provider,
+        CacheManager=lambda *args, **kwargs: mock_cache_manager,
+        SearchCache=lambda *args, **kwargs: mock_search_cache,
+        KafkaManager=lambda *args, **kwargs: mock_kafka_manager
+    )
+    return RAGService(db_manager=mock_db_manager)
+
+
+@pytest.fixture(autouse=True)
+def reset_service_mocks(rag_service, mongodb_collection, mock_db_manager, mock_rag_engine, mock_document_processor,
+                        mock_vector_store, mock_embedding_provider, mock_cache_manager, mock_search_cache,
+                        mock_kafka_manager):
+    """Reset call history on the shared service's mocks after each test."""
+    yield
+    for mock in (mongodb_collection, mock_db_manager, mock_rag_engine, mock_document_processor, mock_vector_store,
+                 mock_embedding_provider, mock_cache_manager, mock_search_cache, mock_kafka_manager):
+        mock.reset_mock()
+    rag_service.initialized = False
+
+
 async def test_rag_service_initialization(rag_service):
     """Test RAG service initialization."""
     # Initialize service
     await rag_service.initialize()
     
     # Check if components were initialized
-    rag_service.rag_engine.initialize.assert_called_once()
+    rag_service.engine.initialize.assert_called_once()
     rag_service.kafka_manager.initialize.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_document_ingestion(rag_service, sample_document):
+async def test_document_ingestion(rag_service, sample_document, mongodb_collection):
     """Test document ingestion functionality."""
     # Initialize service
     await rag_service.initialize()
@@ -170,18 +204,77 @@ async def test_document_ingestion(rag_service, sample_document):
     # Check if document processor was called
     rag_service.document_processor.process_document.assert_called_with(sample_document)
     
-    # Check if MongoDB was used to store document
-    mongodb_collection = rag_service.db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value
-    mongodb_collection.insert_one.assert_called_once()
+    # Check if the processor's chunks were embedded together rather than one by one
+    processed_document, chunks = rag_service.document_processor.process_document.return_value
+    rag_service.engine.process_document.assert_called_once_with(processed_document, chunks)
+    rag_service.embedding_provider.get_embedding.assert_not_called()
+    
+    # Check if MongoDB was upserted with the processed document
+    mongodb_collection.update_one.assert_called_once_with(
+        {"id": "doc123"}, {"$set": processed_document.dict()}, upsert=True
+    )
+    
+    # Check if the document was cached and cached searches retired
+    rag_service.document_cache.set.assert_called_once_with("doc123", processed_document)
+    rag_service.search_cache.invalidate_document_cache.assert_called_once_with("doc123")
+    
+    # Check if Kafka message was queued and sent on flush
+    await rag_service.flush()
+    rag_service.kafka_manager.enqueue_ingestion.assert_called_once()
+    rag_service.kafka_manager.send_document_ingestion_message.assert_not_called()
+    rag_service.kafka_manager.flush.assert_called_once()
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+async def test_flush(rag_service, monkeypatch, enabled):
+    """Test that flush sends queued Kafka messages only when Kafka is enabled."""
+    monkeypatch.setattr(settings.kafka, "enabled", enabled)
+    
+    assert await rag_service.flush() is True
+    
+    assert rag_service.kafka_manager.flush.call_count == int(enabled)
+
+
+async def test_document_bulk_ingestion(rag_service, sample_document, mongodb_collection, monkeypatch):
+    """Test that bulk ingestion uses one call per backing store."""
+    # Like the real processor, give each document its own ID
+    monkeypatch.setattr(
+        rag_service.document_processor.process_document,
+        "side_effect",
+        lambda document: (document.model_copy(update={"id": document.title.split()[-1]}), [])
+    )
+    
+    # Initialize service
+    await rag_service.initialize()
+    
+    # Ingest documents
+    documents = [sample_document.model_copy(update={"title": f"Bulk Document {i}"}) for i in range(5)]
+    success, document_ids, vector_ids = await rag_service.ingest_documents(documents)
+    
+    # Check results
+    assert success is True
+    assert document_ids == [str(i) for i in range(5)]
+    assert vector_ids == [f"vector{i}" for i in range(5)]
+    
+    # Check if all chunks were embedded and stored in one engine call
+    rag_service.engine.process_documents.assert_called_once()
+    assert len(rag_service.engine.process_documents.call_args.args[0]) == 5
+    rag_service.engine.process_document.assert_not_called()
     
-    # Check if vector store was used to store embeddings
-    rag_service.vector_store.add_vectors.assert_called_once()
+    # Check if MongoDB was written with a single unordered bulk upsert per document
+    mongodb_collection.bulk_write.assert_called_once()
+    operations = mongodb_collection.bulk_write.call_args.args[0]
+    assert all(isinstance(operation, UpdateOne) for operation in operations)
+    assert [operation._filter for operation in operations] == [{"id": str(i)} for i in range(5)]
+    assert mongodb_collection.bulk_write.call_args.kwargs["ordered"] is False
+    mongodb_collection.update_one.assert_not_called()
     
-    # Check if Kafka message was sent
-    rag_service.kafka_manager.send_document_ingestion_message.assert_called_once()
+    # Check if Kafka messages were queued and sent together on flush
+    await rag_service.flush()
+    assert rag_service.kafka_manager.enqueue_ingestion.call_count == 5
+    rag_service.kafka_manager.flush.assert_called_once()
 
 
-@pytest.mark.asyncio
 async def test_document_search(rag_service):
     """Test document search functionality."""
     # Initialize service
@@ -189,8 +282,8 @@ async def test_document_search(rag_service):
     
     # Create search query
     query = SearchQuery(
-        query_text="test query",
-        filters=SearchFilter(document_type=DocumentType.GUIDE),
+        query="test query",
+        filters=[{"field": "document_type", "value": DocumentType.MANUAL.value}],
         max_results=5
     )
     
@@ -198,23 +291,93 @@ async def test_document_search(rag_service):
     results = await rag_service.search(query)
     
     # Check results
-    assert results is not None
-    assert len(results) == 2
-    assert results[0].document_id == "doc1"
-    assert results[1].document_id == "doc2"
+    assert results == rag_service.engine.search.return_value
     
     # Check if search cache was checked
-    rag_service.search_cache.get_search_results.assert_called_with(query)
-    
-    # Check if RAG engine search was called
-    rag_service.rag_engine.search.assert_called_with(query)
+    rag_service.search_cache.get_search_results.assert_called_once()
+    
+    # Check if RAG engine search was called with normalized filters
+    rag_service.engine.search.assert_called_once_with(
+        "test query",
+        filters=[{"field": "document_type", "value": "manual", "operator": "=="}],
+        limit=5,
+        similarity_threshold=settings.rag.similarity_threshold
+    )
     
     # Check if results were cached
     rag_service.search_cache.set_search_results.assert_called_once()
+    assert rag_service.search_cache.set_search_results.call_args.args[1] == [result.dict() for result in results]
+    
+    # Check if the search was published
+    rag_service.kafka_manager.send_document_search_message.assert_called_once_with(query)
+
+
+async def test_search_cache_hit(rag_service, real_search_cache, mocker, monkeypatch):
+    """Test that a repeated identical search is served from the cache."""
+    monkeypatch.setattr(rag_service, "search_cache", real_search_cache)
+    set_spy = mocker.spy(real_search_cache, "set_search_results")
+    
+    # Initialize service
+    await rag_service.initialize()
+    
+    query = SearchQuery(query="test query", max_results=5)
+    
+    first = await rag_service.search(query)
+    second = await rag_service.search(query)
+    
+    # Check if the second search skipped the engine
+    assert [r.results for r in second] == [r.results for r in first]
+    assert rag_service.engine.search.call_count == 1
+    assert set_spy.call_count == 1
+
+
+async def test_search_cache_invalidated_by_ingestion(rag_service, real_search_cache, sample_document, monkeypatch):
+    """Test that ingesting a document retires cached searches, even ones that did not return it."""
+    monkeypatch.setattr(rag_service, "search_cache", real_search_cache)
+    
+    # Initialize service
+    await rag_service.initialize()
+    
+    query = SearchQuery(query="test query", max_results=5)
+    
+    await rag_service.search(query)
+    await rag_service.ingest_document(sample_document)
+    await rag_service.search(query)
+    
+    # Check if the second search went back to the engine
+    assert rag_service.engine.search.call_count == 2
 
 
-@pytest.mark.asyncio
-async def test_document_retrieval(rag_service):
+async def test_search_filters_normalized(rag_service, real_search_cache, monkeypatch):
+    """Test that reordered or repeated filters share one cache entry."""
+    monkeypatch.setattr(rag_service, "search_cache", real_search_cache)
+    
+    # Initialize service
+    await rag_service.initialize()
+    
+    department = {"field": "department", "value": "engineering", "operator": "=="}
+    document_type = {"field": "document_type", "value": "manual"}
+    
+    await rag_service.search(SearchQuery(query="test query", filters=[document_type, department]))
+    await rag_service.search(SearchQuery(query="test query", filters=[department, document_type, department]))
+    
+    # Check if the engine ran once with filters sorted by field and defaults filled in
+    assert rag_service.engine.search.call_count == 1
+    assert rag_service.engine.search.call_args.kwargs["filters"] == [
+        department,
+        {"field": "document_type", "value": "manual", "operator": "=="}
+    ]
+
+
+def test_normalize_filters_drops_incomplete_items():
+    """Test that filter items missing a field or value are dropped instead of raising."""
+    filters = [{"field": "department"}, {"value": "manual"}, {"field": "owner", "value": None},
+               {"field": "department", "value": "engineering"}]
+    
+    assert _normalize_filters(filters) == [{"field": "department", "value": "engineering", "operator": "=="}]
+
+
+async def test_document_retrieval(rag_service, mongodb_collection):
     """Test document retrieval functionality."""
     # Initialize service
     await rag_service.initialize()
@@ -224,57 +387,54 @@ async def test_document_retrieval(rag_service):
     document = await rag_service.get_document(document_id)
     
     # Check results
-    assert document is not None
-    assert document["_id"] == document_id
-    assert document["title"] == "Test Document"
+    assert document.id == document_id
+    assert document.title == "Test Document"
     
     # Check if cache was checked
-    rag_service.cache_manager.get.assert_called_once()
+    rag_service.document_cache.get.assert_called_once_with(document_id)
     
     # Check if MongoDB was queried
-    mongodb_collection = rag_service.db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value
-    mongodb_collection.find_one.assert_called_with({"_id": document_id})
+    mongodb_collection.find_one.assert_called_once_with({"id": document_id})
     
     # Check if result was cached
-    rag_service.cache_manager.set.assert_called_once()
+    rag_service.document_cache.set.assert_called_once_with(document_id, document)
 
 
-@pytest.mark.asyncio
-async def test_document_update(rag_service, sample_document):
+async def test_document_update(rag_service, sample_document, mongodb_collection):
     """Test document update functionality."""
     # Initialize service
     await rag_service.initialize()
     
-    # Update document
+    # Update document; update_document stamps updated_at, so pass a copy
     document_id = "doc123"
-    success = await rag_service.update_document(document_id, sample_document)
+    document = sample_document.model_copy(update={"id": document_id})
+    success = await rag_service.update_document(document)
     
     # Check results
     assert success is True
     
     # Check if document processor was called
-    rag_service.document_processor.process_document.assert_called_with(sample_document)
+    rag_service.document_processor.process_document.assert_called_once_with(document)
+    processed_document, chunks = rag_service.document_processor.process_document.return_value
     
     # Check if MongoDB was used to update document
-    mongodb_collection = rag_service.db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value
-    mongodb_collection.update_one.assert_called_once()
+    mongodb_collection.update_one.assert_called_once_with({"id": document_id}, {"$set": processed_document.dict()})
     
-    # Check if old vectors were deleted
-    rag_service.vector_store.delete_vectors.assert_called_once()
+    # Check if old vectors were replaced with the new chunks
+    rag_service.engine.delete_document.assert_called_once_with(document_id)
+    rag_service.engine.process_document.assert_called_once_with(processed_document, chunks)
     
-    # Check if new vectors were added
-    rag_service.vector_store.add_vectors.assert_called_once()
+    # Check if caches were refreshed
+    rag_service.document_cache.set.assert_called_once_with(document_id, processed_document)
+    rag_service.search_cache.invalidate_document_cache.assert_called_once_with(document_id)
     
-    # Check if cache was invalidated
-    rag_service.cache_manager.delete.assert_called_once()
-    rag_service.search_cache.invalidate_document_cache.assert_called_with(document_id)
-    
-    # Check if Kafka message was sent
-    rag_service.kafka_manager.send_document_update_message.assert_called_with(document_id, sample_document)
+    # Check if Kafka message was queued and sent on flush
+    await rag_service.flush()
+    rag_service.kafka_manager.enqueue_update.assert_called_once_with(processed_document)
+    rag_service.kafka_manager.flush.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_document_deletion(rag_service):
+async def test_document_deletion(rag_service, mongodb_collection):
     """Test document deletion functionality."""
     # Initialize service
     await rag_service.initialize()
@@ -287,15 +447,27 @@ async def test_document_deletion(rag_service):
     assert success is True
     
     # Check if MongoDB was used to delete document
-    mongodb_collection = rag_service.db_manager.get_mongodb_client.return_value.get_database.return_value.get_collection.return_value
-    mongodb_collection.delete_one.assert_called_with({"_id": document_id})
+    mongodb_collection.delete_one.assert_called_once_with({"id": document_id})
     
     # Check if vectors were deleted
-    rag_service.vector_store.delete_vectors.assert_called_once()
+    rag_service.engine.delete_document.assert_called_once_with(document_id)
     
     # Check if cache was invalidated
-    rag_service.cache_manager.delete.assert_called_once()
-    rag_service.search_cache.invalidate_document_cache.assert_called_with(document_id)
+    rag_service.document_cache.delete.assert_called_once_with(document_id)
+    rag_service.search_cache.invalidate_document_cache.assert_called_once_with(document_id)
     
-    # Check if Kafka message was sent
-    rag_service.kafka_manager.send_document_deletion_message.assert_called_with(document_id)
\ No newline at end of file
+    # Check if Kafka message was queued and sent on flush
+    await rag_service.flush()
+    rag_service.kafka_manager.enqueue_delete.assert_called_once_with(document_id)
+    rag_service.kafka_manager.flush.assert_called_once()
+
+
+@pytest.mark.performance
+@pytest.mark.benchmark(group="ingest")
+def test_bench_ingest(benchmark, rag_service, sample_document, event_loop):
+    """Benchmark document ingestion end to end against the mock backends."""
+    event_loop.run_until_complete(rag_service.initialize())
+    
+    success, _, _ = benchmark(lambda: event_loop.run_until_complete(rag_service.ingest_document(sample_document)))
+    
+    assert success is True
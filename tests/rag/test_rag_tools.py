@@ -4,6 +4,7 @@ Tests the integration of RAG tools with the RAG engine.
 """
 
 import pytest
+from dataclasses import dataclass
 from unittest.mock import MagicMock, AsyncMock, patch
 from datetime import datetime
 
@@ -12,52 +13,80 @@ from app.tools.rag_tools import DocumentSearchTool, KnowledgeIngestionTool, Sema
 from app.rag.service import RAGService
 from app.tools.base_tool import ToolRequest
 
-
-@pytest.fixture
-def mock_rag_service():
-    """Create a mock RAG service."""
-    from app.rag.models import SearchResult, DocumentType
-    service = MagicMock(spec=RAGService)
-    service.ingest_document = AsyncMock(return_value=(True, "doc123", ["vector1", "vector2"]))
-    
-    # Create mock result objects with the expected structure
-    from app.rag.models import Document, DocumentType
-    
-    # Create simple mock objects with the required attributes
-    class MockSearchResult:
-        def __init__(self, document_id, title, content, document_type, score, metadata):
-            self.document_id = document_id
-            self.title = title
-            self.content = content
-            self.document_type = document_type
-            self.score = score
-            self.metadata = metadata
-    
-    mock_doc1 = MockSearchResult(
+# Search tools only read their parameters, so the dicts are shared by every run.
+# Ingestion rows stay inline because the tool updates the metadata it is given.
+_MIN_SEARCH_PARAMS = {"query": "test query"}
+_FULL_SEARCH_PARAMS = {
+    "query": "test query",
+    "document_type": "manual",
+    "department": "engineering",
+    "limit": 5,
+    "date_from": "2023-01-01",
+    "date_to": "2023-12-31"
+}
+_FULL_SEMANTIC_PARAMS = {
+    "query": "test query",
+    "threshold": 0.8,
+    "limit": 5,
+    "include_content": True
+}
+
+
+@dataclass(slots=True, frozen=True)
+class _MockSearchResult:
+    """Search result with the attributes the tools read."""
+    document_id: str
+    title: str
+    content: str
+    document_type: DocumentType
+    score: float
+    metadata: dict
+
+
+_SEARCH_RESULTS = (
+    _MockSearchResult(
         document_id="doc1",
         title="Test Document 1",
         content="Test content 1",
         document_type=DocumentType.MANUAL,
         score=0.95,
         metadata={"title": "Test Document 1", "department": "engineering"}
-    )
-    mock_doc2 = MockSearchResult(
+    ),
+    _MockSearchResult(
         document_id="doc2",
         title="Test Document 2",
         content="Test content 2",
         document_type=DocumentType.MANUAL,
         score=0.75,
         metadata={"title": "Test Document 2", "department": "engineering"}
-    )
-    
-    service.search = AsyncMock(return_value=[mock_doc1, mock_doc2])
+    ),
+)
+
+
+@pytest.fixture(scope="module")
+def mock_rag_service():
+    """Create a mock RAG service shared by the module's tests."""
+    service = MagicMock(spec=RAGService)
+    service.ingest_document = AsyncMock(return_value=(True, "doc123", ["vector1", "vector2"]))
+    service.search = AsyncMock(return_value=list(_SEARCH_RESULTS))
     return service
 
 
-@pytest.mark.asyncio
+@pytest.fixture(autouse=True)
+def reset_rag_service_mock(mock_rag_service):
+    """Reset call history on the shared RAG service mock after each test."""
+    yield
+    mock_rag_service.reset_mock()
+
+
+@pytest.mark.parametrize("params,expected_filters,expected_max", [
+    (_MIN_SEARCH_PARAMS, {}, 10),  # Default limit, no filters
+    (_FULL_SEARCH_PARAMS, {"document_type": "manual", "department": "engineering"}, 5),
+], ids=["minimal", "full"])
 @patch('app.tools.rag_tools.get_db_manager')
 @patch('app.tools.rag_tools.RAGService')
-async def test_document_search_tool(MockRAGService, mock_get_db_manager, mock_rag_service):
+async def test_document_search_tool(MockRAGService, mock_get_db_manager, mock_rag_service,
+                                    params, expected_filters, expected_max):
     """Test DocumentSearchTool integration with RAG service."""
     # Setup mocks
     mock_get_db_manager.return_value = AsyncMock()
@@ -67,36 +96,14 @@ async def test_document_search_tool(MockRAGService, mock_get_db_manager, mock_ra
     # Create tool
     tool = DocumentSearchTool()
     
-    # Test parameters
-    params = {
-        "query": "test query",
-        "document_type": "manual",
-        "department": "engineering",
-        "limit": 5,
-        "date_from": "2023-01-01",
-        "date_to": "2023-12-31"
-    }
-    
     # Create tool request
     tool_request = ToolRequest(tool_name="document_search", parameters=params)
     
     # Execute tool
     result = await tool.execute(tool_request)
     
-    # Debug output
-    import sys
-    sys.stderr.write(f"Result: {result}\n")
-    sys.stderr.write(f"Success: {result.success}\n")
-    sys.stderr.write(f"Error: {result.error}\n")
-    sys.stderr.write(f"Data: {getattr(result, 'data', None)}\n")
-    sys.stderr.write(f"Mock called: {mock_rag_service.search.called}\n")
-    if mock_rag_service.search.called:
-        sys.stderr.write(f"Mock call args: {mock_rag_service.search.call_args}\n")
-    else:
-        sys.stderr.write("Mock was NOT called!\n")
-    
-    # Check result
-    assert result.success is True
+    # Check result (the tool's error is shown only on failure)
+    assert result.success is True, result.error
     assert len(result.data["results"]) == 2
     assert result.data["results"][0]["id"] == "doc1"
     assert result.data["results"][0]["content"] == "Test content 1"
@@ -107,122 +114,41 @@ async def test_document_search_tool(MockRAGService, mock_get_db_manager, mock_ra
     mock_rag_service.search.assert_called_once()
     call_args = mock_rag_service.search.call_args[0][0]
     assert call_args.query == "test query"
-    assert len(call_args.filters) >= 2
-    # Check for document_type filter
-    doc_type_filter = next((f for f in call_args.filters if f["field"] == "document_type"), None)
-    assert doc_type_filter is not None
-    assert doc_type_filter["value"] == "manual"
-    # Check for department filter
-    dept_filter = next((f for f in call_args.filters if f["field"] == "department"), None)
-    assert dept_filter is not None
-    assert dept_filter["value"] == "engineering"
-    assert call_args.max_results == 5
+    assert call_args.max_results == expected_max
+    if not expected_filters:
+        assert call_args.filters == []  # Empty filters when no additional params
+    for field, value in expected_filters.items():
+        field_filter = next((f for f in call_args.filters if f["field"] == field), None)
+        assert field_filter is not None
+        assert field_filter["value"] == value
 
 
-@pytest.mark.asyncio
-@patch('app.tools.rag_tools.get_db_manager')
-@patch('app.tools.rag_tools.RAGService')
-async def test_document_search_tool_minimal_params(MockRAGService, mock_get_db_manager, mock_rag_service):
-    """Test DocumentSearchTool with minimal parameters."""
-    # Setup mocks
-    mock_get_db_manager.return_value = AsyncMock()
-    MockRAGService.return_value = mock_rag_service
-    mock_rag_service.initialize = AsyncMock()
-    
-    # Create tool
-    tool = DocumentSearchTool()
-    
-    # Test parameters (only query)
-    params = {"query": "test query"}
-    
-    # Create tool request
-    tool_request = ToolRequest(tool_name="document_search", parameters=params)
-    
-    # Execute tool
-    result = await tool.execute(tool_request)
-    
-    # Debug: print result to understand failure
-    if not result.success:
-        print(f"Test failed with error: {result.error}")
-    
-    # Check result
-    assert result.success is True
-    
-    # Check if service was called with correct parameters
-    mock_rag_service.search.assert_called_once()
-    call_args = mock_rag_service.search.call_args[0][0]
-    assert call_args.query == "test query"
-    assert call_args.filters == []  # Empty filters when no additional params
-    assert call_args.max_results == 10  # Default value
-
-
-@pytest.mark.asyncio
-@patch('app.tools.rag_tools.get_db_manager')
-@patch('app.tools.rag_tools.RAGService')
-async def test_knowledge_ingestion_tool(MockRAGService, mock_get_db_manager, mock_rag_service):
-    """Test KnowledgeIngestionTool integration with RAG service."""
-    # Setup mocks
-    mock_get_db_manager.return_value = AsyncMock()
-    MockRAGService.return_value = mock_rag_service
-    mock_rag_service.initialize = AsyncMock()
-    mock_rag_service.ingest_document = AsyncMock(return_value=(True, "doc123", ["vector1", "vector2"]))
-    # Create a mock document to avoid the AsyncMock issue
-    mock_document = AsyncMock()
-    mock_document.id = "doc123"
-    mock_document.title = "Test Document"
-    mock_document.content = "This is a test document for ingestion."
-    mock_document.document_type = DocumentType.MANUAL
-    mock_document.created_at = datetime.utcnow()
-    mock_document.metadata = {}
-    mock_rag_service.get_document = AsyncMock(return_value=mock_document)
-    
-    # Create tool
-    tool = KnowledgeIngestionTool()
-    
-    # Test parameters
-    params = {
+@pytest.mark.parametrize("params,expected_metadata", [
+    ({
+        "content": "This is a test document for ingestion.",
+        "title": "Test Document",
+        "document_type": "manual",
+        "department": "engineering"  # Department is required
+    }, {"department": "engineering"}),
+    ({
         "content": "This is a test document for ingestion.",
         "title": "Test Document",
         "document_type": "manual",
         "department": "engineering",
         "tags": ["test", "api"],
         "metadata": {"author": "Test Author", "version": "1.0"}
-    }
-    
-    # Create tool request
-    tool_request = ToolRequest(tool_name="knowledge_ingestion", parameters=params)
-    
-    # Execute tool
-    result = await tool.execute(tool_request)
-    
-    # Check result
-    assert result.success is True
-    assert result.data["id"] == "doc123"
-    assert "vector_ids" in result.metadata
-    assert result.metadata["vector_ids"] == ["vector1", "vector2"]
-    
-    # Check if service was called with correct parameters
-    mock_rag_service.ingest_document.assert_called_once()
-    call_args = mock_rag_service.ingest_document.call_args[0][0]
-    assert call_args.title == "Test Document"
-    assert call_args.content == "This is a test document for ingestion."
-    assert call_args.document_type == DocumentType.MANUAL
-    assert call_args.metadata["department"] == "engineering"
-    assert call_args.metadata["tags"] == ["test", "api"]
-    assert call_args.metadata["author"] == "Test Author"
-
-
-@pytest.mark.asyncio
+    }, {"department": "engineering", "tags": ["test", "api"], "author": "Test Author"}),
+], ids=["minimal", "full"])
 @patch('app.tools.rag_tools.get_db_manager')
 @patch('app.tools.rag_tools.RAGService')
-async def test_knowledge_ingestion_tool_minimal_params(MockRAGService, mock_get_db_manager, mock_rag_service):
-    """Test KnowledgeIngestionTool with minimal parameters."""
+async def test_knowledge_ingestion_tool(MockRAGService, mock_get_db_manager, mock_rag_service,
+                                        params, expected_metadata):
+    """Test KnowledgeIngestionTool integration with RAG service."""
     # Setup mocks
     mock_get_db_manager.return_value = AsyncMock()
     MockRAGService.return_value = mock_rag_service
     mock_rag_service.initialize = AsyncMock()
     mock_rag_service.ingest_document = AsyncMock(return_value=(True, "doc123", ["vector1", "vector2"]))
-    
     # Create a mock document to avoid the AsyncMock issue
     mock_document = AsyncMock()
     mock_document.id = "doc123"
@@ -236,14 +162,6 @@ async def test_knowledge_ingestion_tool_minimal_params(MockRAGService, mock_get_
     # Create tool
     tool = KnowledgeIngestionTool()
     
-    # Test parameters (minimal required params including department)
-    params = {
-        "content": "This is a test document for ingestion.",
-        "title": "Test Document",
-        "document_type": "manual",
-        "department": "engineering"  # Added required department parameter
-    }
-    
     # Create tool request
     tool_request = ToolRequest(tool_name="knowledge_ingestion", parameters=params)
     
@@ -253,6 +171,8 @@ async def test_knowledge_ingestion_tool_minimal_params(MockRAGService, mock_get_
     # Check result
     assert result.success is True
     assert result.data["id"] == "doc123"
+    assert "vector_ids" in result.metadata
+    assert result.metadata["vector_ids"] == ["vector1", "vector2"]
     
     # Check if service was called with correct parameters
     mock_rag_service.ingest_document.assert_called_once()
@@ -261,12 +181,18 @@ async def test_knowledge_ingestion_tool_minimal_params(MockRAGService, mock_get_
     assert call_args.content == "This is a test document for ingestion."
     assert call_args.document_type == DocumentType.MANUAL
     assert call_args.access_level == AccessLevel.INTERNAL  # Default value
+    for key, value in expected_metadata.items():
+        assert call_args.metadata[key] == value
 
 
-@pytest.mark.asyncio
+@pytest.mark.parametrize("params,expected_threshold,expected_max,content_key", [
+    (_MIN_SEARCH_PARAMS, 0.7, 5, "snippet"),  # Defaults
+    (_FULL_SEMANTIC_PARAMS, 0.8, 5, "content"),
+], ids=["minimal", "full"])
 @patch('app.tools.rag_tools.get_db_manager')
 @patch('app.tools.rag_tools.RAGService')
-async def test_semantic_search_tool(MockRAGService, mock_get_db_manager, mock_rag_service):
+async def test_semantic_search_tool(MockRAGService, mock_get_db_manager, mock_rag_service,
+                                    params, expected_threshold, expected_max, content_key):
     """Test SemanticSearchTool integration with RAG service."""
     # Setup mocks
     mock_get_db_manager.return_value = AsyncMock()
@@ -276,14 +202,6 @@ async def test_semantic_search_tool(MockRAGService, mock_get_db_manager, mock_ra
     # Create tool
     tool = SemanticSearchTool()
     
-    # Test parameters
-    params = {
-        "query": "test query",
-        "threshold": 0.8,
-        "limit": 5,
-        "include_content": True
-    }
-    
     # Create tool request
     tool_request = ToolRequest(tool_name="semantic_search", parameters=params)
     
@@ -292,80 +210,14 @@ async def test_semantic_search_tool(MockRAGService, mock_get_db_manager, mock_ra
     
     # Check result
     assert result.success is True
-    assert len(result.data["results"]) == 2
+    assert len(result.data["results"]) == 2  # Mock returns 2 results
     assert result.data["results"][0]["id"] == "doc1"
     assert result.data["results"][0]["similarity_score"] == 0.95
-    assert "content" in result.data["results"][0]
-    
-    # Check if service was called with correct parameters
-    mock_rag_service.search.assert_called_once()
-    call_args = mock_rag_service.search.call_args[0][0]
-    assert call_args.query == "test query"
-    assert call_args.similarity_threshold == 0.8
-    assert call_args.max_results == 5
-
-
-@pytest.mark.asyncio
-@patch('app.tools.rag_tools.get_db_manager')
-@patch('app.tools.rag_tools.RAGService')
-async def test_semantic_search_tool_minimal_params(MockRAGService, mock_get_db_manager, mock_rag_service):
-    """Test SemanticSearchTool with minimal parameters."""
-    # Setup mocks
-    mock_get_db_manager.return_value = AsyncMock()
-    MockRAGService.return_value = mock_rag_service
-    mock_rag_service.initialize = AsyncMock()
-    
-    # Create tool
-    tool = SemanticSearchTool()
-    
-    # Test parameters (only query)
-    params = {"query": "test query"}
-    
-    # Create tool request
-    tool_request = ToolRequest(tool_name="semantic_search", parameters=params)
-    
-    # Execute tool
-    result = await tool.execute(tool_request)
-    
-    # Check result
-    assert result.success is True
-    assert len(result.data["results"]) == 2  # Mock returns 2 results
+    assert content_key in result.data["results"][0]
     
     # Check if service was called with correct parameters
     mock_rag_service.search.assert_called_once()
     call_args = mock_rag_service.search.call_args[0][0]
     assert call_args.query == "test query"
-    assert call_args.max_results == 5  # Default value
-
-
-@pytest.mark.asyncio
-@patch('app.tools.rag_tools.get_db_manager')
-@patch('app.tools.rag_tools.RAGService')
-async def test_semantic_search_tool_filter_by_threshold(MockRAGService, mock_get_db_manager, mock_rag_service):
-    """Test SemanticSearchTool filtering results by threshold."""
-    # Setup mocks
-    mock_get_db_manager.return_value = AsyncMock()
-    MockRAGService.return_value = mock_rag_service
-    mock_rag_service.initialize = AsyncMock()
-    
-    # Create tool
-    tool = SemanticSearchTool()
-    
-    # Test parameters with high threshold
-    params = {
-        "query": "test query",
-        "threshold": 0.9,  # Only results with score >= 0.9 should be included
-        "limit": 5
-    }
-    
-    # Create tool request
-    tool_request = ToolRequest(tool_name="semantic_search", parameters=params)
-    
-    # Execute tool
-    result = await tool.execute(tool_request)
-    
-    # Check result (mock returns 2 results, both above threshold)
-    assert result.success is True
-    assert len(result.data["results"]) == 2
-    assert result.data["results"][0]["id"] == "doc1"
-    assert result.data["results"][0]["similarity_score"] == 0.95
\ No newline at end of file
+    assert call_args.similarity_threshold == expected_threshold
+    assert call_args.max_results == expected_max
@@ -1,58 +1,112 @@
 """Unit tests for the vector store component.
 
 Tests the vector store functionality, including initialization, vector storage,
-retrieval, and deletion operations with Qdrant.
+retrieval, and deletion operations with Qdrant. Storage behaviour is checked
+against an in-memory Qdrant client; the shape of client calls (batching,
+concurrency, index toggling) is checked against a mock client.
 """
 
 import pytest
 import asyncio
+import math
+import uuid
+import numpy as np
 from unittest.mock import MagicMock, AsyncMock, patch
 
-from app.rag.vector_store import VectorStore
+pytest.importorskip("qdrant_client")
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
 
+from app.rag import vector_store as vector_store_module
+from app.rag.vector_store import VectorStore, _AdaptiveLimiter, _compile_filter, uuid7_ids
 
-@pytest.fixture
+
+def _configure_qdrant_client(client):
+    """Set the default return values of the mock Qdrant client."""
+    client.collection_exists.return_value = True
+    client.upsert.return_value = MagicMock(operation_id="test_operation")
+
+
+@pytest.fixture(scope="module")
 def mock_qdrant_client():
-    """Create a mock Qdrant client for testing."""
+    """Create a mock Qdrant client shared by the module's tests."""
     client = MagicMock()
     client.get_collection = AsyncMock()
+    client.collection_exists = AsyncMock()
     client.create_collection = AsyncMock()
-    client.upsert = AsyncMock(return_value=MagicMock(operation_id="test_operation"))
+    client.create_payload_index = AsyncMock()
+    client.update_collection = AsyncMock()
+    client.upsert = AsyncMock()
     client.search = AsyncMock()
-    client.delete_points = AsyncMock()
+    client.search_batch = AsyncMock()
+    client.delete = AsyncMock()
     client.delete_collection = AsyncMock()
+    _configure_qdrant_client(client)
     return client
 
 
+@pytest.fixture(autouse=True)
+def reset_qdrant_client_mock(mock_qdrant_client):
+    """Reset calls, return values and side effects on the shared client mock after each test."""
+    yield
+    mock_qdrant_client.reset_mock(return_value=True, side_effect=True)
+    _configure_qdrant_client(mock_qdrant_client)
+
+
 @pytest.fixture
 def vector_store(mock_qdrant_client):
-    """Create a vector store instance with mock Qdrant client."""
-    return VectorStore(mock_qdrant_client)
+    """Create a vector store instance with mock Qdrant client.
+    
+    The store stays per-test because it holds per-instance state (the
+    collection info cache and the search batching queue).
+    """
+    store = VectorStore(mock_qdrant_client)
+    store.client = mock_qdrant_client
+    return store
+
+
+@pytest.fixture
+def memory_client():
+    """Create an in-memory Qdrant client (local mode, no server required)."""
+    return AsyncQdrantClient(location=":memory:")
+
+
+@pytest.fixture
+def memory_store(memory_client):
+    """Create a vector store instance backed by the in-memory Qdrant client."""
+    store = VectorStore(memory_client)
+    store.client = memory_client
+    return store
 
 
 @pytest.mark.asyncio
-async def test_initialize_collection(vector_store, mock_qdrant_client):
+async def test_initialize_collection(memory_store, memory_client):
     """Test collection initialization."""
-    # Set up mock response for collection existence check
-    collection_response = MagicMock()
-    collection_response.status = 200
-    mock_qdrant_client.get_collection.return_value = collection_response
+    # Test initializing a new collection
+    created = await memory_store.create_collection_if_not_exists("test_collection", 3, "cosine")
+    assert created is True
+    assert await memory_client.collection_exists(collection_name="test_collection")
     
     # Test initializing an existing collection
-    await vector_store.initialize_collection("test_collection", 384, "cosine")
-    mock_qdrant_client.get_collection.assert_called_with(collection_name="test_collection")
-    mock_qdrant_client.create_collection.assert_not_called()
+    created = await memory_store.create_collection_if_not_exists("test_collection", 3, "cosine")
+    assert created is False
+
+
+async def test_initialize_collection_quantized(vector_store, mock_qdrant_client):
+    """Test that scalar_int8 collections are created with int8 scalar quantization."""
+    mock_qdrant_client.collection_exists.return_value = False
     
-    # Set up mock response for collection not found
-    mock_qdrant_client.get_collection.side_effect = Exception("Collection not found")
+    await vector_store.create_collection_if_not_exists("quantized", 384, "dot_normalized", quantization="scalar_int8")
     
-    # Test initializing a new collection
-    await vector_store.initialize_collection("new_collection", 384, "cosine")
-    mock_qdrant_client.create_collection.assert_called()
+    quantization_config = mock_qdrant_client.create_collection.call_args.kwargs["quantization_config"]
+    assert quantization_config.scalar.type == "int8"
+    assert quantization_config.scalar.always_ram is True
+    
+    with pytest.raises(ValueError):
+        await vector_store.create_collection_if_not_exists("quantized", 384, quantization="binary")
 
 
-@pytest.mark.asyncio
-async def test_add_vectors(vector_store, mock_qdrant_client):
+async def test_add_vectors(memory_store, memory_client):
     """Test adding vectors to the collection."""
     # Test data
     collection_name = "test_collection"
@@ -64,106 +118,502 @@ async def test_add_vectors(vector_store, mock_qdrant_client):
         {"document_id": "doc1", "chunk_index": 0, "text": "Test content 1"},
         {"document_id": "doc1", "chunk_index": 1, "text": "Test content 2"}
     ]
+    # Dot collections store vectors as given, so they can be compared exactly
+    await memory_store.create_collection_if_not_exists(collection_name, 3, "dot")
     
     # Add vectors
-    vector_ids = await vector_store.add_vectors(collection_name, vectors, payloads)
+    vector_ids = await memory_store.add_vectors(collection_name, vectors, payloads)
     
-    # Check results
-    assert vector_ids is not None
+    # Check results: generated IDs are time-ordered UUIDv7s
     assert len(vector_ids) == 2
-    mock_qdrant_client.upsert.assert_called_with(
-        collection_name=collection_name,
-        points=pytest.approx([
-            {"id": vector_ids[0], "vector": vectors[0], "payload": payloads[0]},
-            {"id": vector_ids[1], "vector": vectors[1], "payload": payloads[1]}
-        ], abs=1e-6)
-    )
+    assert vector_ids == sorted(vector_ids)
+    assert {uuid.UUID(vector_id).version for vector_id in vector_ids} == {7}
+    count = await memory_client.count(collection_name=collection_name)
+    assert count.count == 2
+    points = await memory_client.retrieve(collection_name=collection_name, ids=vector_ids, with_vectors=True)
+    stored = {point.id: point for point in points}
+    assert [stored[vector_id].payload for vector_id in vector_ids] == payloads
+    np.testing.assert_allclose([stored[vector_id].vector for vector_id in vector_ids], vectors, atol=1e-6)
+
+
+async def test_add_vectors_ndarray(memory_store, memory_client):
+    """Test adding a float32 embedding matrix without converting it to lists first."""
+    collection_name = "test_collection"
+    vectors = np.random.rand(1000, 384).astype(np.float32)
+    payloads = [{"chunk_index": i} for i in range(len(vectors))]
+    await memory_store.create_collection_if_not_exists(collection_name, 384, "dot")
+    
+    vector_ids = await memory_store.add_vectors(collection_name, vectors, payloads)
+    
+    count = await memory_client.count(collection_name=collection_name)
+    assert count.count == 1000
+    points = await memory_client.retrieve(collection_name=collection_name, ids=vector_ids[-1:], with_vectors=True)
+    assert points[0].payload == {"chunk_index": 999}
+    np.testing.assert_allclose(points[0].vector, vectors[-1], rtol=1e-6)
 
 
 @pytest.mark.asyncio
-async def test_search(vector_store, mock_qdrant_client):
-    """Test vector search functionality."""
-    # Set up mock search response
-    search_results = [
-        {"id": "id1", "payload": {"document_id": "doc1", "chunk_index": 0, "text": "Test content 1"}, "score": 0.95},
-        {"id": "id2", "payload": {"document_id": "doc1", "chunk_index": 1, "text": "Test content 2"}, "score": 0.85}
-    ]
-    mock_qdrant_client.search.return_value = search_results
+async def test_add_vectors_batches_upserts(vector_store, mock_qdrant_client):
+    """Test that large inserts are split into batch_size upserts."""
+    vectors = np.zeros((1000, 3), dtype=np.float32)
+    payloads = [{"document_id": f"doc{i}"} for i in range(1000)]
+    
+    vector_ids = await vector_store.add_vectors("test_collection", vectors, payloads, batch_size=256)
+    
+    assert len(vector_ids) == 1000
+    assert mock_qdrant_client.upsert.call_count == math.ceil(1000 / 256)
+    batch_sizes = [len(call.kwargs["points"].ids) for call in mock_qdrant_client.upsert.call_args_list]
+    assert batch_sizes == [256, 256, 256, 232]
+
+
+@pytest.mark.asyncio
+async def test_add_vectors_bounded_concurrency(vector_store, mock_qdrant_client):
+    """Test that batches are upserted concurrently up to max_concurrency."""
+    in_flight = 0
+    peak = 0
+    
+    async def slow_upsert(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+    
+    mock_qdrant_client.upsert.side_effect = slow_upsert
+    vectors = np.zeros((32 * 8, 3), dtype=np.float32)
+    payloads = [{} for _ in range(len(vectors))]
+    
+    await vector_store.add_vectors("test_collection", vectors, payloads, batch_size=8, max_concurrency=4)
     
+    assert mock_qdrant_client.upsert.call_count == 32
+    assert peak == 4
+
+
+def _unavailable():
+    """Build the error Qdrant's HTTP client raises for a 503 response."""
+    return UnexpectedResponse(status_code=503, reason_phrase="Service Unavailable", content=b"", headers={})
+
+
+@pytest.fixture
+def no_retry_wait(monkeypatch):
+    """Retry failed upserts without sleeping between attempts."""
+    monkeypatch.setattr(vector_store_module.settings.qdrant, "upsert_retry_wait", 0)
+
+
+async def test_upsert_retries(vector_store, mock_qdrant_client, no_retry_wait):
+    """Test that a batch rejected with 503 is retried until it succeeds."""
+    mock_qdrant_client.upsert.side_effect = [_unavailable(), _unavailable(), MagicMock()]
+    vectors = np.zeros((10, 3), dtype=np.float32)
+    payloads = [{} for _ in range(len(vectors))]
+    
+    vector_ids = await vector_store.add_vectors("test_collection", vectors, payloads)
+    
+    assert len(vector_ids) == 10
+    assert mock_qdrant_client.upsert.call_count == 3
+    # Every attempt sends the same batch
+    sent = [call.kwargs["points"] for call in mock_qdrant_client.upsert.call_args_list]
+    assert all(points is sent[0] for points in sent)
+
+
+async def test_upsert_retries_exhausted(vector_store, mock_qdrant_client, no_retry_wait):
+    """Test that retries stop after upsert_max_attempts and the last error is raised."""
+    mock_qdrant_client.upsert.side_effect = _unavailable()
+    vectors = np.zeros((10, 3), dtype=np.float32)
+    payloads = [{} for _ in range(len(vectors))]
+    
+    with pytest.raises(UnexpectedResponse):
+        await vector_store.add_vectors("test_collection", vectors, payloads)
+    
+    assert mock_qdrant_client.upsert.call_count == vector_store_module.settings.qdrant.upsert_max_attempts
+
+
+async def test_upsert_not_retried_on_client_error(vector_store, mock_qdrant_client, no_retry_wait):
+    """Test that errors other than overload or connection failures are raised at once."""
+    mock_qdrant_client.upsert.side_effect = Exception("Bad request")
+    vectors = np.zeros((10, 3), dtype=np.float32)
+    payloads = [{} for _ in range(len(vectors))]
+    
+    with pytest.raises(Exception, match="Bad request"):
+        await vector_store.add_vectors("test_collection", vectors, payloads)
+    
+    assert mock_qdrant_client.upsert.call_count == 1
+
+
+def test_adaptive_limiter():
+    """Test that the limit halves on backpressure and recovers one step per success."""
+    limiter = _AdaptiveLimiter(8)
+    
+    limiter.backoff()
+    limiter.backoff()
+    assert limiter.limit == 2
+    
+    limiter.backoff()
+    limiter.backoff()
+    assert limiter.limit == 1
+    
+    for _ in range(10):
+        limiter.recover()
+    assert limiter.limit == 8
+
+
+async def test_bulk_load_defers_indexing(vector_store, mock_qdrant_client):
+    """Test that bulk loading disables HNSW before the upserts and restores it after."""
+    calls = MagicMock()
+    calls.attach_mock(mock_qdrant_client.update_collection, "update_collection")
+    calls.attach_mock(mock_qdrant_client.upsert, "upsert")
+    vectors = np.zeros((10, 3), dtype=np.float32)
+    payloads = [{} for _ in range(len(vectors))]
+    
+    vector_ids = await vector_store.bulk_load("test_collection", vectors, payloads)
+    
+    assert len(vector_ids) == 10
+    names = [name for name, _, _ in calls.mock_calls]
+    assert names[0] == "update_collection"
+    assert names[-1] == "update_collection"
+    assert "upsert" in names[1:-1]
+    
+    before, after = mock_qdrant_client.update_collection.call_args_list
+    assert before.kwargs["hnsw_config"].m == 0
+    assert after.kwargs["hnsw_config"].m == 16
+    assert after.kwargs["optimizers_config"].indexing_threshold == 10000
+
+
+async def test_bulk_load_restores_indexing_on_failure(vector_store, mock_qdrant_client):
+    """Test that HNSW indexing is restored when an upsert fails."""
+    mock_qdrant_client.upsert.side_effect = Exception("Upsert failed")
+    vectors = np.zeros((10, 3), dtype=np.float32)
+    payloads = [{} for _ in range(len(vectors))]
+    
+    with pytest.raises(Exception, match="Upsert failed"):
+        await vector_store.bulk_load("test_collection", vectors, payloads)
+    
+    assert mock_qdrant_client.update_collection.call_count == 2
+    assert mock_qdrant_client.update_collection.call_args.kwargs["hnsw_config"].m == 16
+
+
+@pytest.mark.asyncio
+async def test_search(memory_store):
+    """Test vector search functionality."""
     # Test parameters
     collection_name = "test_collection"
-    query_vector = [0.1, 0.2, 0.3]
-    filter_conditions = {"document_id": "doc1"}
-    limit = 5
+    await memory_store.create_collection_if_not_exists(collection_name, 3, "dot_normalized")
+    await memory_store.add_vectors(
+        collection_name,
+        [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.8, 0.6, 0.0]],
+        [
+            {"document_id": "doc1", "chunk_index": 0, "text": "Test content 1"},
+            {"document_id": "doc2", "chunk_index": 0, "text": "Test content 2"},
+            {"document_id": "doc1", "chunk_index": 1, "text": "Test content 3"}
+        ]
+    )
+    query_vector = [1.0, 0.0, 0.0]
     
     # Perform search
-    results = await vector_store.search(collection_name, query_vector, filter_conditions, limit)
+    results = await memory_store.search(collection_name, query_vector, limit=5, threshold=0.5)
     
-    # Check results
-    assert results == search_results
-    mock_qdrant_client.search.assert_called_with(
-        collection_name=collection_name,
-        query_vector=query_vector,
-        query_filter=pytest.approx({"must": [{"key": "document_id", "match": {"value": "doc1"}}]}),
-        limit=limit
+    # Check results: the orthogonal vector falls below the threshold
+    assert [result["payload"]["text"] for result in results] == ["Test content 1", "Test content 3"]
+    assert [result["score"] for result in results] == pytest.approx([1.0, 0.8])
+    
+    # Perform filtered search
+    filter_conditions = [{"field": "chunk_index", "value": 1}]
+    results = await memory_store.search(collection_name, query_vector, limit=5, threshold=0.5, filters=filter_conditions)
+    
+    assert [result["payload"]["text"] for result in results] == ["Test content 3"]
+    
+    # The same filters again reuse the compiled Qdrant filter
+    hits = _compile_filter.cache_info().hits
+    results = await memory_store.search(collection_name, query_vector, limit=5, threshold=0.5, filters=filter_conditions)
+    
+    assert [result["payload"]["text"] for result in results] == ["Test content 3"]
+    assert _compile_filter.cache_info().hits > hits
+
+
+def test_build_filter_operators(vector_store):
+    """Test that negated operators become must_not conditions."""
+    filter_obj = vector_store._build_filter([
+        {"field": "document_type", "value": "manual"},
+        {"field": "department", "value": ["hr", "it"], "operator": "in"},
+        {"field": "status", "value": "archived", "operator": "!="},
+        {"field": "owner", "value": None}  # Ignored
+    ])
+    
+    assert sorted(condition.key for condition in filter_obj.must) == ["department", "document_type"]
+    assert [condition.key for condition in filter_obj.must_not] == ["status"]
+    assert vector_store._build_filter([{"field": "owner", "value": None}]) is None
+
+
+async def test_search_stream(memory_store, memory_client):
+    """Test that streamed search yields the same hits as search, best first."""
+    collection_name = "test_collection"
+    await memory_store.create_collection_if_not_exists(collection_name, 3, "dot_normalized")
+    await memory_store.add_vectors(
+        collection_name,
+        [[1.0, 0.0, 0.0], [0.6, 0.8, 0.0], [0.8, 0.6, 0.0], [0.0, 1.0, 0.0]],
+        [{"chunk_index": i} for i in range(4)]
     )
+    query_vector = [1.0, 0.0, 0.0]
+    
+    streamed = [
+        hit async for hit in memory_store.search_stream(
+            collection_name, query_vector, limit=5, threshold=0.5, page_size=2
+        )
+    ]
+    
+    assert [hit["payload"]["chunk_index"] for hit in streamed] == [0, 2, 1]
+    assert streamed == await memory_store.search(collection_name, query_vector, limit=5, threshold=0.5)
+
+
+async def test_search_stream_stops_early(vector_store, mock_qdrant_client):
+    """Test that pages are only requested as the caller consumes them."""
+    hit = MagicMock(id="id1", score=0.9, payload={})
+    mock_qdrant_client.search.return_value = [hit, hit]
+    
+    async for _ in vector_store.search_stream("test_collection", [1.0, 0.0], limit=10, page_size=2):
+        break
+    
+    mock_qdrant_client.search.assert_called_once()
+    assert mock_qdrant_client.search.call_args.kwargs["offset"] == 0
+
+
+async def test_search_stream_single_request_by_default(vector_store, mock_qdrant_client):
+    """Test that without a page size the whole top-k is fetched in one request."""
+    hit = MagicMock(id="id1", score=0.9, payload={})
+    mock_qdrant_client.search.return_value = [hit] * 10
+    
+    streamed = [hit async for hit in vector_store.search_stream("test_collection", [1.0, 0.0], limit=10)]
+    
+    assert len(streamed) == 10
+    mock_qdrant_client.search.assert_called_once()
+    assert mock_qdrant_client.search.call_args.kwargs["limit"] == 10
 
 
 @pytest.mark.asyncio
-async def test_delete_vectors(vector_store, mock_qdrant_client):
+async def test_delete_vectors(memory_store, memory_client):
     """Test deleting vectors by ID."""
     # Test parameters
     collection_name = "test_collection"
-    vector_ids = ["id1", "id2"]
+    await memory_store.create_collection_if_not_exists(collection_name, 3, "dot")
+    vector_ids = await memory_store.add_vectors(
+        collection_name,
+        [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]],
+        [{"document_id": "doc1"}, {"document_id": "doc2"}]
+    )
     
     # Delete vectors
-    await vector_store.delete_vectors(collection_name, vector_ids)
+    deleted = await memory_store.delete_vectors(collection_name, vector_ids[:1])
+    
+    # Check that only the deleted vector is gone
+    assert deleted == 1
+    count = await memory_client.count(collection_name=collection_name)
+    assert count.count == 1
+    assert await memory_client.retrieve(collection_name=collection_name, ids=vector_ids[:1]) == []
+
+
+async def test_delete_vectors_batched(vector_store, mock_qdrant_client):
+    """Test that large deletes are split into delete_batch_size requests."""
+    vector_ids = uuid7_ids(25000)
+    
+    deleted = await vector_store.delete_vectors("test_collection", vector_ids)
     
-    # Check if delete was called correctly
-    mock_qdrant_client.delete_points.assert_called_with(
-        collection_name=collection_name,
-        points=vector_ids
+    assert deleted == 25000
+    selectors = [call.kwargs["points_selector"] for call in mock_qdrant_client.delete.call_args_list]
+    assert [len(selector.points) for selector in selectors] == [10000, 10000, 5000]
+    assert [point_id for selector in selectors for point_id in selector.points] == vector_ids
+
+
+async def test_delete_by_document(memory_store, memory_client):
+    """Test deleting all of a document's vectors with a payload filter."""
+    collection_name = "test_collection"
+    await memory_store.create_collection_if_not_exists(collection_name, 3, "dot")
+    await memory_store.add_vectors(
+        collection_name,
+        [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]],
+        [{"document_id": "doc1"}, {"document_id": "doc2"}, {"document_id": "doc1"}]
     )
+    
+    await memory_store.delete_by_document(collection_name, "doc1")
+    
+    remaining, _ = await memory_client.scroll(collection_name=collection_name, with_payload=True)
+    assert [point.payload for point in remaining] == [{"document_id": "doc2"}]
+    
+    # An empty filter would delete the whole collection
+    with pytest.raises(ValueError):
+        await memory_store.delete_by_filter(collection_name, [])
 
 
 @pytest.mark.asyncio
-async def test_delete_collection(vector_store, mock_qdrant_client):
+async def test_delete_collection(memory_store, memory_client):
     """Test deleting a collection."""
     # Test parameters
     collection_name = "test_collection"
+    await memory_store.create_collection_if_not_exists(collection_name, 3, "cosine")
     
     # Delete collection
-    await vector_store.delete_collection(collection_name)
+    await memory_store.delete_collection(collection_name)
+    
+    # Check the collection is gone
+    assert not await memory_client.collection_exists(collection_name=collection_name)
+
+
+@pytest.mark.parametrize("prenormalized,expected", [
+    (True, [3.0, 4.0]),  # Passed through untouched
+    (False, [0.6, 0.8]),  # L2-normalized before the search
+])
+async def test_search_query_normalization(vector_store, mock_qdrant_client, prenormalized, expected):
+    """Test that only non-normalized query vectors are normalized client-side."""
+    mock_qdrant_client.search_batch.return_value = [[]]
     
-    # Check if delete was called correctly
-    mock_qdrant_client.delete_collection.assert_called_with(
-        collection_name=collection_name
+    await vector_store.search("test_collection", [3.0, 4.0], prenormalized=prenormalized)
+    
+    sent = mock_qdrant_client.search_batch.call_args.kwargs["requests"][0].vector
+    np.testing.assert_allclose(sent, expected)
+
+
+async def test_search_normalizes_ndarray_copy(vector_store, mock_qdrant_client):
+    """Test that a float32 query is sent with unit norm without modifying the caller's array."""
+    mock_qdrant_client.search_batch.return_value = [[]]
+    query_vector = np.random.rand(384).astype(np.float32) * 10
+    original = query_vector.copy()
+    
+    await vector_store.search("test_collection", query_vector, prenormalized=False)
+    
+    sent = mock_qdrant_client.search_batch.call_args.kwargs["requests"][0].vector
+    assert np.linalg.norm(sent) == pytest.approx(1.0, abs=1e-6)
+    np.testing.assert_array_equal(query_vector, original)
+
+
+async def test_search_batched(vector_store, mock_qdrant_client):
+    """Test that concurrent searches are coalesced into batch requests."""
+    async def search_batch(collection_name, requests):
+        # Echo each request's limit back as its score so fan-out can be checked
+        return [[MagicMock(id=f"id{request.limit}", score=request.limit, payload={})] for request in requests]
+    
+    mock_qdrant_client.search_batch.side_effect = search_batch
+    
+    results = await asyncio.gather(*[
+        vector_store.search("test_collection", [1.0, 0.0], limit=i + 1) for i in range(50)
+    ])
+    
+    # The first search goes out alone; the rest queue behind it in batches of 32
+    assert mock_qdrant_client.search_batch.call_count == 1 + math.ceil(49 / 32)
+    assert [result[0]["score"] for result in results] == list(range(1, 51))
+    mock_qdrant_client.search.assert_not_called()
+
+
+async def test_search_batched_error(vector_store, mock_qdrant_client):
+    """Test that a failed batch is retried per search so only the failing search errors."""
+    async def search_batch(collection_name, requests):
+        if any(request.limit == 2 for request in requests):
+            raise Exception("Search failed")
+        return [[MagicMock(id=f"id{request.limit}", score=request.limit, payload={})] for request in requests]
+    
+    mock_qdrant_client.search_batch.side_effect = search_batch
+    
+    results = await asyncio.gather(
+        *[vector_store.search("test_collection", [1.0, 0.0], limit=i + 1) for i in range(3)],
+        return_exceptions=True
     )
+    
+    assert results[0][0]["score"] == 1
+    assert str(results[1]) == "Search failed"
+    assert results[2][0]["score"] == 3
+
+
+async def test_search_single_not_delayed(vector_store, mock_qdrant_client, monkeypatch):
+    """Test that a search with nothing else in flight is sent without waiting."""
+    mock_qdrant_client.search_batch.return_value = [[]]
+    sleep = AsyncMock()
+    monkeypatch.setattr("app.rag.vector_store.asyncio.sleep", sleep)
+    
+    await vector_store.search("test_collection", [1.0, 0.0])
+    
+    sleep.assert_not_called()
+    assert len(mock_qdrant_client.search_batch.call_args.kwargs["requests"]) == 1
 
 
 @pytest.mark.asyncio
-async def test_get_collection_info(vector_store, mock_qdrant_client):
+@pytest.mark.parametrize("distance,expected", [
+    ("cosine", "Cosine"),
+    ("dot_normalized", "Dot"),
+])
+async def test_get_collection_info(memory_store, distance, expected):
     """Test getting collection information."""
-    # Set up mock response
-    collection_info = MagicMock()
-    collection_info.status = 200
-    collection_info.config = MagicMock()
-    collection_info.config.params = MagicMock()
-    collection_info.config.params.vectors = MagicMock()
-    collection_info.config.params.vectors.size = 384
-    collection_info.config.params.vectors.distance = "Cosine"
-    mock_qdrant_client.get_collection.return_value = collection_info
-    
     # Test parameters
     collection_name = "test_collection"
+    await memory_store.create_collection_if_not_exists(collection_name, 384, distance)
     
     # Get collection info
-    info = await vector_store.get_collection_info(collection_name)
+    info = await memory_store.get_collection_info(collection_name)
     
     # Check results
-    assert info is not None
-    assert info.get("vector_size") == 384
-    assert info.get("distance") == "Cosine"
-    mock_qdrant_client.get_collection.assert_called_with(
-        collection_name=collection_name
-    )
\ No newline at end of file
+    assert info["name"] == collection_name
+    assert info["vector_size"] == 384
+    assert info["distance"] == expected
+    assert info["points_count"] == 0
+    assert info["quantization"] is None
+
+
+async def test_get_collection_info_cached(vector_store, mock_qdrant_client):
+    """Test that collection info is fetched once within the TTL and refetched after deletion."""
+    mock_qdrant_client.get_collection.return_value.config.params.vectors.size = 384
+    
+    first = await vector_store.get_collection_info("test_collection")
+    second = await vector_store.get_collection_info("test_collection")
+    
+    assert second == first
+    assert mock_qdrant_client.get_collection.call_count == 1
+    
+    # Deleting the collection drops its cached info
+    await vector_store.delete_collection("test_collection")
+    await vector_store.get_collection_info("test_collection")
+    assert mock_qdrant_client.get_collection.call_count == 2
+    
+    # Expired entries are refetched
+    vector_store.collection_info_ttl = 0
+    await vector_store.delete_collection("test_collection")
+    await vector_store.get_collection_info("test_collection")
+    await vector_store.get_collection_info("test_collection")
+    assert mock_qdrant_client.get_collection.call_count == 4
+
+
+def _bench_points(n, dim=384):
+    """Build ``n`` normalized vectors with payloads and fixed IDs for benchmarking."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    payloads = [{"document_id": f"doc{i // 10}", "chunk_index": i % 10} for i in range(n)]
+    ids = uuid7_ids(n)
+    return vectors, payloads, ids
+
+
+@pytest.mark.performance
+@pytest.mark.benchmark(group="vector_store")
+@pytest.mark.parametrize("n", [1000, 10000])
+def test_bench_add_vectors(benchmark, memory_store, event_loop, n):
+    """Benchmark batched upserts into the in-memory store."""
+    vectors, payloads, ids = _bench_points(n)
+    event_loop.run_until_complete(memory_store.create_collection_if_not_exists("bench", 384, "dot_normalized"))
+    
+    # Fixed IDs make every round overwrite the same points instead of growing the collection
+    vector_ids = benchmark(lambda: event_loop.run_until_complete(
+        memory_store.add_vectors("bench", vectors, payloads, ids=ids)
+    ))
+    
+    assert vector_ids == ids
+
+
+@pytest.mark.performance
+@pytest.mark.benchmark(group="vector_store")
+def test_bench_search(benchmark, memory_store, event_loop):
+    """Benchmark a top-10 search over 10k vectors in the in-memory store."""
+    vectors, payloads, ids = _bench_points(10000)
+    event_loop.run_until_complete(memory_store.create_collection_if_not_exists("bench", 384, "dot_normalized"))
+    event_loop.run_until_complete(memory_store.add_vectors("bench", vectors, payloads, ids=ids))
+    
+    results = benchmark(lambda: event_loop.run_until_complete(
+        memory_store.search("bench", vectors[0], limit=10, threshold=0.0)
+    ))
+    
+    assert len(results) == 10
+    assert results[0]["id"] == ids[0]